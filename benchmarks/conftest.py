@@ -0,0 +1,57 @@
+import json
+
+import pytest
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from variational import Client, MockServer, Transport
+
+
+class StaticTransport(Transport):
+    """
+    Returns the same prepared response to every request, so that benchmarks
+    measure only the SDK side of a call.
+    """
+
+    def __init__(self, body: dict):
+        self.content = json.dumps(body).encode()
+
+    def send(self, request, timeout=None):
+        return make_response(self.content)
+
+
+def make_response(content: bytes) -> requests.Response:
+    resp = requests.Response()
+    resp.status_code = 200
+    resp.headers = CaseInsensitiveDict({"x-request-received-ms": "1717200000000"})
+    resp._content = content
+    resp.encoding = "utf-8"
+    return resp
+
+
+@pytest.fixture(scope="session")
+def server():
+    server = MockServer()
+    server.seed(rfqs=500, positions=1000, trades=1000)
+    return server
+
+
+@pytest.fixture(scope="session")
+def client(server):
+    return Client(server.key, server.secret, transport=server)
+
+
+@pytest.fixture(scope="session")
+def rfqs_page(server):
+    return {
+        "result": server.rfqs_received[:100],
+        "pagination": {"next_page": {"limit": "100", "offset": "100"}},
+    }
+
+
+@pytest.fixture(scope="session")
+def positions_page(server):
+    return {
+        "result": server.positions[:1000],
+        "pagination": {"next_page": None},
+    }
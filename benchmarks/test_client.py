@@ -0,0 +1,43 @@
+import json
+
+import requests
+
+from variational import ApiPage, Client, paginate, sign_prepared_request
+
+from .conftest import StaticTransport, make_response
+
+
+def test_sign_prepared_request(benchmark):
+    payload = {"rfq_id": "bdd68c99-65fe-4500-baae-5bc09b4af183", "qty": "1.5"}
+    secret = "ab" * 32
+
+    def _sign():
+        req = requests.Request(
+            method="POST", url="https://api.variational.io/v1/rfqs/new", json=payload
+        ).prepare()
+        return sign_prepared_request(req, "key", secret)
+
+    benchmark(_sign)
+
+
+def test_send_request(benchmark):
+    client = Client("key", "ab" * 32, transport=StaticTransport({"result": True}))
+    benchmark(client.cancel_quote, "bdd68c99-65fe-4500-baae-5bc09b4af183")
+
+
+def test_page_from_large_rfqs_response(benchmark, rfqs_page):
+    content = json.dumps(rfqs_page).encode()
+    benchmark(lambda: ApiPage.from_response(make_response(content)))
+
+
+def test_page_from_large_positions_response(benchmark, positions_page):
+    content = json.dumps(positions_page).encode()
+    benchmark(lambda: ApiPage.from_response(make_response(content)))
+
+
+def test_paginate_rfqs(benchmark, client):
+    benchmark(lambda: sum(1 for _ in paginate(client.get_rfqs_received)))
+
+
+def test_paginate_trades(benchmark, client):
+    benchmark(lambda: sum(1 for _ in paginate(client.get_portfolio_trades)))
@@ -0,0 +1,11 @@
+import subprocess
+import sys
+
+
+def test_import_variational(benchmark):
+    benchmark.pedantic(
+        subprocess.run,
+        args=([sys.executable, "-c", "import variational"],),
+        kwargs={"check": True},
+        rounds=10,
+    )
@@ -0,0 +1,21 @@
+import pytest
+
+from variational.permit import PermitSigner, _prepare_message
+
+PRIVATE_KEY = "0x" + "4c" * 32
+
+
+@pytest.fixture
+def permit_message(server):
+    message = server.make_permit_template("0x" + "ab" * 20, hex(2**256 - 1))
+    return _prepare_message(message)
+
+
+def test_sign_permit(benchmark, permit_message):
+    signer = PermitSigner(PRIVATE_KEY)
+    benchmark(signer.sign, permit_message)
+
+
+def test_encode_permit(benchmark, permit_message):
+    signer = PermitSigner(PRIVATE_KEY)
+    benchmark(signer.encode, permit_message)
@@ -0,0 +1,50 @@
+from decimal import Decimal
+
+from variational import (
+    FixedDecimal,
+    default_min_qty_tick,
+    find_asset_details_for_instrument,
+    round_to_requirements,
+)
+
+REQUIREMENTS = {
+    "min_decimal_figures": 2,
+    "max_decimal_only_figures": 4,
+    "max_significant_figures": 6,
+}
+VALUES = [
+    Decimal(v)
+    for v in ("0.00123456", "0.654321", "12.34567", "123456.1", "1.123456789123")
+]
+
+
+def test_round_to_requirements(benchmark):
+    benchmark(lambda: [round_to_requirements(v, REQUIREMENTS) for v in VALUES])
+
+
+def test_round_fixed_to_requirements(benchmark):
+    values = [FixedDecimal.from_decimal(v) for v in VALUES]
+    benchmark(lambda: [round_to_requirements(v, REQUIREMENTS) for v in values])
+
+
+def test_default_min_qty_tick(benchmark):
+    notional = Decimal("0.1")
+    benchmark(lambda: [default_min_qty_tick(notional, v) for v in VALUES])
+
+
+def test_find_asset_details_for_instrument(benchmark):
+    supported = {
+        f"TOKEN{i}": [
+            {"asset": f"TOKEN{i}", "dex_token_details": {"network": n}}
+            for n in ("eth", "bsc", "solana", "arbitrum", "base")
+        ]
+        for i in range(500)
+    }
+    instrument = {
+        "instrument_type": "perpetual_future",
+        "underlying": "TOKEN250",
+        "settlement_asset": "USDC",
+        "funding_interval_s": 3600,
+        "dex_token_details": {"network": "base"},
+    }
+    benchmark(find_asset_details_for_instrument, instrument, supported)
@@ -0,0 +1,31 @@
+from variational import ClientPool, Compression, MockServer, paginate
+
+
+def test_clients_share_transport_but_not_credentials():
+    server = MockServer()
+    pool = ClientPool(transport=server)
+
+    good = pool.client(server.key, server.secret)
+    bad = pool.client("other-key", "11" * 32)
+
+    assert pool.client(server.key, server.secret) is good
+    assert good.transport is bad.transport is server
+    assert good.rate_limits is not bad.rate_limits
+    assert good.get_me().result["company_id"] == server.company
+    assert len(pool) == 2
+    assert pool.remove("other-key") is bad
+    assert "other-key" not in pool
+
+
+def test_clients_inherit_pool_options():
+    server = MockServer()
+    server.seed(rfqs=3)
+    compression = Compression(request_min_bytes=0)
+    pool = ClientPool(
+        transport=server, stream=True, compression=compression, intern=True
+    )
+
+    client = pool.client(server.key, server.secret)
+    assert client.stream and client.intern
+    assert client.compression is compression
+    assert len(list(paginate(client.get_rfqs_received))) == 3
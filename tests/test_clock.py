@@ -0,0 +1,20 @@
+from variational import Client, ClockSync, MockServer
+
+
+def test_clock_sync_prefers_lowest_rtt_sample():
+    clock = ClockSync()
+    # server is 10s ahead, samples with noisy round trips
+    clock.observe(sent_at=100.0, server_received_at=110.4, received_at=101.0)
+    clock.observe(sent_at=200.0, server_received_at=210.05, received_at=200.1)
+    clock.observe(sent_at=300.0, server_received_at=310.2, received_at=300.5)
+
+    assert abs(clock.rtt - 0.1) < 1e-9
+    assert abs(clock.offset - 10.0) < 1e-9
+
+
+def test_client_learns_offset_from_responses():
+    server = MockServer()
+    client = Client(server.key, server.secret, transport=server)
+    client.get_status()
+    assert client.clock.rtt is not None
+    assert abs(client.clock.offset) < 0.1
@@ -0,0 +1,86 @@
+from variational import (
+    Client,
+    Compression,
+    CompressionStats,
+    MockServer,
+    paginate,
+)
+
+
+def test_responses_are_compressed_and_decoded():
+    server = MockServer()
+    server.seed(trades=150)
+    stats = CompressionStats()
+    client = Client(server.key, server.secret, transport=server, hooks=[stats])
+
+    assert len(list(paginate(client.get_portfolio_trades))) == 150
+    totals = stats.summary()["GET /portfolio/trades"]
+    assert totals["received_saved"] > totals["received"]
+
+    client.compression = Compression(accept=())
+    assert len(client.get_portfolio_trades().result) == 100
+    assert stats.summary()["GET /portfolio/trades"]["received_saved"] == (
+        totals["received_saved"]
+    )
+
+
+def test_streamed_pages_are_decompressed():
+    server = MockServer()
+    server.seed(rfqs=120)
+    client = Client(
+        server.key,
+        server.secret,
+        transport=server,
+        stream=True,
+        compression=Compression(accept=("br",)),
+    )
+
+    assert len(list(paginate(client.get_rfqs_received))) == 120
+
+
+def test_large_request_bodies_are_compressed():
+    server = MockServer()
+    server.seed(rfqs=1)
+    records = []
+    client = Client(
+        server.key,
+        server.secret,
+        transport=server,
+        hooks=[records.append],
+        compression=Compression(request_min_bytes=100),
+    )
+
+    rfq = server.rfqs_received[0]
+    client.price_structure(rfq["structure"])
+    client.cancel_all_quotes()
+
+    assert records[0].request_bytes_saved > 0
+    assert records[1].request_bytes_saved == 0
+
+
+def test_streamed_responses_report_decoded_size():
+    server = MockServer()
+    server.seed(trades=100)
+    records = []
+    stats = CompressionStats()
+    client = Client(
+        server.key,
+        server.secret,
+        transport=server,
+        hooks=[records.append, stats],
+        compression=Compression(accept=("gzip",)),
+    )
+    client.get_portfolio_trades()
+    client.stream = True
+    page = client.get_portfolio_trades()
+    assert len(records) == 1
+    assert len(list(page.result)) == 100
+    assert client.get_me().result["company_id"] == server.company
+
+    buffered, streamed, single = records
+    assert streamed.response_bytes == buffered.response_bytes
+    assert streamed.response_bytes_saved == buffered.response_bytes_saved > 0
+    assert single.endpoint == "/me"
+    assert stats.summary()["GET /portfolio/trades"]["received_saved"] == (
+        2 * buffered.response_bytes_saved
+    )
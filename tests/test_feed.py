@@ -0,0 +1,61 @@
+from variational import ClockSync
+from variational import RFQFeed, RFQEventType, ApiPage, Pagination, ResponseMetadata
+
+
+def _rfq(rfq_id, status="open", clearing_status=None, bids=()):
+    return {
+        "rfq_id": rfq_id,
+        "rfq_status": status,
+        "clearing_status": clearing_status,
+        "rfq_expires_at": "2099-01-01T00:00:00Z",
+        "bids": [{"parent_quote_id": q} for q in bids],
+        "asks": [],
+    }
+
+
+class FakeClient:
+    def __init__(self):
+        self.clock = ClockSync()
+        self.pages = []
+        self.price = None
+
+    def get_rfqs_received(self, page=None, price=None):
+        self.price = price
+        index = int(page["offset"]) if page else 0
+        next_page = {"offset": str(index + 1)} if index + 1 < len(self.pages) else None
+        return ApiPage(
+            result=self.pages[index],
+            pagination=Pagination(next_page=next_page),
+            meta=ResponseMetadata(request_received_at=0),
+        )
+
+
+def test_feed_emits_only_changes():
+    client = FakeClient()
+    feed = RFQFeed(client, price=False)
+
+    client.pages = [[_rfq("a")], [_rfq("b")]]
+    events = feed.poll()
+    assert [(e.type, e.rfq["rfq_id"]) for e in events] == [
+        (RFQEventType.NEW_RFQ, "a"),
+        (RFQEventType.NEW_RFQ, "b"),
+    ]
+    assert client.price is False
+
+    assert feed.poll() == []
+
+    client.pages = [
+        [_rfq("a", bids=["q1"])],
+        [_rfq("b", clearing_status="pending_pool_creation")],
+    ]
+    events = feed.poll()
+    assert [(e.type, e.rfq["rfq_id"]) for e in events] == [
+        (RFQEventType.NEW_QUOTE, "a"),
+        (RFQEventType.STATUS_CHANGE, "b"),
+    ]
+    assert events[0].quote["parent_quote_id"] == "q1"
+
+    client.pages = [[_rfq("a", status="expired", bids=["q1"])]]
+    events = feed.poll()
+    assert [(e.type, e.rfq["rfq_id"]) for e in events] == [(RFQEventType.EXPIRED, "a")]
+    assert set(feed.rfqs) == {"a"}
@@ -0,0 +1,82 @@
+import random
+from decimal import ROUND_DOWN, ROUND_HALF_EVEN, Decimal
+
+from variational import FixedDecimal, requirements_scale, round_to_requirements
+
+REQUIREMENTS = [
+    {
+        "min_decimal_figures": 2,
+        "max_decimal_only_figures": 4,
+        "max_significant_figures": 6,
+    },
+    {
+        "min_decimal_figures": 0,
+        "max_decimal_only_figures": 3,
+        "max_significant_figures": 4,
+    },
+    {
+        "min_decimal_figures": 4,
+        "max_decimal_only_figures": 6,
+        "max_significant_figures": 8,
+    },
+]
+
+
+def test_parse_and_format():
+    for text, expected in [
+        ("218205.58082", "218205.58082"),
+        ("-0.0011230", "-0.001123"),
+        ("12.3400", "12.34"),
+        ("0", "0"),
+        ("-.5", "-0.5"),
+        ("1E+2", "100"),
+        ("1.5e-3", "0.0015"),
+    ]:
+        assert str(FixedDecimal.parse(text)) == expected
+
+    assert FixedDecimal.parse("1.23456", scale=2) == FixedDecimal(123, 2)
+    assert FixedDecimal.parse("-1.235", scale=2) == Decimal("-1.24")
+    assert FixedDecimal.parse("1.235", scale=2, rounding=ROUND_DOWN).value == 123
+    assert FixedDecimal.parse("12.5") == FixedDecimal.parse("12.500")
+    assert hash(FixedDecimal.parse("12.5")) == hash(FixedDecimal.parse("12.500"))
+    assert hash(FixedDecimal.parse("3.000")) == hash(3)
+
+
+def test_arithmetic():
+    a = FixedDecimal.parse("1.25")
+    b = FixedDecimal.parse("0.125")
+
+    assert a + b == Decimal("1.375")
+    assert a - b == Decimal("1.125")
+    assert 1 - a == Decimal("-0.25")
+    assert a * b == Decimal("0.156")
+    assert a * 3 == Decimal("3.75")
+    assert a / 3 == Decimal("0.42")
+    assert -a / 3 == Decimal("-0.42")
+    assert b < a and a >= b and -a < 0
+    assert float(a) == 1.25
+    assert int(-a) == -1
+    assert sorted([a, b, FixedDecimal(0)]) == [0, b, a]
+
+
+def test_rounding_matches_decimal():
+    rnd = random.Random(7)
+    for _ in range(5000):
+        digits = rnd.randint(1, 18)
+        places = rnd.randint(0, 12)
+        text = str(rnd.randint(0, 10**digits)).rjust(places + 1, "0")
+        if places:
+            text = text[:-places] + "." + text[-places:]
+        if rnd.random() < 0.5:
+            text = "-" + text
+        requirements = rnd.choice(REQUIREMENTS)
+        rounding = rnd.choice([ROUND_DOWN, ROUND_HALF_EVEN, None])
+        kwargs = {"rounding": rounding} if rounding else {}
+
+        expected = round_to_requirements(Decimal(text), requirements, **kwargs)
+        fixed = round_to_requirements(FixedDecimal.parse(text), requirements, **kwargs)
+        assert fixed == expected, (text, requirements)
+
+    scale = requirements_scale(REQUIREMENTS[0])
+    qty = FixedDecimal.parse("0.0011234567", scale=scale)
+    assert str(qty.round_to_requirements(REQUIREMENTS[0])) == "0.001123"
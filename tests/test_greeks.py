@@ -0,0 +1,119 @@
+from decimal import Decimal
+
+import pytest
+
+from variational import Client, GreeksAggregator, MockServer
+from variational.greeks import Greeks
+from variational.models import PortfolioSummary, TradeSide, TradeStatus
+from variational.pricing import instrument_key
+
+PERP = {
+    "instrument_type": "perpetual_future",
+    "underlying": "BTC",
+    "settlement_asset": "USDC",
+    "funding_interval_s": 3600,
+    "dex_token_details": None,
+}
+POOL = "pool-1"
+
+
+def aggregated(qty, price="100", delta="1", upnl="0", pool=POOL):
+    qty = Decimal(qty)
+    return {
+        "price": price,
+        "underlying_price": price,
+        "iv": "0",
+        "sum_delta": str(qty * Decimal(delta)),
+        "sum_gamma": "0",
+        "upnl": upnl,
+        "notional": str(qty * Decimal(price)),
+        "sum_rho": "0",
+        "sum_theta": "0",
+        "sum_vega": "0",
+        "position_info": {"instrument": PERP, "pool_location": pool, "qty": str(qty)},
+    }
+
+
+def fill(id, side, qty, price, pool=POOL, created_at=None):
+    return {
+        "id": id,
+        "created_at": created_at,
+        "side": side,
+        "instrument": PERP,
+        "price": price,
+        "qty": qty,
+        "pool_location": pool,
+        "status": TradeStatus.confirmed,
+    }
+
+
+def test_fills_update_sums_and_breakdowns():
+    greeks = GreeksAggregator([aggregated(1), aggregated(2, pool="pool-2")])
+    assert greeks.total.delta == 3
+    assert greeks.total.dollar_delta == 300
+
+    greeks.apply_trade(fill("t1", TradeSide.BUY, "1", "90"))
+    greeks.apply_trade(fill("t1", TradeSide.BUY, "1", "90"))
+    assert greeks.total.delta == 4
+    assert greeks.by_pool()[POOL].delta == 2
+    assert greeks.by_pool()[POOL].upnl == 10
+    assert greeks.by_underlying()["BTC"].notional == 400
+
+    # reducing keeps the average entry, flipping restarts at the fill price
+    greeks.apply_trade(fill("t2", TradeSide.SELL, "1", "120"))
+    assert greeks.by_pool()[POOL].upnl == 5
+    greeks.apply_trade(fill("t3", TradeSide.SELL, "3", "110"))
+    assert greeks.by_pool()[POOL].delta == -2
+    assert greeks.by_pool()[POOL].upnl == 20
+
+    failed = dict(fill("t4", TradeSide.BUY, "2", "100"), status=TradeStatus.failed)
+    greeks.apply_trade(failed)
+    greeks.apply_trade(fill("t5", TradeSide.BUY, "2", "100"))
+    assert greeks.by_pool()[POOL] == greeks.total - greeks.by_pool()["pool-2"]
+    assert greeks.by_pool()[POOL].delta == 0
+
+
+def test_fills_of_new_instruments_need_a_mark():
+    greeks = GreeksAggregator()
+    eth = dict(PERP, underlying="ETH")
+    trade = dict(fill("t1", TradeSide.SELL, "2", "4000"), instrument=eth)
+    with pytest.raises(KeyError):
+        greeks.apply_trade(trade)
+
+    mark = dict.fromkeys(("delta", "gamma", "theta", "vega", "rho"), "0")
+    mark.update(delta="1", price="4010", underlying_price="4010")
+    greeks.apply_trades([trade], {instrument_key(eth): mark})
+    assert greeks.by_underlying()["ETH"].delta == -2
+    assert greeks.total.upnl == -20
+
+
+def test_reconcile_against_summary():
+    server = MockServer()
+    server.seed(positions=30)
+    client = Client(server.key, server.secret, transport=server)
+
+    greeks = GreeksAggregator()
+    differences = greeks.reconcile(client)
+    assert differences["sum_notional"] != 0
+    assert greeks.reconciled_at is not None
+
+    # the mock marks positions afresh on every request
+    differences = greeks.reconcile(client)
+    assert set(differences) == set(PortfolioSummary.__annotations__) - {"sum_balance"}
+    assert sum(greeks.by_pool().values(), Greeks()) == greeks.total
+
+
+def test_reconcile_keeps_fills_newer_than_positions():
+    server = MockServer()
+    client = Client(server.key, server.secret, transport=server)
+    old = fill("t1", TradeSide.BUY, "1", "100", created_at="2024-01-01T00:00:00Z")
+    new = fill("t2", TradeSide.BUY, "1", "100", created_at="2999-01-01T00:00:00Z")
+
+    greeks = GreeksAggregator([aggregated(1)])
+    greeks.apply_trades([old, new])
+    greeks.reconcile(client)
+    # no positions on the server, only the newer fill is applied again
+    assert greeks.total.delta == 1
+
+    greeks.apply_trades([old, new])
+    assert greeks.total.delta == 2
@@ -0,0 +1,42 @@
+import time
+
+from variational import Client, HedgeBudget, HedgingTransport, MockServer
+
+
+class SlowFirstRequest(MockServer):
+    def __init__(self, delay):
+        super().__init__()
+        self.delay = delay
+        self.sent = 0
+
+    def send(self, request, timeout=None, stream=False):
+        self.sent += 1
+        if self.sent == 1:
+            time.sleep(self.delay)
+        return super().send(request, timeout=timeout, stream=stream)
+
+
+def test_slow_request_is_hedged():
+    server = SlowFirstRequest(delay=1)
+    transport = HedgingTransport(server, min_delay=0.01)
+    client = Client(server.key, server.secret, transport=transport)
+
+    started = time.perf_counter()
+    assert client.get_me().result["company_id"] == server.company
+    assert time.perf_counter() - started < 0.5
+    assert transport.budget.hedges == 1
+    transport.close()
+
+
+def test_hedges_are_limited_by_budget():
+    server = SlowFirstRequest(delay=0.1)
+    budget = HedgeBudget(ratio=0, burst=0)
+    transport = HedgingTransport(server, min_delay=0.01, budget=budget)
+    client = Client(server.key, server.secret, transport=transport)
+
+    client.get_me()
+    client.cancel_all_quotes()
+    assert server.sent == 2
+    assert budget.requests == 1
+    assert budget.hedges == 0
+    transport.close()
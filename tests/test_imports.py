@@ -0,0 +1,23 @@
+import subprocess
+import sys
+
+
+def _run(code: str) -> str:
+    return subprocess.run(
+        [sys.executable, "-c", code], check=True, capture_output=True, text=True
+    ).stdout.strip()
+
+
+def test_import_does_not_load_eth_account():
+    assert _run("import sys, variational; print('eth_account' in sys.modules)") == (
+        "False"
+    )
+
+
+def test_lazy_attributes_are_loaded_on_first_use():
+    code = (
+        "import sys, variational; "
+        "helper = variational.TransferPermitHelper; "
+        "print(helper.__module__, 'eth_account' in sys.modules)"
+    )
+    assert _run(code) == "variational.permit True"
@@ -0,0 +1,33 @@
+from variational import Client, MockServer, paginate
+from variational.models import RFQStatus, TradeSide
+
+
+def test_decoded_values_are_interned():
+    server = MockServer()
+    server.seed(rfqs=20, trades=20)
+    for stream in (False, True):
+        client = Client(
+            server.key, server.secret, transport=server, intern=True, stream=stream
+        )
+
+        rfqs = list(paginate(client.get_rfqs_received))
+        assert all(type(r["rfq_status"]) is RFQStatus for r in rfqs)
+        assert rfqs[0]["taker_company"] is rfqs[1]["taker_company"]
+
+        trades = list(paginate(client.get_portfolio_trades))
+        assert trades[0]["company"] is trades[1]["company"]
+        assert type(trades[0]["side"]) is TradeSide
+        # trades and transfers have a `status` of different enums
+        assert type(trades[0]["status"]) is str
+        assert trades[0]["pool_location"] is trades[1]["pool_location"]
+
+
+def test_values_are_plain_strings_by_default():
+    server = MockServer()
+    server.seed(rfqs=1, trades=1)
+    client = Client(server.key, server.secret, transport=server)
+
+    rfq = client.get_rfqs_received().result[0]
+    assert type(rfq["rfq_status"]) is str
+    trade = client.get_portfolio_trades().result[0]
+    assert type(trade["side"]) is str
@@ -0,0 +1,201 @@
+from decimal import Decimal
+
+import pytest
+
+from variational import Client, MockServer, paginate
+from variational import SimpleMarginCalculator, structure_legs
+from variational.margin import Margin, PortfolioMarginCalculator
+from variational.models import TradeSide
+from variational.pricing import instrument_key
+from variational.timestamps import format_rfc3339
+
+ASSET_PARAM = {
+    "futures_initial_margin": "0.1",
+    "futures_maintenance_margin": "0.05",
+    "futures_leverage": "20",
+    "option_initial_margin": "0.15",
+    "option_initial_margin_min": "0.1",
+    "option_maintenance_margin": "0.075",
+}
+PARAMS = {
+    "asset_params": {"BTC": ASSET_PARAM},
+    "default_asset_param": dict(ASSET_PARAM, futures_initial_margin="0.2"),
+    "liquidation_penalty": "0.1",
+    "auto_liquidation": True,
+}
+PERP = {
+    "instrument_type": "perpetual_future",
+    "underlying": "BTC",
+    "settlement_asset": "USDC",
+    "funding_interval_s": 3600,
+    "dex_token_details": None,
+}
+CALL = {
+    "instrument_type": "vanilla_option",
+    "underlying": "BTC",
+    "settlement_asset": "USDC",
+    "expiry": "2030-01-01T08:00:00Z",
+    "strike": "110000",
+    "payoff": "call",
+    "exercise": "european",
+}
+
+
+def test_position_margin():
+    calculator = SimpleMarginCalculator(PARAMS)
+    s = Decimal(100000)
+
+    perp = calculator.position_margin(PERP, Decimal(-2), s, s)
+    assert perp == Margin(Decimal(20000), Decimal(10000))
+    eth = calculator.position_margin(dict(PERP, underlying="ETH"), Decimal(1), s, s)
+    assert eth.initial_margin == Decimal(20000)
+
+    # 10000 out of the money: max(15000 - 10000, 10000) + premium
+    short_call = calculator.position_margin(CALL, Decimal(-1), Decimal(2000), s)
+    assert short_call == Margin(Decimal(12000), Decimal(9500))
+    assert calculator.position_margin(CALL, Decimal(1), Decimal(2000), s) == Margin()
+
+
+def test_what_if_only_changes_touched_positions():
+    calculator = SimpleMarginCalculator(PARAMS)
+    s = Decimal(100000)
+    calculator.set_position(PERP, Decimal(1), s, s)
+    before = calculator.total
+
+    structure = {
+        "legs": [
+            {"side": TradeSide.SELL, "ratio": 1, "instrument": CALL},
+            {"side": TradeSide.BUY, "ratio": 1, "instrument": PERP},
+        ]
+    }
+    marks = {instrument_key(CALL): {"price": "2000", "underlying_price": "100000"}}
+    # selling the structure sells the perp, flattening it, and buys the call
+    sell, buy = calculator.what_if_many(
+        [
+            structure_legs(structure, Decimal(1), TradeSide.SELL),
+            structure_legs(structure, Decimal(1), TradeSide.BUY),
+        ],
+        marks,
+    )
+    assert sell == Margin()
+    assert buy == Margin(Decimal(32000), Decimal(19500))
+    assert calculator.total == before
+
+
+def test_aggregated_positions_from_api():
+    server = MockServer()
+    server.seed(positions=20)
+    client = Client(server.key, server.secret, transport=server)
+    positions = list(paginate(client.get_portfolio_aggregated_positions))
+
+    calculator = SimpleMarginCalculator(PARAMS, positions)
+    assert calculator.total.initial_margin > calculator.total.maintenance_margin > 0
+
+
+def test_positions_of_several_pools():
+    server = MockServer()
+    server.seed(positions=10)
+    client = Client(server.key, server.secret, transport=server)
+    positions = list(paginate(client.get_portfolio_aggregated_positions))
+    # the same instruments held in a second pool, twice as much
+    other_pool = [
+        dict(
+            p,
+            position_info=dict(
+                p["position_info"],
+                pool_location="other",
+                qty=str(2 * Decimal(p["position_info"]["qty"])),
+            ),
+        )
+        for p in positions
+    ]
+    pool = positions[0]["position_info"]["pool_location"]
+
+    with pytest.raises(ValueError):
+        SimpleMarginCalculator(PARAMS, positions + other_pool)
+    calculator = SimpleMarginCalculator(PARAMS, other_pool + positions, pool=pool)
+    assert calculator.total == SimpleMarginCalculator(PARAMS, positions).total
+
+
+PORTFOLIO_ASSET_PARAM = {
+    "vol_range_up": "0.2",
+    "vol_range_down": "0.2",
+    "short_vega_power": "0.5",
+    "long_vega_power": "0.5",
+    "price_range": "0.1",
+    "opt_sum_contingency": "0.01",
+    "opt_contingency": "0.02",
+    "futures_contingency": "0.01",
+    "atm_range": "0.02",
+}
+PORTFOLIO_PARAMS = {
+    "asset_params": {},
+    "default_asset_param": PORTFOLIO_ASSET_PARAM,
+    "decorrelation_risk": "0.5",
+    "initial_margin_factor": "1.5",
+    "liquidation_penalty": "0.1",
+    "auto_liquidation": True,
+}
+
+
+def aggregated(
+    instrument, qty, underlying_price, delta="0", vega="0", iv="0.5", pool="pool"
+):
+    return {
+        "price": str(underlying_price),
+        "underlying_price": str(underlying_price),
+        "iv": iv,
+        "sum_delta": str(delta),
+        "sum_gamma": "0",
+        "upnl": "0",
+        "notional": "0",
+        "sum_rho": "0",
+        "sum_theta": "0",
+        "sum_vega": str(vega),
+        "position_info": {
+            "instrument": instrument,
+            "pool_location": pool,
+            "qty": str(qty),
+        },
+    }
+
+
+def test_portfolio_margin_offsets_correlated_underlyings():
+    btc = aggregated(PERP, 1, 100000, delta=1)
+    eth_perp = dict(PERP, underlying="ETH")
+    eth = aggregated(eth_perp, -10, 4000, delta=-10)
+
+    calculator = PortfolioMarginCalculator(PORTFOLIO_PARAMS, [btc])
+    assert calculator.margin() == Margin(Decimal(16500), Decimal(11000))
+
+    # 6000 lost when both move together, 14000 separately, half of the
+    # difference is charged on top, plus contingencies of 1000 and 400
+    calculator.set_position(eth)
+    assert calculator.scenario_losses() == {"BTC": 10000, "ETH": 4000}
+    assert calculator.margin().maintenance_margin == Decimal(11400)
+
+    calculator.remove_position(eth_perp)
+    assert calculator.margin().maintenance_margin == Decimal(11000)
+
+
+def test_portfolio_margin_of_short_vega():
+    now = 1_700_000_000
+    call = dict(CALL, expiry=format_rfc3339(now + 30 * 86400))
+    calculator = PortfolioMarginCalculator(
+        PORTFOLIO_PARAMS, [aggregated(call, -1, 100000, vega=-50)], now=now
+    )
+    # vol up 0.2 * 0.5 = 10 points costs 500, contingencies 2000 and 1000
+    assert calculator.margin().maintenance_margin == Decimal(3500)
+
+
+def test_portfolio_margin_of_one_pool():
+    btc = aggregated(PERP, 1, 100000, delta=1)
+    other = aggregated(PERP, -1, 100000, delta=-1, pool="other")
+
+    # the short perp of the other pool doesn't offset the long one
+    calculator = PortfolioMarginCalculator(PORTFOLIO_PARAMS, [other, btc], pool="pool")
+    assert calculator.margin().maintenance_margin == Decimal(11000)
+    with pytest.raises(ValueError):
+        calculator.set_position(other)
+    with pytest.raises(ValueError):
+        PortfolioMarginCalculator(PORTFOLIO_PARAMS, [btc, other])
@@ -0,0 +1,32 @@
+from variational import Client, LatencyHistogram, MockServer
+
+
+def test_request_records():
+    server = MockServer(rate_limit_every=2, rate_limit_reset_ms=1)
+    records = []
+    client = Client(server.key, server.secret, transport=server, hooks=[records.append])
+
+    client.get_me()
+    client.get_status()
+
+    assert [(r.endpoint, r.status_code, r.attempt) for r in records] == [
+        ("/me", 200, 1),
+        ("/status", 429, 1),
+        ("/status", 200, 2),
+    ]
+    assert records[1].retry_delay > 0
+    assert records[2].wait_time == records[1].retry_delay
+    assert records[0].response_bytes > 0
+    assert records[0].server_received_at is not None
+
+
+def test_latency_histogram():
+    histogram = LatencyHistogram(precision=0.01)
+    for ms in range(1, 101):
+        histogram.record("GET /quotes", ms / 1000)
+
+    assert histogram.count("GET /quotes") == 100
+    assert abs(histogram.percentile("GET /quotes", 50) - 0.050) < 0.001
+    assert abs(histogram.percentile("GET /quotes", 99) - 0.099) < 0.001
+    assert histogram.summary()["GET /quotes"]["count"] == 100
+    assert histogram.percentile("GET /me", 50) is None
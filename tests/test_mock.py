@@ -0,0 +1,60 @@
+from variational import Client, MockServer, PollingHelper, paginate, ApiError
+from variational.models import ClearingStatus
+
+
+def test_client_against_mock_server():
+    server = MockServer()
+    server.seed(rfqs=250, positions=10)
+    client = Client(server.key, server.secret, transport=server)
+
+    rfqs = list(paginate(client.get_rfqs_received, price=False))
+    assert len(rfqs) == 250
+    assert all(rfq["structure_price"] is None for rfq in rfqs)
+    assert client.get_status().meta.request_received_at > 0
+    assert len(client.get_portfolio_positions().result) == 10
+
+
+def test_mock_server_rate_limits_are_retried():
+    server = MockServer(rate_limit_every=2, rate_limit_reset_ms=1)
+    client = Client(server.key, server.secret, transport=server)
+
+    assert client.get_me().result["company_id"] == server.company
+    assert client.get_me().result["company_id"] == server.company
+    assert server.request_count == 3
+
+
+def test_mock_server_rejects_bad_signature():
+    server = MockServer()
+    client = Client(server.key, "11" * 32, transport=server)
+    try:
+        client.get_me()
+        assert False
+    except ApiError as e:
+        assert e.status_code == 401
+
+
+def test_mock_server_clearing_flow():
+    server = MockServer()
+    server.seed(rfqs=1)
+    client = Client(server.key, server.secret, transport=server)
+    rfq = client.get_rfqs_received().result[0]
+    quote = client.create_quote(
+        rfq_id=rfq["rfq_id"],
+        expires_at=rfq["rfq_expires_at"],
+        leg_quotes=[
+            {"target_rfq_leg_id": leg["rfq_leg_id"], "bid": "1", "ask": "2"}
+            for leg in rfq["rfq_legs"]
+        ],
+        pool_strategy={
+            "strategy": "use_existing",
+            "pool_id": server.pools[0]["pool_id"],
+        },
+    ).result
+    client.accept_quote(rfq["rfq_id"], quote["parent_quote_id"], "buy")
+    client.maker_last_look(rfq["rfq_id"], quote["parent_quote_id"], "accept")
+
+    polling = PollingHelper(client, interval=0)
+    booked = polling.wait_for_clearing_status(
+        quote["parent_quote_id"], ClearingStatus.SUCCESS_TRADES_BOOKED_INTO_POOL
+    )
+    assert booked["pool_location"]
@@ -0,0 +1,61 @@
+from variational import Client, MockServer, TransferPermitHelper
+
+PRIVATE_KEY = "0x" + "4c" * 32
+POOLS = ["0x" + f"{i:040x}" for i in range(1, 5)]
+
+
+def test_sign_and_submit_many():
+    server = MockServer()
+    client = Client(server.key, server.secret, transport=server)
+    helper = TransferPermitHelper(client, PRIVATE_KEY)
+
+    for processes in (0, 2):
+        results = helper.sign_and_submit_unlimited_many(POOLS, processes=processes)
+        assert [r.pool_address for r in results] == POOLS
+        assert all(r.ok for r in results), results
+
+
+def test_sign_and_submit_many_reports_failures():
+    server = MockServer()
+    client = Client(server.key, server.secret, transport=server)
+    helper = TransferPermitHelper(client, "not a key")
+
+    for processes in (0, 1):
+        results = helper.sign_and_submit_unlimited_many(POOLS[:2], processes=processes)
+        assert [r.ok for r in results] == [False, False]
+
+
+def test_permit_signer_matches_eth_account():
+    from eth_account import Account
+    from eth_account.messages import encode_typed_data
+
+    from variational.permit import PermitSigner
+
+    server = MockServer()
+    signer = PermitSigner(PRIVATE_KEY)
+    for pool in POOLS:
+        msg = server.make_permit_template(pool, "0x10")
+        msg["domain"]["chainId"] = int(msg["domain"]["chainId"], 16)
+        expected = Account.sign_message(
+            encode_typed_data(full_message=msg), PRIVATE_KEY
+        )
+        assert signer.sign(msg) == expected.signature.hex()
+
+
+def test_permit_signer_falls_back_for_nested_types():
+    from eth_account import Account
+    from eth_account.messages import encode_typed_data
+
+    from variational.permit import PermitSigner
+
+    msg = {
+        "types": {
+            "EIP712Domain": [{"name": "chainId", "type": "uint256"}],
+            "Batch": [{"name": "values", "type": "uint256[]"}],
+        },
+        "primaryType": "Batch",
+        "domain": {"chainId": 1},
+        "message": {"values": [1, 2, 3]},
+    }
+    expected = Account.sign_message(encode_typed_data(full_message=msg), PRIVATE_KEY)
+    assert PermitSigner(PRIVATE_KEY).sign(msg) == expected.signature.hex()
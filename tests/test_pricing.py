@@ -0,0 +1,123 @@
+from decimal import Decimal
+
+from variational import StructurePricer, combine_leg_prices
+
+CALL = {
+    "instrument_type": "vanilla_option",
+    "underlying": "BTC",
+    "settlement_asset": "USDC",
+    "expiry": "2024-12-27T08:00:00Z",
+    "strike": "70000",
+    "payoff": "call",
+    "exercise": "european",
+}
+PERP = {
+    "instrument_type": "perpetual_future",
+    "underlying": "BTC",
+    "settlement_asset": "USDC",
+    "funding_interval_s": 3600,
+    "dex_token_details": None,
+}
+
+
+def _price(price, delta, timestamp="2024-06-01T00:00:00Z"):
+    return {
+        "price": price,
+        "native_price": price,
+        "delta": delta,
+        "gamma": "0",
+        "theta": "0",
+        "vega": "0",
+        "rho": "0",
+        "iv": "0",
+        "underlying_price": "65000",
+        "interest_rate": "0",
+        "timestamp": timestamp,
+    }
+
+
+class FakeClient:
+    def __init__(self, prices):
+        self.prices = prices
+        self.calls = 0
+
+    def price_instrument(self, instrument):
+        self.calls += 1
+        return type(
+            "Single", (), {"result": self.prices[instrument["instrument_type"]]}
+        )
+
+    def price_structure(self, structure):
+        self.calls += 1
+        legs = [
+            self.prices[leg["instrument"]["instrument_type"]]
+            for leg in structure["legs"]
+        ]
+        return type("Single", (), {"result": {"legs": legs}})
+
+
+def test_combine_leg_prices():
+    legs = [
+        {"side": "buy", "ratio": 2, "instrument": CALL},
+        {"side": "sell", "ratio": 1, "instrument": PERP},
+    ]
+    resp = combine_leg_prices(
+        legs,
+        [
+            _price("1500.5", "0.4", "2024-06-01T00:00:01Z"),
+            _price("65000", "1", "2024-06-01T00:00:00Z"),
+        ],
+    )
+    assert Decimal(resp["structure"]["price"]) == Decimal("-61999")
+    assert Decimal(resp["structure"]["delta"]) == Decimal("-0.2")
+    assert resp["structure"]["timestamp"] == "2024-06-01T00:00:00Z"
+
+
+def test_pricer_only_refreshes_stale_legs():
+    client = FakeClient(
+        {
+            "vanilla_option": _price("1500", "0.4"),
+            "perpetual_future": _price("65000", "1"),
+        }
+    )
+    pricer = StructurePricer(client, max_age=60)
+    pricer.update(PERP, _price("65000", "1"))
+
+    structures = [
+        {"legs": [{"side": "buy", "ratio": 1, "instrument": CALL}]},
+        {
+            "legs": [
+                {"side": "sell", "ratio": 1, "instrument": CALL},
+                {"side": "buy", "ratio": 1, "instrument": PERP},
+            ]
+        },
+    ]
+    prices = pricer.price_structures(structures)
+    assert client.calls == 1
+    assert Decimal(prices[0]["structure"]["price"]) == Decimal("1500")
+    assert Decimal(prices[1]["structure"]["price"]) == Decimal("63500")
+
+    pricer.price_structures(structures)
+    assert client.calls == 1
+
+
+def test_pricer_refreshes_stale_legs_in_one_call():
+    client = FakeClient(
+        {
+            "vanilla_option": _price("1500", "0.4"),
+            "perpetual_future": _price("65000", "1"),
+        }
+    )
+    pricer = StructurePricer(client, max_age=60)
+
+    structure = {
+        "legs": [
+            {"side": "buy", "ratio": 2, "instrument": CALL},
+            {"side": "sell", "ratio": 1, "instrument": PERP},
+        ]
+    }
+    price = pricer.price_structure(structure)
+    assert client.calls == 1
+    assert Decimal(price["structure"]["price"]) == Decimal("-62000")
+    assert pricer.get(PERP)["price"] == "65000"
+    assert client.calls == 1
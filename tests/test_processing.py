@@ -0,0 +1,69 @@
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from variational import (
+    Client,
+    MockServer,
+    ResponseProcessor,
+    paginate,
+    round_to_requirements,
+)
+from variational.processing import _UNKNOWN, _peek_next_page
+
+PRECISION = {
+    "min_decimal_figures": 0,
+    "max_decimal_only_figures": 4,
+    "max_significant_figures": 4,
+}
+
+
+def test_positions_match_decoded_pages():
+    server = MockServer()
+    server.seed(positions=250)
+    client = Client(server.key, server.secret, transport=server)
+
+    with ResponseProcessor(client, max_workers=2) as processor:
+        pages = list(processor.positions(precision=PRECISION))
+
+    assert [len(p) for p in pages] == [100, 100, 50]
+    positions = list(paginate(client.get_portfolio_positions))
+    assert [q for p in pages for q in p.qty] == [
+        float(round_to(p["qty"])) for p in positions
+    ]
+    assert pages[0].pool_location[0] == positions[0]["pool_location"]
+
+
+def test_rfqs_without_prices():
+    server = MockServer()
+    server.seed(rfqs=3, quotes_per_rfq=2)
+    client = Client(server.key, server.secret, transport=server)
+
+    with ThreadPoolExecutor(1) as executor:
+        processor = ResponseProcessor(client, executor=executor)
+        (page,) = processor.rfqs_received(price=False)
+
+    assert page.rfq_id == [r["rfq_id"] for r in server.rfqs_received]
+    assert list(page.bids) == list(page.asks) == [2, 2, 2]
+    assert all(p != p for p in page.price)
+
+
+def round_to(value):
+    return round_to_requirements(Decimal(value), PRECISION)
+
+
+def test_next_page_is_fetched_while_decoding():
+    server = MockServer()
+    server.seed(positions=250)
+    records = []
+    client = Client(server.key, server.secret, transport=server, hooks=[records.append])
+
+    with ThreadPoolExecutor(1) as executor:
+        pages = ResponseProcessor(client, executor=executor).positions()
+        first = next(pages)
+        assert len(records) == 2
+        assert [len(first)] + [len(p) for p in pages] == [100, 100, 50]
+    assert len(records) == 3
+
+    body = b'{"result": [{"pagination": 1}], "pagination": {"next_page": null}}'
+    assert _peek_next_page(body) is None
+    assert _peek_next_page(b'{"pagination": {}, "result": []}') is _UNKNOWN
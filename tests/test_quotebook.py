@@ -0,0 +1,86 @@
+from decimal import Decimal
+
+from variational import Client, MockServer, QuoteBook
+from variational.models import ClearingStatus, RFQStatus, TradeSide
+from variational.timestamps import format_rfc3339
+
+
+def sent_rfq(server, quotes=3):
+    rfq = server.make_rfq(quotes=0)
+    for i in range(quotes):
+        quote = server.make_quote(rfq, bid=f"{100 + i * 7 % 5}", ask=f"{110 - i}")
+        server.add_quote(rfq, quote)
+    server.rfqs_sent.append(rfq)
+    return rfq
+
+
+def test_best_quotes_follow_updates():
+    server = MockServer()
+    client = Client(server.key, server.secret, transport=server)
+    rfq = sent_rfq(server)
+    book = QuoteBook(client)
+    book.poll()
+
+    def price(quote):
+        return Decimal(quote["quote_price"])
+
+    assert book.best_bid(rfq["rfq_id"]) == max(rfq["bids"], key=price)
+    best_ask = min(rfq["asks"], key=price)
+    assert book.best_ask(rfq["rfq_id"]) == best_ask
+
+    # the best ask is withdrawn, another one expires
+    rfq["asks"].remove(best_ask)
+    expiring = min(rfq["asks"], key=price)
+    metadata = rfq["quotes_common_metadata"][expiring["parent_quote_id"]]
+    metadata["expires_at"] = format_rfc3339(client.clock.now() + 1)
+    book.poll()
+    assert book.best_ask(rfq["rfq_id"]) == expiring
+    metadata["expires_at"] = format_rfc3339(client.clock.now() - 1)
+    rfq["asks"].remove(expiring)
+    rfq["asks"].append(dict(expiring, quote_price="1"))
+    book.poll()
+    assert book.best_ask(rfq["rfq_id"]) == max(rfq["asks"], key=price)
+
+    rfq["rfq_status"] = RFQStatus.CANCELED
+    book.poll()
+    assert book.rfq_ids() == []
+    assert book.best_bid(rfq["rfq_id"]) is None
+
+
+def test_margin_filter_and_accept():
+    server = MockServer()
+    client = Client(server.key, server.secret, transport=server)
+    rfq = sent_rfq(server, quotes=2)
+    rfq["bids"][0]["additional_margin_requirements"]["initial_margin"] = "100000"
+
+    book = QuoteBook(client, max_initial_margin=Decimal(1000))
+    book.update_many([rfq])
+    assert book.best_bid(rfq["rfq_id"]) == rfq["bids"][1]
+
+    response = book.accept_best(rfq["rfq_id"], TradeSide.SELL)
+    assert (
+        response.result["new_clearing_status"] == ClearingStatus.PENDING_MAKER_LAST_LOOK
+    )
+    assert book.accept_best("unknown", TradeSide.BUY) is None
+
+
+def test_expiry_changes_at_the_same_price():
+    server = MockServer()
+    client = Client(server.key, server.secret, transport=server)
+    rfq = sent_rfq(server, quotes=1)
+    (ask,) = rfq["asks"]
+    metadata = rfq["quotes_common_metadata"][ask["parent_quote_id"]]
+    book = QuoteBook(client)
+
+    # refreshed at an unchanged price, the quote outlives its first expiry
+    metadata["expires_at"] = format_rfc3339(client.clock.now() - 1)
+    book.update(rfq)
+    assert book.best_ask(rfq["rfq_id"]) is None
+    metadata["expires_at"] = format_rfc3339(client.clock.now() + 60)
+    book.update(rfq)
+    assert book.best_ask(rfq["rfq_id"]) == ask
+
+    # and shortening the expiry takes effect as well
+    metadata["expires_at"] = format_rfc3339(client.clock.now() - 1)
+    book.update(rfq)
+    assert book.best_ask(rfq["rfq_id"]) is None
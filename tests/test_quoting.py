@@ -0,0 +1,131 @@
+import time
+
+import requests
+
+from variational import ClockSync, QuoteManager
+from variational.timestamps import format_rfc3339
+
+
+class Single:
+    def __init__(self, result):
+        self.result = result
+
+
+class FakeClient:
+    def __init__(self):
+        self.clock = ClockSync()
+        self.replaced = []
+        self.canceled = []
+        self.canceled_all = False
+
+    def create_quote(
+        self, rfq_id, expires_at, leg_quotes, pool_strategy, client_quote_id
+    ):
+        return Single(_quote(rfq_id + "-quote", rfq_id, expires_at, leg_quotes))
+
+    def replace_quote(
+        self, parent_quote_id, rfq_id, expires_at, leg_quotes, pool_strategy
+    ):
+        self.replaced.append((parent_quote_id, leg_quotes, pool_strategy))
+        return Single(_quote(parent_quote_id, rfq_id, expires_at, leg_quotes))
+
+    def cancel_quote(self, id):
+        self.canceled.append(id)
+
+    def cancel_all_quotes(self):
+        self.canceled_all = True
+
+
+def _quote(parent_quote_id, rfq_id, expires_at, leg_quotes, pool_location=None):
+    return {
+        "parent_quote_id": parent_quote_id,
+        "target_rfq_id": rfq_id,
+        "expires_at": expires_at,
+        "per_leg_quotes": leg_quotes,
+        "pool_location": pool_location,
+    }
+
+
+LEGS = [{"target_rfq_leg_id": "leg", "bid": "1", "ask": "2"}]
+NEW_POOL = {"strategy": "create_new"}
+
+
+def test_refreshes_due_quotes_only():
+    client = FakeClient()
+    manager = QuoteManager(client, ttl=30, refresh_before=5)
+    now = time.time()
+    manager.track(
+        _quote("soon", "rfq1", format_rfc3339(now + 2), LEGS, "pool"), NEW_POOL
+    )
+    manager.track(_quote("later", "rfq1", format_rfc3339(now + 60), LEGS), NEW_POOL)
+    manager.create("rfq2", LEGS, NEW_POOL)
+
+    assert len(manager) == 3
+    assert manager.run_pending(now) == 1
+    assert client.replaced == [
+        ("soon", LEGS, {"strategy": "use_existing", "pool_id": "pool"})
+    ]
+    assert manager.next_refresh_at() > now + 20
+    assert {q["parent_quote_id"] for q in manager.quotes_for_rfq("rfq1")} == {
+        "soon",
+        "later",
+    }
+
+
+def test_reprice_none_lets_quote_expire():
+    client = FakeClient()
+    manager = QuoteManager(client, reprice=lambda quote: None)
+    manager.track(_quote("q", "rfq", format_rfc3339(time.time()), LEGS), NEW_POOL)
+    assert manager.run_pending() == 1
+    assert client.replaced == []
+    assert len(manager) == 0
+
+
+def test_cancel():
+    client = FakeClient()
+    manager = QuoteManager(client)
+    expires_at = format_rfc3339(time.time() + 60)
+    manager.track(_quote("a", "rfq", expires_at, LEGS), NEW_POOL)
+    manager.track(_quote("b", "rfq", expires_at, LEGS), NEW_POOL)
+    manager.track(_quote("c", "other", expires_at, LEGS), NEW_POOL)
+
+    manager.cancel_rfq("rfq")
+    assert sorted(client.canceled) == ["a", "b"]
+    assert len(manager) == 1
+
+    manager.cancel_all()
+    assert client.canceled_all
+    assert len(manager) == 0
+    assert manager.next_refresh_at() is None
+
+
+def test_failed_refresh_is_retried():
+    client = FakeClient()
+    replace_quote = client.replace_quote
+    failures = []
+
+    def flaky_replace(parent_quote_id, **kwargs):
+        if parent_quote_id == "a" and not failures:
+            failures.append(parent_quote_id)
+            raise requests.ConnectionError("connection reset")
+        return replace_quote(parent_quote_id, **kwargs)
+
+    client.replace_quote = flaky_replace
+    manager = QuoteManager(client, retry_delay=1)
+    now = time.time()
+    manager.track(_quote("a", "rfq", format_rfc3339(now + 3), LEGS), NEW_POOL)
+    manager.track(_quote("b", "rfq", format_rfc3339(now + 3), LEGS), NEW_POOL)
+
+    assert manager.run_pending(now) == 2
+    assert [r[0] for r in client.replaced] == ["b"]
+    assert len(manager) == 2
+    assert now < manager.next_refresh_at() < now + 3
+
+    assert manager.run_pending(now + 2) == 1
+    assert [r[0] for r in client.replaced] == ["b", "a"]
+
+    # a quote that fails too close to its expiry is dropped
+    client.replace_quote = lambda parent_quote_id, **kwargs: 1 / 0
+    manager.track(_quote("c", "rfq", format_rfc3339(now + 0.5), LEGS), NEW_POOL)
+    assert manager.run_pending(now) == 1
+    assert manager.get("c") is None
@@ -0,0 +1,70 @@
+from variational import Client, MockServer, RateLimitTracker
+
+
+def test_tracker_budget_and_throttling():
+    tracker = RateLimitTracker()
+    tracker.observe(
+        "/quotes/new",
+        200,
+        {
+            "X-Rate-Limit-Bucket": "quotes",
+            "X-Rate-Limit-Limit": "100",
+            "X-Rate-Limit-Remaining": "50",
+            "X-Rate-Limit-Resets-In-Ms": "1000",
+        },
+    )
+    assert not tracker.should_throttle("/quotes/new")
+
+    tracker.observe(
+        "/quotes/replace",
+        200,
+        {
+            "x-rate-limit-bucket": "quotes",
+            "x-rate-limit-remaining": "5",
+            "x-rate-limit-resets-in-ms": "1000",
+        },
+    )
+    bucket = tracker.bucket("/quotes/new")
+    assert (bucket.name, bucket.limit, bucket.remaining, bucket.requests) == (
+        "quotes",
+        100,
+        5,
+        2,
+    )
+    assert tracker.should_throttle("/quotes/new")
+    assert not tracker.should_throttle("/rfqs/new")
+
+
+def test_client_counts_rate_limits_and_wait_time():
+    server = MockServer(rate_limit_every=2, rate_limit_reset_ms=1)
+    client = Client(server.key, server.secret, transport=server)
+    client.get_me()
+    client.get_me()
+
+    bucket = client.rate_limits.bucket("/me")
+    assert bucket.requests == 3
+    assert bucket.rate_limited == 1
+    assert bucket.wait_time > 0.001
+    assert client.rate_limits.total_wait_time == bucket.wait_time
+    assert client.rate_limits.recent_rate_limited() == 1
+
+
+def test_quota_budget_without_headers():
+    tracker = RateLimitTracker(quotas={"/quotes/replace": (4, 60)})
+    for _ in range(3):
+        tracker.observe("/quotes/replace", 200, {})
+        tracker.observe("/rfqs/new", 200, {})
+
+    bucket = tracker.bucket("/quotes/replace")
+    assert (bucket.limit, bucket.remaining) == (4, 1)
+    assert tracker.should_throttle("/quotes/replace", reserve=0.25)
+    assert not tracker.should_throttle("/quotes/replace", reserve=0)
+    tracker.observe("/quotes/replace", 200, {})
+    assert tracker.should_throttle("/quotes/replace", reserve=0)
+
+    # without a quota or headers, only a 429 tells
+    assert tracker.bucket("/rfqs/new").remaining is None
+    assert not tracker.should_throttle("/rfqs/new")
+    tracker.set_quota("/rfqs/new", 3, 60)
+    tracker.observe("/rfqs/new", 200, {})
+    assert tracker.snapshot()["/rfqs/new"].remaining == 2
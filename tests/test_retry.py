@@ -0,0 +1,106 @@
+import io
+import time
+
+import pytest
+import requests
+
+from variational import ApiError, Client, DeadlineExceeded, MockServer, RetryPolicy
+
+
+class FlakyServer(MockServer):
+    """
+    Fails the first requests with the given exceptions or status codes.
+    """
+
+    def __init__(self, *failures, **kwargs):
+        super().__init__(**kwargs)
+        self.failures = list(failures)
+        self.timeouts = []
+        self.responses = []
+
+    def send(self, request, timeout=None, stream=False):
+        self.timeouts.append(timeout)
+        if self.failures:
+            failure = self.failures.pop(0)
+            if isinstance(failure, BaseException):
+                raise failure
+            resp = requests.Response()
+            resp.status_code = failure
+            resp._content = b'{"error": {"code": 0, "message": "unavailable"}}'
+            resp.raw = io.BytesIO(resp._content)
+            self.responses.append(resp)
+            return resp
+        return super().send(request, timeout=timeout, stream=stream)
+
+
+def test_transient_errors_are_retried_for_reads():
+    server = FlakyServer(requests.ConnectionError("reset"), 503)
+    client = Client(server.key, server.secret, transport=server)
+
+    assert client.get_me().result["company_id"] == server.company
+    assert len(server.timeouts) == 3
+
+
+def test_streamed_responses_are_closed_before_retrying():
+    server = FlakyServer(503)
+    client = Client(server.key, server.secret, transport=server, stream=True)
+
+    client.get_me()
+    assert server.responses[0].raw.closed
+
+
+def test_writes_are_not_retried():
+    server = FlakyServer(requests.ConnectionError("reset"))
+    client = Client(server.key, server.secret, transport=server)
+
+    with pytest.raises(requests.ConnectionError):
+        client.cancel_all_quotes()
+
+    server = FlakyServer(requests.ConnectionError("reset"))
+    client = Client(
+        server.key, server.secret, transport=server, retry_policy=RetryPolicy(1)
+    )
+    with pytest.raises(requests.ConnectionError):
+        client.get_me()
+
+
+def test_deadline_fails_fast_on_long_rate_limit():
+    server = MockServer(rate_limit_every=1, rate_limit_reset_ms=5000)
+    client = Client(server.key, server.secret, transport=server)
+
+    started = time.monotonic()
+    with pytest.raises(DeadlineExceeded) as e:
+        client.get_status(deadline=0.5)
+    assert time.monotonic() - started < 0.5
+    assert e.value.attempts == 1
+
+
+def test_rate_limit_waits_are_capped():
+    server = MockServer(rate_limit_every=1, rate_limit_reset_ms=100)
+    client = Client(
+        server.key, server.secret, transport=server, max_rate_limit_wait=0.5
+    )
+
+    started = time.monotonic()
+    with pytest.raises(ApiError) as e:
+        client.get_status()
+    assert time.monotonic() - started < 0.5
+    assert e.value.status_code == 429
+    assert 1 < server.request_count < 5
+
+
+def test_attempt_timeouts_are_bounded_by_deadline():
+    server = FlakyServer()
+    client = Client(
+        server.key,
+        server.secret,
+        transport=server,
+        request_timeout=5,
+        connect_timeout=1,
+    )
+
+    client.get_me()
+    client.get_me(deadline=0.5)
+    assert server.timeouts[0] == (1, 5)
+    # both timeouts are capped by the deadline
+    assert 0 < server.timeouts[1] <= 0.5
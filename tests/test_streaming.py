@@ -0,0 +1,50 @@
+import json
+
+import pytest
+
+from variational import Client, MockServer, paginate, paginate_pipelined
+from variational.wrappers import Pagination, _iter_page_items
+
+
+def chunked(data: bytes, size: int):
+    return [data[i:][:size] for i in range(0, len(data), size)]
+
+
+def test_items_are_decoded_across_chunk_boundaries():
+    body = {
+        "pagination": {"next_page": None},
+        "result": [{"qty": "1.5", "name": "é" * 10}, {"n": 12345}, [], "x"],
+        "extra": [1, 2.5e3, None, True],
+    }
+    data = json.dumps(body, ensure_ascii=False, indent=1).encode()
+    for size in (1, 3, 7, 1024):
+        pagination = Pagination(next_page={"stale": True})
+        items = list(_iter_page_items(chunked(data, size), pagination))
+        assert items == body["result"]
+        assert pagination.next_page is None
+
+    pagination = Pagination(next_page=None)
+    data = b'{"result": [], "pagination": {"next_page": {"offset": "2"}}}'
+    assert list(_iter_page_items(chunked(data, 5), pagination)) == []
+    assert pagination.next_page == {"offset": "2"}
+
+
+def test_truncated_body_raises():
+    with pytest.raises(json.JSONDecodeError):
+        list(_iter_page_items([b'{"result": [{"a": 1}, {"b"'], Pagination(None)))
+
+
+def test_streaming_client_paginates():
+    server = MockServer()
+    server.seed(rfqs=250)
+    client = Client(server.key, server.secret, transport=server, stream=True)
+
+    page = client.get_rfqs_received()
+    assert not isinstance(page.result, list)
+    assert len(list(page.result)) == 100
+    assert page.pagination.next_page is not None
+
+    expected = [r["rfq_id"] for r in server.rfqs_received]
+    for fn in (paginate, paginate_pipelined):
+        assert [r["rfq_id"] for r in fn(client.get_rfqs_received)] == expected
+    assert client.get_me().result["company_id"] == server.company
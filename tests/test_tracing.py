@@ -0,0 +1,61 @@
+from contextlib import contextmanager
+
+from variational import Client, MockServer, paginate, paginate_pipelined
+
+
+class FakeSpan:
+    def __init__(self, name, attributes):
+        self.name = name
+        self.attributes = dict(attributes or {})
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def set_attributes(self, attributes):
+        self.attributes.update(attributes)
+
+
+class FakeTracer:
+    def __init__(self):
+        self.spans = []
+
+    @contextmanager
+    def start_as_current_span(self, name, attributes=None):
+        span = FakeSpan(name, attributes)
+        self.spans.append(span)
+        yield span
+
+
+def test_spans_for_calls_attempts_and_pages():
+    server = MockServer(rate_limit_every=3, rate_limit_reset_ms=1)
+    server.seed(rfqs=5)
+    tracer = FakeTracer()
+    client = Client(server.key, server.secret, transport=server, tracer=tracer)
+
+    items = list(paginate(client.get_rfqs_received, page={"limit": "2"}))
+    assert len(items) == 5
+
+    names = [s.name for s in tracer.spans]
+    assert names.count("variational.paginate.page") == 3
+    assert names.count("variational GET /rfqs/received") == 3
+    # one of the four requests was rate limited and retried
+    attempts = [s for s in tracer.spans if s.name == "variational.http_attempt"]
+    assert len(attempts) == 4
+    limited = [a for a in attempts if a.attributes["http.response.status_code"] == 429]
+    assert limited[0].attributes["variational.rate_limit_resets_in_s"] == 0.001
+    assert limited[0].attributes["variational.backoff_s"] > 0
+
+
+def test_spans_for_streamed_pages():
+    server = MockServer()
+    server.seed(rfqs=150)
+    tracer = FakeTracer()
+    client = Client(
+        server.key, server.secret, transport=server, tracer=tracer, stream=True
+    )
+
+    for fn in (paginate, paginate_pipelined):
+        assert len(list(fn(client.get_rfqs_received))) == 150
+    pages = [s for s in tracer.spans if s.name == "variational.paginate.page"]
+    assert len(pages) == 4
+    assert all("variational.items" not in s.attributes for s in pages)
@@ -0,0 +1,80 @@
+import pytest
+
+from variational import Client, MockServer, SettlementWorkflow
+from variational.models import ClearingStatus, RequestAction
+from variational.polling import UnexpectedStatus
+
+
+def _setup(quotes: int):
+    server = MockServer()
+    server.seed(rfqs=1)
+    client = Client(server.key, server.secret, transport=server)
+    rfq = server.rfqs_received[0]
+    for _ in range(quotes):
+        server.quotes.append(server.make_quote(rfq, bid="1", ask="2"))
+    return server, client, rfq
+
+
+@pytest.mark.parametrize("batch_threshold", [0, 10])
+def test_workflow_runs_lifecycles_to_booking(batch_threshold):
+    server, client, rfq = _setup(quotes=3)
+    last_looks = []
+
+    def last_look(quote):
+        last_looks.append(quote["parent_quote_id"])
+        action = RequestAction.REJECT if len(last_looks) == 3 else RequestAction.ACCEPT
+        client.maker_last_look(quote["target_rfq_id"], quote["parent_quote_id"], action)
+
+    workflow = SettlementWorkflow(
+        client,
+        handlers={ClearingStatus.PENDING_MAKER_LAST_LOOK: last_look},
+        interval=0.01,
+        batch_threshold=batch_threshold,
+    )
+    workflow.start()
+    try:
+        futures = [
+            workflow.accept(rfq["rfq_id"], quote["parent_quote_id"], "buy")
+            for quote in server.quotes
+        ]
+        outcomes = []
+        for future in futures:
+            try:
+                outcomes.append(future.result(timeout=5)["clearing_status"])
+            except UnexpectedStatus as e:
+                outcomes.append(e.status)
+    finally:
+        workflow.stop()
+
+    assert sorted(outcomes) == [
+        ClearingStatus.REJECTED_MAKER_LAST_LOOK_REJECTED,
+        ClearingStatus.SUCCESS_TRADES_BOOKED_INTO_POOL,
+        ClearingStatus.SUCCESS_TRADES_BOOKED_INTO_POOL,
+    ]
+    assert len(last_looks) == 3
+    assert workflow.pending() == []
+
+
+def test_workflow_can_be_restarted():
+    server, client, rfq = _setup(quotes=2)
+
+    def last_look(quote):
+        client.maker_last_look(
+            quote["target_rfq_id"], quote["parent_quote_id"], RequestAction.ACCEPT
+        )
+
+    workflow = SettlementWorkflow(
+        client,
+        handlers={ClearingStatus.PENDING_MAKER_LAST_LOOK: last_look},
+        interval=0.01,
+    )
+    for quote in server.quotes:
+        workflow.start()
+        try:
+            future = workflow.accept(rfq["rfq_id"], quote["parent_quote_id"], "buy")
+            booked = future.result(timeout=5)
+        finally:
+            workflow.stop()
+        assert (
+            booked["clearing_status"] == ClearingStatus.SUCCESS_TRADES_BOOKED_INTO_POOL
+        )
@@ -1,8 +1,56 @@
-from .client import Client, TESTNET, MAINNET
+import importlib
+
+from .client import Client, RetryPolicy, TESTNET, MAINNET
+from .transport import Transport, SessionTransport
+from .metrics import RequestRecord, LatencyHistogram, CompressionStats
+from .ratelimit import RateLimitTracker, RateLimitBucket
 from .auth import sign_prepared_request
-from .paginate import paginate
+from .clock import ClockSync
+from .fixed import FixedDecimal, requirements_scale
+from .paginate import paginate, paginate_pipelined
 from .models import *
 from .wrappers import *
 from .rounding import *
 from .polling import PollingHelper
-from .permit import TransferPermitHelper
+
+# imported on first access (PEP 562), so that `import variational` doesn't pay
+# for eth_account and other components that many programs never use
+_LAZY_IMPORTS = {
+    "TransferPermitHelper": ".permit",
+    "PermitResult": ".permit",
+    "PermitSigner": ".permit",
+    "StructurePricer": ".pricing",
+    "combine_leg_prices": ".pricing",
+    "instrument_key": ".pricing",
+    "RFQFeed": ".feed",
+    "RFQEvent": ".feed",
+    "RFQEventType": ".feed",
+    "QuoteManager": ".quoting",
+    "SettlementWorkflow": ".workflow",
+    "MockServer": ".mock",
+    "ClientPool": ".accounts",
+    "ResponseProcessor": ".processing",
+    "PositionColumns": ".processing",
+    "RFQColumns": ".processing",
+    "HedgingTransport": ".hedging",
+    "HedgeBudget": ".hedging",
+    "Compression": ".compression",
+    "SimpleMarginCalculator": ".margin",
+    "structure_legs": ".margin",
+    "PortfolioMarginCalculator": ".margin",
+    "GreeksAggregator": ".greeks",
+    "QuoteBook": ".quotebook",
+}
+
+
+def __getattr__(name):
+    module = _LAZY_IMPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
@@ -0,0 +1,113 @@
+import threading
+from typing import Dict, Iterator, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .client import Client, RetryPolicy, MAINNET
+from .clock import ClockSync
+from .compression import Compression
+from .metrics import RequestHook
+from .transport import SessionTransport, Transport
+
+
+class ClientPool(object):
+    """
+    Hands out one `Client` per API key, all sharing a single transport (and so
+    a single HTTP connection pool) and server clock estimate. Requests are
+    still signed with each key's own secret, while sockets and memory stay
+    flat as accounts are added.
+
+        pool = ClientPool(base_url=TESTNET)
+        client = pool.client(key, secret)
+
+    Rate limits are not enforced by the pool. Every client tracks its own
+    `rate_limits` and, with `retry_rate_limits`, backs off on its own 429
+    responses, so one throttled key doesn't hold up the others; callers
+    that want to shed work ahead of a limit consult
+    `pool.client(key, secret).rate_limits.should_throttle(endpoint)`.
+    """
+
+    def __init__(
+        self,
+        base_url: str = MAINNET,
+        request_timeout: Optional[float] = None,
+        retry_rate_limits=True,
+        transport: Optional[Transport] = None,
+        hooks: Optional[List[RequestHook]] = None,
+        tracer=None,
+        max_connections: int = 10,
+        connect_timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        stream: bool = False,
+        compression: Optional[Compression] = None,
+        intern: bool = False,
+    ):
+        if transport is None:
+            session = requests.session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_connections)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            transport = SessionTransport(session)
+        self.transport = transport
+        self.base_url = base_url
+        self.request_timeout = request_timeout
+        self.retry_rate_limits = retry_rate_limits
+        self.hooks = list(hooks or [])
+        self.tracer = tracer
+        self.connect_timeout = connect_timeout
+        self.deadline = deadline
+        self.retry_policy = retry_policy
+        self.stream = stream
+        self.compression = compression
+        self.intern = intern
+        self.clock = ClockSync()
+        self.__clients: Dict[str, Client] = {}
+        self.__lock = threading.Lock()
+
+    def client(self, key: str, secret: str) -> Client:
+        """
+        Returns the client of `key`, creating it on first use.
+        """
+        with self.__lock:
+            client = self.__clients.get(key)
+            if client is None or client.secret != secret:
+                client = Client(
+                    key,
+                    secret,
+                    base_url=self.base_url,
+                    request_timeout=self.request_timeout,
+                    retry_rate_limits=self.retry_rate_limits,
+                    transport=self.transport,
+                    hooks=self.hooks,
+                    clock=self.clock,
+                    tracer=self.tracer,
+                    connect_timeout=self.connect_timeout,
+                    deadline=self.deadline,
+                    retry_policy=self.retry_policy,
+                    stream=self.stream,
+                    compression=self.compression,
+                    intern=self.intern,
+                )
+                self.__clients[key] = client
+            return client
+
+    def __getitem__(self, key: str) -> Client:
+        return self.__clients[key]
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.__clients
+
+    def __iter__(self) -> Iterator[Client]:
+        return iter(list(self.__clients.values()))
+
+    def __len__(self):
+        return len(self.__clients)
+
+    def remove(self, key: str) -> Optional[Client]:
+        with self.__lock:
+            return self.__clients.pop(key, None)
+
+    def close(self):
+        self.transport.close()
@@ -2,13 +2,19 @@ import hashlib
 import hmac
 import time
 
+from typing import Optional
+
 import requests
 
 
 def sign_prepared_request(
-    req: requests.PreparedRequest, key: str, secret: str
+    req: requests.PreparedRequest,
+    key: str,
+    secret: str,
+    timestamp_ms: Optional[int] = None,
 ) -> requests.PreparedRequest:
-    timestamp_ms = int(time.time() * 1000)
+    if timestamp_ms is None:
+        timestamp_ms = int(time.time() * 1000)
     message = f"{key}|{timestamp_ms}|{req.method}|{req.path_url}"
     signer = hmac.new(bytes.fromhex(secret), message.encode(), hashlib.sha256)
 
@@ -1,12 +1,21 @@
+import functools
 import logging
 import random
 import time
-from typing import Optional, Dict, Mapping, List
+from dataclasses import dataclass
+from typing import Optional, Dict, Mapping, List, Tuple, Collection, Type
 from urllib.parse import urlencode
 
 import requests
 
 from .auth import sign_prepared_request
+from .clock import ClockSync
+from .tracing import start_span
+from .ratelimit import RateLimitTracker, RATE_LIMIT_RESET_MS_HEADER
+from .transport import Transport, SessionTransport, Timeout
+from .compression import Compression
+from .interning import intern_values
+from .metrics import RequestRecord, RequestHook
 from .models import (
     StrDecimal,
     DateTimeRFC3339,
@@ -42,9 +51,16 @@ from .models import (
     Instrument,
     InstrumentPrice,
 )
-from .wrappers import ApiSingle, ApiList, ApiPage, ApiError
+from .wrappers import (
+    ApiSingle,
+    ApiList,
+    ApiPage,
+    ApiError,
+    DeadlineExceeded,
+    _decode_json,
+    _get_request_received_timestamp,
+)
 
-RATE_LIMIT_RESET_MS_HEADER = "x-rate-limit-resets-in-ms"
 MAINNET = "https://api.variational.io/v1"
 TESTNET = "https://api.testnet.variational.io/v1"
 
@@ -57,17 +73,63 @@ class Client(object):
         base_url: str = MAINNET,
         request_timeout: Optional[float] = None,
         retry_rate_limits=True,
+        transport: Optional[Transport] = None,
+        hooks: Optional[List[RequestHook]] = None,
+        clock: Optional[ClockSync] = None,
+        tracer=None,
+        connect_timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
+        retry_policy: Optional["RetryPolicy"] = None,
+        stream: bool = False,
+        compression: Optional[Compression] = None,
+        intern: bool = False,
+        max_rate_limit_wait: Optional[float] = 300.0,
     ):
-        self.sesh = requests.session()
+        if transport is None:
+            self.sesh = requests.session()
+            transport = SessionTransport(self.sesh)
+        else:
+            self.sesh = getattr(transport, "session", None)
+        self.transport = transport
         self.key = key
         self.secret = secret
         self.base_url = base_url
         self.logger = logging.getLogger(__name__)
         self.request_timeout = request_timeout
+        # connecting may be given less time than reading, defaults to the same
+        self.connect_timeout = connect_timeout
+        # seconds a whole call may take including retries, unless overridden
+        # by the `deadline` argument of a method
+        self.deadline = deadline
+        self.retry_policy = retry_policy or RetryPolicy()
+        # pages yield their items while the body is still being downloaded
+        self.stream = stream
+        self.compression = compression or Compression()
+        # decoded identifiers are interned and enum values mapped to members
+        self.intern = intern
         self.retry_rate_limits = retry_rate_limits
+        # seconds a call may wait in total for rate limits to reset, the 429
+        # is raised once the next wait would exceed it, None waits forever
+        self.max_rate_limit_wait = max_rate_limit_wait
+        self.hooks: List[RequestHook] = list(hooks or [])
+        # server clock estimate used for request timestamps and expiries
+        self.clock = clock or ClockSync()
+        # optional OpenTelemetry-compatible tracer, e.g. trace.get_tracer(...)
+        self.tracer = tracer
+        self.rate_limits = RateLimitTracker()
+
+    def add_hook(self, hook: RequestHook):
+        """
+        Registers a callback receiving a `RequestRecord` for every HTTP attempt.
+        """
+        self.hooks.append(hook)
 
     def accept_quote(
-        self, rfq_id: UUIDv4, parent_quote_id: UUIDv4, side: TradeSide
+        self,
+        rfq_id: UUIDv4,
+        parent_quote_id: UUIDv4,
+        side: TradeSide,
+        deadline: Optional[float] = None,
     ) -> ApiSingle[QuoteAcceptResponse]:
         payload = {
             "parent_quote_id": parent_quote_id,
@@ -77,27 +139,44 @@ class Client(object):
 
         return ApiSingle.from_response(
             self.__send_request(
-                endpoint="/quotes/accept", method="POST", payload=payload
+                endpoint="/quotes/accept",
+                method="POST",
+                payload=payload,
+                deadline=deadline,
             )
         )
 
-    def cancel_all_quotes(self) -> ApiSingle[bool]:
+    def cancel_all_quotes(self, deadline: Optional[float] = None) -> ApiSingle[bool]:
         return ApiSingle.from_response(
-            self.__send_request(endpoint="/quotes/cancel_all", method="POST")
+            self.__send_request(
+                endpoint="/quotes/cancel_all", method="POST", deadline=deadline
+            )
         )
 
-    def cancel_quote(self, id: UUIDv4) -> ApiSingle[bool]:
+    def cancel_quote(
+        self, id: UUIDv4, deadline: Optional[float] = None
+    ) -> ApiSingle[bool]:
         payload = {"id": id}
         return ApiSingle.from_response(
             self.__send_request(
-                endpoint="/quotes/cancel", method="POST", payload=payload
+                endpoint="/quotes/cancel",
+                method="POST",
+                payload=payload,
+                deadline=deadline,
             )
         )
 
-    def cancel_rfq(self, id: UUIDv4) -> ApiSingle[bool]:
+    def cancel_rfq(
+        self, id: UUIDv4, deadline: Optional[float] = None
+    ) -> ApiSingle[bool]:
         payload = {"id": id}
         return ApiSingle.from_response(
-            self.__send_request(endpoint="/rfqs/cancel", method="POST", payload=payload)
+            self.__send_request(
+                endpoint="/rfqs/cancel",
+                method="POST",
+                payload=payload,
+                deadline=deadline,
+            )
         )
 
     def create_quote(
@@ -107,6 +186,7 @@ class Client(object):
         leg_quotes: List[LegQuote],
         pool_strategy: PoolStrategy,
         client_quote_id: Optional[str] = None,
+        deadline: Optional[float] = None,
     ) -> ApiSingle[Quote]:
         payload = {
             "rfq_id": rfq_id,
@@ -117,7 +197,12 @@ class Client(object):
         }
 
         return ApiSingle.from_response(
-            self.__send_request(endpoint="/quotes/new", method="POST", payload=payload)
+            self.__send_request(
+                endpoint="/quotes/new",
+                method="POST",
+                payload=payload,
+                deadline=deadline,
+            )
         )
 
     def create_rfq(
@@ -126,6 +211,7 @@ class Client(object):
         qty: StrDecimal,
         expires_at: DateTimeRFC3339,
         target_companies: List[UUIDv4],
+        deadline: Optional[float] = None,
     ) -> ApiSingle[RFQ]:
         payload = {
             "structure": structure,
@@ -135,7 +221,9 @@ class Client(object):
         }
 
         return ApiSingle.from_response(
-            self.__send_request(endpoint="/rfqs/new", method="POST", payload=payload)
+            self.__send_request(
+                endpoint="/rfqs/new", method="POST", payload=payload, deadline=deadline
+            )
         )
 
     def create_settlement_pool(
@@ -144,6 +232,7 @@ class Client(object):
         company_other: UUIDv4,
         creator_params: MarginParams,
         other_params: MarginParams,
+        deadline: Optional[float] = None,
     ) -> ApiSingle[SettlementPool]:
         payload = {
             "pool_name": pool_name,
@@ -153,7 +242,10 @@ class Client(object):
         }
         return ApiSingle.from_response(
             self.__send_request(
-                endpoint="/settlement_pools/new", method="POST", payload=payload
+                endpoint="/settlement_pools/new",
+                method="POST",
+                payload=payload,
+                deadline=deadline,
             )
         )
 
@@ -164,6 +256,7 @@ class Client(object):
         target_pool_location: UUIDv4,
         counterparty: UUIDv4,
         transfer_type: TransferType,
+        deadline: Optional[float] = None,
     ) -> ApiSingle[Transfer]:
         payload = {
             "asset": asset,
@@ -174,7 +267,10 @@ class Client(object):
         }
         return ApiSingle.from_response(
             self.__send_request(
-                endpoint="/transfers/new", method="POST", payload=payload
+                endpoint="/transfers/new",
+                method="POST",
+                payload=payload,
+                deadline=deadline,
             )
         )
 
@@ -183,6 +279,7 @@ class Client(object):
         pool_address: H160,
         allowance: Allowance,
         seconds_until_expiry: Optional[int] = None,
+        deadline: Optional[float] = None,
     ) -> ApiSingle[dict]:
         payload = {
             "pool_address": pool_address,
@@ -191,66 +288,98 @@ class Client(object):
         }
         return ApiSingle.from_response(
             self.__send_request(
-                endpoint="/transfers/permit/template", method="POST", payload=payload
+                endpoint="/transfers/permit/template",
+                method="POST",
+                payload=payload,
+                deadline=deadline,
             )
         )
 
-    def get_addresses(self, company: Optional[UUIDv4] = None) -> ApiList[Address]:
+    def get_addresses(
+        self, company: Optional[UUIDv4] = None, deadline: Optional[float] = None
+    ) -> ApiList[Address]:
         f = {}
         if company:
             f["company"] = company
         return ApiList.from_response(
-            self.__send_request(endpoint="/addresses", filter=f)
+            self.__send_request(endpoint="/addresses", filter=f, deadline=deadline)
         )
 
     def get_companies(
-        self, id: Optional[UUIDv4] = None, page: Optional[Dict] = None
+        self,
+        id: Optional[UUIDv4] = None,
+        page: Optional[Dict] = None,
+        deadline: Optional[float] = None,
     ) -> ApiPage[Company]:
         filter = {}
         if id:
             filter["id"] = id
         return ApiPage.from_response(
-            self.__send_request(endpoint="/companies", filter=filter, page=page)
+            self.__send_request(
+                endpoint="/companies", filter=filter, page=page, deadline=deadline
+            )
         )
 
-    def get_limits(self) -> ApiSingle[LimitsResponse]:
-        return ApiSingle.from_response(self.__send_request(endpoint="/metadata/limits"))
+    def get_limits(self, deadline: Optional[float] = None) -> ApiSingle[LimitsResponse]:
+        return ApiSingle.from_response(
+            self.__send_request(endpoint="/metadata/limits", deadline=deadline)
+        )
 
-    def get_me(self) -> ApiSingle[AuthContext]:
-        return ApiSingle.from_response(self.__send_request(endpoint="/me"))
+    def get_me(self, deadline: Optional[float] = None) -> ApiSingle[AuthContext]:
+        return ApiSingle.from_response(
+            self.__send_request(endpoint="/me", deadline=deadline)
+        )
 
     def get_portfolio_aggregated_positions(
-        self, page: Optional[Dict] = None
+        self, page: Optional[Dict] = None, deadline: Optional[float] = None
     ) -> ApiPage[AggregatedPosition]:
         return ApiPage.from_response(
-            self.__send_request(endpoint="/portfolio/positions/aggregated", page=page)
+            self.__send_request(
+                endpoint="/portfolio/positions/aggregated", page=page, deadline=deadline
+            )
         )
 
     def get_portfolio_assets(
-        self, pool: Optional[UUIDv4] = None, page: Optional[Dict] = None
+        self,
+        pool: Optional[UUIDv4] = None,
+        page: Optional[Dict] = None,
+        deadline: Optional[float] = None,
     ) -> ApiPage[Asset]:
         filter = {}
         if pool:
             filter["pool"] = pool
         return ApiPage.from_response(
-            self.__send_request(endpoint="/portfolio/assets", filter=filter, page=page)
+            self.__send_request(
+                endpoint="/portfolio/assets",
+                filter=filter,
+                page=page,
+                deadline=deadline,
+            )
         )
 
     def get_portfolio_positions(
-        self, pool: Optional[UUIDv4] = None, page: Optional[Dict] = None
+        self,
+        pool: Optional[UUIDv4] = None,
+        page: Optional[Dict] = None,
+        deadline: Optional[float] = None,
     ) -> ApiPage[Position]:
         filter = {}
         if pool:
             filter["pool"] = pool
         return ApiPage.from_response(
             self.__send_request(
-                endpoint="/portfolio/positions", filter=filter, page=page
+                endpoint="/portfolio/positions",
+                filter=filter,
+                page=page,
+                deadline=deadline,
             )
         )
 
-    def get_portfolio_summary(self) -> ApiSingle[PortfolioSummary]:
+    def get_portfolio_summary(
+        self, deadline: Optional[float] = None
+    ) -> ApiSingle[PortfolioSummary]:
         return ApiSingle.from_response(
-            self.__send_request(endpoint="/portfolio/summary")
+            self.__send_request(endpoint="/portfolio/summary", deadline=deadline)
         )
 
     def get_portfolio_trades(
@@ -258,6 +387,7 @@ class Client(object):
         pool: Optional[UUIDv4] = None,
         id: Optional[UUIDv4] = None,
         page: Optional[Dict] = None,
+        deadline: Optional[float] = None,
     ) -> ApiPage[Trade]:
         filter = {}
         if pool:
@@ -265,7 +395,12 @@ class Client(object):
         if id:
             filter["id"] = id
         return ApiPage.from_response(
-            self.__send_request(endpoint="/portfolio/trades", filter=filter, page=page)
+            self.__send_request(
+                endpoint="/portfolio/trades",
+                filter=filter,
+                page=page,
+                deadline=deadline,
+            )
         )
 
     def get_transfers(
@@ -273,6 +408,7 @@ class Client(object):
         pool: Optional[UUIDv4] = None,
         id: Optional[UUIDv4] = None,
         page: Optional[Dict] = None,
+        deadline: Optional[float] = None,
     ) -> ApiPage[Transfer]:
         filter = {}
         if pool:
@@ -280,37 +416,54 @@ class Client(object):
         if id:
             filter["id"] = id
         return ApiPage.from_response(
-            self.__send_request(endpoint="/transfers", filter=filter, page=page)
+            self.__send_request(
+                endpoint="/transfers", filter=filter, page=page, deadline=deadline
+            )
         )
 
     def get_quotes(
-        self, id: Optional[UUIDv4] = None, page: Optional[Dict] = None
+        self,
+        id: Optional[UUIDv4] = None,
+        page: Optional[Dict] = None,
+        deadline: Optional[float] = None,
     ) -> ApiPage[Quote]:
         filter = {}
         if id:
             filter["id"] = id
         return ApiPage.from_response(
-            self.__send_request(endpoint="/quotes", filter=filter, page=page)
+            self.__send_request(
+                endpoint="/quotes", filter=filter, page=page, deadline=deadline
+            )
         )
 
     def get_quotes_received(
-        self, id: Optional[UUIDv4] = None, page: Optional[Dict] = None
+        self,
+        id: Optional[UUIDv4] = None,
+        page: Optional[Dict] = None,
+        deadline: Optional[float] = None,
     ) -> ApiPage[Quote]:
         filter = {}
         if id:
             filter["id"] = id
         return ApiPage.from_response(
-            self.__send_request(endpoint="/quotes/received", filter=filter, page=page)
+            self.__send_request(
+                endpoint="/quotes/received", filter=filter, page=page, deadline=deadline
+            )
         )
 
     def get_quotes_sent(
-        self, id: Optional[UUIDv4] = None, page: Optional[Dict] = None
+        self,
+        id: Optional[UUIDv4] = None,
+        page: Optional[Dict] = None,
+        deadline: Optional[float] = None,
     ) -> ApiPage[Quote]:
         filter = {}
         if id:
             filter["id"] = id
         return ApiPage.from_response(
-            self.__send_request(endpoint="/quotes/sent", filter=filter, page=page)
+            self.__send_request(
+                endpoint="/quotes/sent", filter=filter, page=page, deadline=deadline
+            )
         )
 
     def get_rfqs_received(
@@ -318,6 +471,7 @@ class Client(object):
         id: Optional[UUIDv4] = None,
         page: Optional[Dict] = None,
         price: Optional[bool] = None,
+        deadline: Optional[float] = None,
     ) -> ApiPage[RFQ]:
         filter = {}
         if id:
@@ -327,7 +481,9 @@ class Client(object):
         else:
             filter["price"] = "false"
         return ApiPage.from_response(
-            self.__send_request(endpoint="/rfqs/received", filter=filter, page=page)
+            self.__send_request(
+                endpoint="/rfqs/received", filter=filter, page=page, deadline=deadline
+            )
         )
 
     def get_rfqs_sent(
@@ -335,6 +491,7 @@ class Client(object):
         id: Optional[UUIDv4] = None,
         page: Optional[Dict] = None,
         price: Optional[bool] = None,
+        deadline: Optional[float] = None,
     ) -> ApiPage[RFQ]:
         filter = {}
         if id:
@@ -344,34 +501,52 @@ class Client(object):
         else:
             filter["price"] = "false"
         return ApiPage.from_response(
-            self.__send_request(endpoint="/rfqs/sent", filter=filter, page=page)
+            self.__send_request(
+                endpoint="/rfqs/sent", filter=filter, page=page, deadline=deadline
+            )
         )
 
     def get_settlement_pools(
-        self, id: Optional[UUIDv4] = None, page: Optional[Dict] = None
+        self,
+        id: Optional[UUIDv4] = None,
+        page: Optional[Dict] = None,
+        deadline: Optional[float] = None,
     ) -> ApiPage[SettlementPool]:
         filter = {}
         if id:
             filter["id"] = id
         return ApiPage.from_response(
-            self.__send_request(endpoint="/settlement_pools", filter=filter, page=page)
+            self.__send_request(
+                endpoint="/settlement_pools",
+                filter=filter,
+                page=page,
+                deadline=deadline,
+            )
         )
 
-    def get_status(self) -> ApiSingle[Status]:
-        return ApiSingle.from_response(self.__send_request(endpoint="/status"))
+    def get_status(self, deadline: Optional[float] = None) -> ApiSingle[Status]:
+        return ApiSingle.from_response(
+            self.__send_request(endpoint="/status", deadline=deadline)
+        )
 
     def get_supported_assets(
-        self, verified: Optional[bool] = False
+        self, verified: Optional[bool] = False, deadline: Optional[float] = None
     ) -> ApiSingle[Dict[AssetToken, List[SupportedAssetDetails]]]:
         filter = {}
         if verified:
             filter["verified"] = "true"
         return ApiSingle.from_response(
-            self.__send_request(endpoint="/metadata/supported_assets", filter=filter)
+            self.__send_request(
+                endpoint="/metadata/supported_assets", filter=filter, deadline=deadline
+            )
         )
 
     def maker_last_look(
-        self, rfq_id: UUIDv4, parent_quote_id: UUIDv4, action: RequestAction
+        self,
+        rfq_id: UUIDv4,
+        parent_quote_id: UUIDv4,
+        action: RequestAction,
+        deadline: Optional[float] = None,
     ) -> ApiSingle[MakerLastLookResponse]:
         payload = {
             "parent_quote_id": parent_quote_id,
@@ -380,23 +555,34 @@ class Client(object):
         }
         return ApiSingle.from_response(
             self.__send_request(
-                endpoint="/quotes/maker_last_look", method="POST", payload=payload
+                endpoint="/quotes/maker_last_look",
+                method="POST",
+                payload=payload,
+                deadline=deadline,
             )
         )
 
-    def price_instrument(self, instrument: Instrument) -> ApiSingle[InstrumentPrice]:
+    def price_instrument(
+        self, instrument: Instrument, deadline: Optional[float] = None
+    ) -> ApiSingle[InstrumentPrice]:
         return ApiSingle.from_response(
             self.__send_request(
-                endpoint="/price/instrument", method="POST", payload=instrument
+                endpoint="/price/instrument",
+                method="POST",
+                payload=instrument,
+                deadline=deadline,
             )
         )
 
     def price_structure(
-        self, structure: Structure
+        self, structure: Structure, deadline: Optional[float] = None
     ) -> ApiSingle[StructurePriceResponse]:
         return ApiSingle.from_response(
             self.__send_request(
-                endpoint="/price/structure", method="POST", payload=structure
+                endpoint="/price/structure",
+                method="POST",
+                payload=structure,
+                deadline=deadline,
             )
         )
 
@@ -408,6 +594,7 @@ class Client(object):
         leg_quotes: List[LegQuote],
         pool_strategy: PoolStrategy,
         client_quote_id: Optional[str] = None,
+        deadline: Optional[float] = None,
     ) -> ApiSingle[Quote]:
         payload = {
             "parent_quote_id": parent_quote_id,
@@ -420,21 +607,52 @@ class Client(object):
 
         return ApiSingle.from_response(
             self.__send_request(
-                endpoint="/quotes/replace", method="POST", payload=payload
+                endpoint="/quotes/replace",
+                method="POST",
+                payload=payload,
+                deadline=deadline,
             )
         )
 
-    def submit_transfer_permit(self, message: dict, signature: str) -> ApiSingle[bool]:
+    def submit_transfer_permit(
+        self, message: dict, signature: str, deadline: Optional[float] = None
+    ) -> ApiSingle[bool]:
         payload = {
             "message": message,
             "signature": signature,
         }
         return ApiSingle.from_response(
             self.__send_request(
-                endpoint="/transfers/permit", method="POST", payload=payload
+                endpoint="/transfers/permit",
+                method="POST",
+                payload=payload,
+                deadline=deadline,
             )
         )
 
+    def send_raw(
+        self,
+        endpoint: str,
+        method: str = "GET",
+        payload: Optional[Dict | List] = None,
+        filter: Optional[Dict] = None,
+        page: Optional[Dict] = None,
+        deadline: Optional[float] = None,
+    ) -> requests.Response:
+        """
+        Sends a signed request like the other methods do, with the same retry
+        behaviour, but returns the HTTP response without decoding its body.
+        """
+        return self.__send_request(
+            endpoint=endpoint,
+            method=method,
+            payload=payload,
+            filter=filter,
+            page=page,
+            decode=False,
+            deadline=deadline,
+        )
+
     def __send_request(
         self,
         endpoint: str,
@@ -442,6 +660,8 @@ class Client(object):
         payload: Optional[Dict | List] = None,
         filter: Optional[Dict] = None,
         page: Optional[Dict] = None,
+        decode: bool = True,
+        deadline: Optional[float] = None,
     ) -> requests.Response:
         params = {}
         if filter:
@@ -453,37 +673,315 @@ class Client(object):
         backoff = ExpBackoff()
 
         full_url = self.base_url + endpoint + qs
-        while True:
-            req = requests.Request(method=method, url=full_url, json=payload).prepare()
-            resp = self.sesh.send(
-                sign_prepared_request(req, self.key, self.secret),
-                timeout=self.request_timeout,
-            )
+        if deadline is None:
+            deadline = self.deadline
+        deadline_at = time.monotonic() + deadline if deadline is not None else None
+        attempt = 0
+        wait_time = 0.0
+        total_wait_time = 0.0
+        rate_limit_wait = 0.0
+        with start_span(
+            self.tracer,
+            f"variational {method} {endpoint}",
+            {"http.request.method": method, "url.full": full_url},
+        ) as call_span:
+            while True:
+                if wait_time:
+                    if deadline_at is not None and (
+                        time.monotonic() + wait_time >= deadline_at
+                    ):
+                        # fail now rather than sleep only to run out of time
+                        raise DeadlineExceeded(full_url, deadline, attempt)
+                    time.sleep(wait_time)
+                    total_wait_time += wait_time
+                timeout = self.__attempt_timeout(
+                    full_url, deadline, deadline_at, attempt
+                )
+                attempt += 1
+                if call_span is not None:
+                    call_span.set_attributes(
+                        {
+                            "variational.attempts": attempt,
+                            "variational.wait_time_s": total_wait_time,
+                        }
+                    )
 
-            if resp.status_code == 200:
-                return resp
+                with start_span(
+                    self.tracer,
+                    "variational.http_attempt",
+                    {"variational.attempt": attempt},
+                ) as span:
+                    try:
+                        resp, retry_delay = self.__attempt(
+                            endpoint,
+                            method,
+                            full_url,
+                            payload,
+                            attempt,
+                            wait_time,
+                            backoff,
+                            span,
+                            decode,
+                            timeout,
+                            rate_limit_wait,
+                        )
+                    except requests.Timeout as e:
+                        # the attempt was cut short by the deadline
+                        if deadline_at is not None and time.monotonic() >= deadline_at:
+                            raise DeadlineExceeded(full_url, deadline, attempt) from e
+                        raise
+                if retry_delay is None:
+                    return resp
+                if resp is not None and resp.status_code == 429:
+                    rate_limit_wait += retry_delay
+                wait_time = retry_delay
+
+    def __attempt(
+        self,
+        endpoint: str,
+        method: str,
+        full_url: str,
+        payload: Optional[Dict | List],
+        attempt: int,
+        wait_time: float,
+        backoff: "ExpBackoff",
+        span,
+        decode: bool = True,
+        timeout: Timeout = None,
+        rate_limit_wait: float = 0.0,
+    ) -> Tuple[Optional[requests.Response], Optional[float]]:
+        """
+        Sends the request once, returning the response and, if the request
+        should be retried, the delay before the next attempt.
+        """
+        started = time.perf_counter()
+        req = requests.Request(method=method, url=full_url, json=payload).prepare()
+        request_bytes_saved = self.compression.prepare(req)
+        signed = sign_prepared_request(req, self.key, self.secret, self.clock.now_ms())
+        signed_at = time.perf_counter()
+        sent_at = time.time()
+        try:
+            if self.stream:
+                resp = self.transport.send(signed, timeout=timeout, stream=True)
+                resp._variational_stream = True
+            else:
+                resp = self.transport.send(signed, timeout=timeout)
+        except Exception as e:
+            retry = self.retry_policy.should_retry(method, attempt, error=e)
+            delay = backoff.next_delay() if retry else None
+            if self.hooks:
+                self.__emit(
+                    endpoint,
+                    attempt,
+                    signed,
+                    None,
+                    wait_time,
+                    retry_delay=delay,
+                    error=e,
+                    request_bytes_saved=request_bytes_saved,
+                )
+            if not retry:
+                raise
+            self.logger.warning(
+                "%s %s failed with %r, will retry after delay: %.3fs",
+                method,
+                endpoint,
+                e,
+                delay,
+            )
+            return None, delay
+        received_at = time.perf_counter()
+        if self.intern:
+            resp._variational_object_hook = intern_values
+        self.__observe_clock(resp, sent_at)
+        self.rate_limits.observe(endpoint, resp.status_code, resp.headers)
+        if span is not None:
+            span.set_attribute("http.response.status_code", resp.status_code)
+        timings = dict(
+            wait_time=wait_time,
+            sign_time=signed_at - started,
+            network_time=received_at - signed_at,
+            sent_at=sent_at,
+            request_bytes_saved=request_bytes_saved,
+        )
 
-            if self.retry_rate_limits and resp.status_code == 429:
-                if resets_in := _get_rate_limit_reset_timestamp(resp.headers):
-                    # delay for at least the amount specified in the header
-                    # add an extra delay that's slowly increasing with each attempt
-                    delay = resets_in + backoff.next_delay()
+        if resp.status_code == 200:
+            if self.hooks:
+                if decode and self.stream:
+                    # sizes are known once the body has been read, the record
+                    # is emitted then, see `wrappers._response_consumed`
+                    resp._variational_emit = functools.partial(
+                        self.__emit, endpoint, attempt, signed, resp, **timings
+                    )
+                    return resp, None
+                if decode:
+                    _decode_json(resp)
+                    timings["decode_time"] = time.perf_counter() - received_at
+                self.__emit(endpoint, attempt, signed, resp, **timings)
+            return resp, None
 
-                    self.logger.warning(
-                        "HTTP 429 Too Many Requests was returned from the API, "
-                        "will retry after delay: %.3fs",
-                        delay,
+        if self.retry_rate_limits and resp.status_code == 429:
+            resets_in = _get_rate_limit_reset_timestamp(resp.headers)
+            if resets_in:
+                # delay for at least the amount specified in the header
+                # add an extra delay that's slowly increasing with each attempt
+                backoff_delay = backoff.next_delay()
+                delay = resets_in + backoff_delay
+            if resets_in and (
+                self.max_rate_limit_wait is None
+                or rate_limit_wait + delay <= self.max_rate_limit_wait
+            ):
+                self.logger.warning(
+                    "HTTP 429 Too Many Requests was returned from the API, "
+                    "will retry after delay: %.3fs",
+                    delay,
+                )
+                if span is not None:
+                    span.set_attributes(
+                        {
+                            "variational.rate_limit_resets_in_s": resets_in,
+                            "variational.backoff_s": backoff_delay,
+                        }
+                    )
+                self.rate_limits.record_wait(endpoint, delay)
+                if self.hooks:
+                    self.__emit(
+                        endpoint, attempt, signed, resp, retry_delay=delay, **timings
                     )
-                    time.sleep(delay)
-                    continue
-
-            data = resp.json()
-            raise ApiError(
-                url=full_url,
-                status_code=resp.status_code,
-                api_code=data["error"]["code"],
-                message=data["error"]["message"],
+                if self.stream:
+                    # release the connection, the body won't be read
+                    resp.close()
+                return resp, delay
+
+        if self.retry_policy.should_retry(
+            method, attempt, status_code=resp.status_code
+        ):
+            delay = backoff.next_delay()
+            self.logger.warning(
+                "HTTP %d was returned from the API, will retry after delay: %.3fs",
+                resp.status_code,
+                delay,
             )
+            if self.hooks:
+                self.__emit(
+                    endpoint, attempt, signed, resp, retry_delay=delay, **timings
+                )
+            if self.stream:
+                resp.close()
+            return resp, delay
+
+        data = resp.json()
+        error = ApiError(
+            url=full_url,
+            status_code=resp.status_code,
+            api_code=data["error"]["code"],
+            message=data["error"]["message"],
+        )
+        if self.hooks:
+            self.__emit(endpoint, attempt, signed, resp, error=error, **timings)
+        raise error
+
+    def __attempt_timeout(
+        self,
+        full_url: str,
+        deadline: Optional[float],
+        deadline_at: Optional[float],
+        attempts: int,
+    ) -> Timeout:
+        connect, read = self.connect_timeout, self.request_timeout
+        if deadline_at is not None:
+            remaining = deadline_at - time.monotonic()
+            if remaining <= 0:
+                raise DeadlineExceeded(full_url, deadline, attempts)
+            connect = min(remaining, connect or read or remaining)
+            read = min(remaining, read or remaining)
+        if connect is None or connect == read:
+            return read
+        return connect, read
+
+    def __observe_clock(self, resp: requests.Response, sent_at: float):
+        try:
+            server_received_at = _get_request_received_timestamp(resp.headers)
+        except ValueError:
+            return
+        self.clock.observe(sent_at, server_received_at, time.time())
+
+    def __emit(
+        self,
+        endpoint: str,
+        attempt: int,
+        request: requests.PreparedRequest,
+        response: Optional[requests.Response],
+        wait_time: float,
+        sign_time: float = 0.0,
+        network_time: float = 0.0,
+        decode_time: float = 0.0,
+        sent_at: Optional[float] = None,
+        retry_delay: Optional[float] = None,
+        error: Optional[BaseException] = None,
+        request_bytes_saved: int = 0,
+    ):
+        server_received_at = None
+        if response is not None:
+            try:
+                server_received_at = _get_request_received_timestamp(response.headers)
+            except ValueError:
+                pass
+
+        record = RequestRecord(
+            endpoint=endpoint,
+            method=request.method,
+            status_code=response.status_code if response is not None else None,
+            attempt=attempt,
+            request_bytes=len(request.body or b""),
+            response_bytes=_response_bytes(response),
+            request_bytes_saved=request_bytes_saved,
+            response_bytes_saved=_response_bytes_saved(response),
+            wait_time=wait_time,
+            sign_time=sign_time,
+            network_time=network_time,
+            decode_time=decode_time,
+            sent_at=sent_at or time.time(),
+            server_received_at=server_received_at,
+            retry_delay=retry_delay,
+            error=error,
+        )
+        for hook in self.hooks:
+            try:
+                hook(record)
+            except Exception:
+                self.logger.exception("request hook %r failed", hook)
+
+
+@dataclass
+class RetryPolicy:
+    """
+    Decides which failed attempts are retried besides HTTP 429: transient
+    network errors and server errors, for idempotent methods only, up to
+    `max_attempts` attempts per call. Delays grow like the rate limit ones.
+    Pass `RetryPolicy(max_attempts=1)` to disable.
+    """
+
+    max_attempts: int = 3
+    methods: Collection[str] = ("GET",)
+    status_codes: Collection[int] = (502, 503, 504)
+    exceptions: Tuple[Type[BaseException], ...] = (
+        requests.ConnectionError,
+        requests.Timeout,
+    )
+
+    def should_retry(
+        self,
+        method: str,
+        attempt: int,
+        status_code: Optional[int] = None,
+        error: Optional[BaseException] = None,
+    ) -> bool:
+        if attempt >= self.max_attempts or method not in self.methods:
+            return False
+        if error is not None:
+            return isinstance(error, self.exceptions)
+        return status_code in self.status_codes
 
 
 class ExpBackoff:
@@ -501,6 +999,40 @@ class ExpBackoff:
         return delay
 
 
+def _response_bytes(response: Optional[requests.Response]) -> int:
+    if response is None:
+        return 0
+    if _is_unread_stream(response):
+        decoded = getattr(response, "_variational_decoded_bytes", None)
+        if decoded is not None:
+            return decoded
+        # only the encoded size is known before the body is read
+        return int(response.headers.get("content-length", 0))
+    return len(response.content)
+
+
+def _response_bytes_saved(response: Optional[requests.Response]) -> int:
+    if response is None:
+        return 0
+    if _is_unread_stream(response):
+        size = getattr(response, "_variational_decoded_bytes", None)
+        if size is None:
+            return 0
+    else:
+        size = len(response.content)
+    tell = getattr(response.raw, "tell", None)
+    if tell is None or not response.headers.get("content-encoding"):
+        return 0
+    # bytes read from the connection, before decompression
+    return max(0, size - tell())
+
+
+def _is_unread_stream(response: requests.Response) -> bool:
+    return getattr(response, "_variational_stream", False) and (
+        response._content is False
+    )
+
+
 def _get_rate_limit_reset_timestamp(headers: Mapping) -> Optional[float]:
     for k, v in headers.items():
         if k.lower() == RATE_LIMIT_RESET_MS_HEADER:
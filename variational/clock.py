@@ -0,0 +1,72 @@
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+from .models import DateTimeRFC3339
+from .timestamps import format_rfc3339
+
+
+class ClockSync(object):
+    """
+    Estimates the offset between the local clock and the API server clock
+    from request timestamps, NTP-style: every response yields a sample whose
+    error is bounded by half of its round trip time, and the sample with the
+    lowest round trip time among the last `window` ones is trusted.
+    """
+
+    def __init__(self, window: int = 32):
+        self.__samples = deque(maxlen=window)
+        self.__lock = threading.Lock()
+        self.__offset = 0.0
+        self.__rtt: Optional[float] = None
+
+    @property
+    def offset(self) -> float:
+        """
+        Seconds to add to the local clock to get the server clock.
+        """
+        return self.__offset
+
+    @property
+    def rtt(self) -> Optional[float]:
+        """
+        Round trip time of the sample the offset is currently based on.
+        """
+        return self.__rtt
+
+    def observe(self, sent_at: float, server_received_at: float, received_at: float):
+        """
+        Adds a sample from a request sent at local time `sent_at`, received by
+        the server at server time `server_received_at`, whose response arrived
+        at local time `received_at`.
+        """
+        rtt = received_at - sent_at
+        if rtt < 0:
+            return
+        # assume the request took half of the round trip to reach the server
+        offset = server_received_at - (sent_at + rtt / 2)
+        with self.__lock:
+            self.__samples.append((rtt, offset))
+            self.__rtt, self.__offset = min(self.__samples)
+
+    def reset(self):
+        with self.__lock:
+            self.__samples.clear()
+            self.__offset = 0.0
+            self.__rtt = None
+
+    def now(self) -> float:
+        """
+        Current server time in seconds since the epoch.
+        """
+        return time.time() + self.__offset
+
+    def now_ms(self) -> int:
+        return int(self.now() * 1000)
+
+    def expires_in(self, seconds: float) -> DateTimeRFC3339:
+        """
+        Returns a server timestamp `seconds` from now, for use as `expires_at`.
+        """
+        return format_rfc3339(self.now() + seconds)
@@ -0,0 +1,69 @@
+import gzip
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Sequence
+
+import brotli
+import requests
+from urllib3.util.request import ACCEPT_ENCODING
+
+try:
+    import zstandard
+except ImportError:
+    # optional, urllib3 only decodes zstd when it's installed
+    zstandard = None
+
+# encodings that responses can be decoded from, in order of preference
+SUPPORTED_ENCODINGS = tuple(
+    e for e in ("zstd", "br", "gzip") if e in ACCEPT_ENCODING.split(",")
+)
+
+COMPRESSORS: Dict[str, Callable[[bytes], bytes]] = {
+    "gzip": lambda data: gzip.compress(data, compresslevel=6),
+    "br": lambda data: brotli.compress(data, quality=5),
+}
+DECOMPRESSORS: Dict[str, Callable[[bytes], bytes]] = {
+    "gzip": gzip.decompress,
+    "br": brotli.decompress,
+}
+if zstandard is not None:
+    COMPRESSORS["zstd"] = lambda data: zstandard.ZstdCompressor(level=3).compress(data)
+    DECOMPRESSORS["zstd"] = lambda data: zstandard.ZstdDecompressor().decompress(data)
+
+
+@dataclass
+class Compression:
+    """
+    Content encoding settings of `Client`. Responses are requested in any of
+    `accept` and decompressed chunk by chunk as they're read, so streamed
+    pages are decoded while still downloading. Request bodies of at least
+    `request_min_bytes` are compressed with `request_encoding`; this is off by
+    default because the API must accept compressed bodies for it to work.
+    """
+
+    accept: Sequence[str] = SUPPORTED_ENCODINGS
+    request_min_bytes: Optional[int] = None
+    request_encoding: str = "gzip"
+
+    @property
+    def accept_encoding(self) -> str:
+        return ", ".join(self.accept) if self.accept else "identity"
+
+    def prepare(self, request: requests.PreparedRequest) -> int:
+        """
+        Sets encoding headers of `request`, compressing its body if it's large
+        enough. Must run before signing. Returns the number of bytes saved.
+        """
+        request.headers["Accept-Encoding"] = self.accept_encoding
+        body = request.body
+        if (
+            self.request_min_bytes is None
+            or not isinstance(body, bytes)
+            or len(body) < self.request_min_bytes
+        ):
+            return 0
+        compressed = COMPRESSORS[self.request_encoding](body)
+        if len(compressed) >= len(body):
+            return 0
+        request.headers["Content-Encoding"] = self.request_encoding
+        request.prepare_body(compressed, None)
+        return len(body) - len(compressed)
@@ -0,0 +1,107 @@
+import time
+from dataclasses import dataclass
+from enum import StrEnum
+from typing import Dict, Generator, List, Optional
+
+from .client import Client
+from .models import RFQ, RFQStatus, QuoteWithMarginRequirements, UUIDv4
+from .paginate import paginate_pipelined
+from .timestamps import parse_rfc3339
+
+
+class RFQEventType(StrEnum):
+    NEW_RFQ = "new_rfq"
+    NEW_QUOTE = "new_quote"
+    STATUS_CHANGE = "status_change"
+    EXPIRED = "expired"
+
+
+@dataclass
+class RFQEvent:
+    type: RFQEventType
+    rfq: RFQ
+    # state of the RFQ before this event, if it was known
+    previous: Optional[RFQ] = None
+    # set for NEW_QUOTE events
+    quote: Optional[QuoteWithMarginRequirements] = None
+
+
+class RFQFeed(object):
+    """
+    Polls received RFQs and turns consecutive snapshots into events.
+    RFQs are indexed by `rfq_id`, so each poll only compares statuses and
+    quote ids instead of whole pages.
+    Pass `price=False` to skip structure pricing on the server side when
+    `structure_price` isn't needed.
+    """
+
+    def __init__(self, client: Client, price: bool = True, interval: float = 1):
+        self.client = client
+        self.price = price
+        self.interval = interval
+        self.rfqs: Dict[UUIDv4, RFQ] = {}
+        self.__quote_ids: Dict[UUIDv4, set] = {}
+
+    def poll(self) -> List[RFQEvent]:
+        """
+        Fetches all received RFQs once and returns events for everything that
+        changed since the previous call.
+        """
+        events = []
+        seen = set()
+        for rfq in paginate_pipelined(self.client.get_rfqs_received, price=self.price):
+            rfq_id = rfq["rfq_id"]
+            seen.add(rfq_id)
+            events.extend(self.__diff(self.rfqs.get(rfq_id), rfq))
+
+        # RFQs dropped from the listing are forgotten, announcing the ones that
+        # ran out of time without the server reporting them as expired
+        now = self.client.clock.now()
+        for rfq_id in list(self.rfqs):
+            if rfq_id in seen:
+                continue
+            rfq = self.rfqs.pop(rfq_id)
+            self.__quote_ids.pop(rfq_id, None)
+            if (
+                rfq["rfq_status"] == RFQStatus.OPEN
+                and parse_rfc3339(rfq["rfq_expires_at"]) <= now
+            ):
+                events.append(RFQEvent(RFQEventType.EXPIRED, rfq, previous=rfq))
+
+        return events
+
+    def run(self) -> Generator[RFQEvent, None, None]:
+        """
+        Polls forever, sleeping `interval` seconds between polls.
+        """
+        while True:
+            yield from self.poll()
+            time.sleep(self.interval)
+
+    def __diff(self, previous: Optional[RFQ], rfq: RFQ) -> List[RFQEvent]:
+        rfq_id = rfq["rfq_id"]
+        self.rfqs[rfq_id] = rfq
+        quotes = rfq.get("bids", []) + rfq.get("asks", [])
+        known_ids = self.__quote_ids.setdefault(rfq_id, set())
+
+        if previous is None:
+            known_ids.update(q["parent_quote_id"] for q in quotes)
+            return [RFQEvent(RFQEventType.NEW_RFQ, rfq)]
+
+        events = []
+        for quote in quotes:
+            if quote["parent_quote_id"] not in known_ids:
+                known_ids.add(quote["parent_quote_id"])
+                events.append(
+                    RFQEvent(RFQEventType.NEW_QUOTE, rfq, previous, quote=quote)
+                )
+
+        if rfq["rfq_status"] != previous["rfq_status"]:
+            if rfq["rfq_status"] == RFQStatus.EXPIRED:
+                events.append(RFQEvent(RFQEventType.EXPIRED, rfq, previous))
+            else:
+                events.append(RFQEvent(RFQEventType.STATUS_CHANGE, rfq, previous))
+        elif rfq["clearing_status"] != previous["clearing_status"]:
+            events.append(RFQEvent(RFQEventType.STATUS_CHANGE, rfq, previous))
+
+        return events
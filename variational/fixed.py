@@ -0,0 +1,276 @@
+from decimal import (
+    Decimal,
+    ROUND_CEILING,
+    ROUND_DOWN,
+    ROUND_FLOOR,
+    ROUND_HALF_DOWN,
+    ROUND_HALF_EVEN,
+    ROUND_HALF_UP,
+    ROUND_UP,
+)
+from typing import Optional
+
+from .models import PrecisionRequirements, StrDecimal
+
+
+class FixedDecimal(object):
+    """
+    Decimal number stored as an integer `value` scaled by 10 ** `scale`, e.g.
+    FixedDecimal(123450, 4) is 12.345. Parsing, formatting, comparisons and
+    rounding work on plain ints, which is much cheaper than `Decimal` for
+    rounding many prices and quantities to `PrecisionRequirements`.
+
+        qty = FixedDecimal.parse("0.0011230", scale=requirements_scale(req))
+        str(qty.round_to_requirements(req))  # "0.001123"
+
+    Sums and differences are exact at the larger scale of the operands,
+    products and quotients are rounded half up to it.
+    """
+
+    __slots__ = ("value", "scale")
+
+    def __init__(self, value: int, scale: int = 0):
+        self.value = value
+        self.scale = scale
+
+    @classmethod
+    def parse(
+        cls, text: StrDecimal, scale: Optional[int] = None, rounding=ROUND_HALF_UP
+    ) -> "FixedDecimal":
+        """
+        Parses the API string form. Without `scale`, all digits are kept.
+        """
+        if "e" in text or "E" in text:
+            return cls.from_decimal(Decimal(text), scale, rounding)
+        whole, _, fraction = text.partition(".")
+        value = int(whole + fraction)
+        if scale is None:
+            return cls(value, len(fraction))
+        return cls(_rescale(value, len(fraction), scale, rounding), scale)
+
+    @classmethod
+    def from_decimal(
+        cls, d: Decimal, scale: Optional[int] = None, rounding=ROUND_HALF_UP
+    ) -> "FixedDecimal":
+        sign, digits, exponent = d.as_tuple()
+        value = int("".join(map(str, digits)) or "0")
+        if sign:
+            value = -value
+        if exponent > 0:
+            value *= 10**exponent
+            exponent = 0
+        if scale is None:
+            return cls(value, -exponent)
+        return cls(_rescale(value, -exponent, scale, rounding), scale)
+
+    def to_decimal(self) -> Decimal:
+        return Decimal(self.value).scaleb(-self.scale)
+
+    def rescale(self, scale: int, rounding=ROUND_HALF_UP) -> "FixedDecimal":
+        return FixedDecimal(_rescale(self.value, self.scale, scale, rounding), scale)
+
+    def round_to_requirements(
+        self, requirements: PrecisionRequirements, rounding=ROUND_HALF_UP
+    ) -> "FixedDecimal":
+        """
+        Same as `round_to_requirements`, keeping the scale.
+        """
+        abs_value = abs(self.value)
+        if abs_value == 0:
+            return self
+        digits = len(str(abs_value))
+        if abs_value >= 10**self.scale:
+            integer_digits = digits - self.scale
+            quantize_to = min(
+                integer_digits - requirements["max_significant_figures"],
+                -requirements["min_decimal_figures"],
+            )
+        else:
+            quantize_to = digits - self.scale - requirements["max_decimal_only_figures"]
+        # like round_to_requirements, which doesn't round to whole units
+        drop = quantize_to + self.scale
+        if quantize_to == 0 or drop <= 0:
+            return self
+        unit = 10**drop
+        return FixedDecimal(_div_round(self.value, unit, rounding) * unit, self.scale)
+
+    def __str__(self):
+        if self.scale == 0:
+            return str(self.value)
+        digits = str(abs(self.value)).rjust(self.scale + 1, "0")
+        split = len(digits) - self.scale
+        whole, fraction = digits[:split], digits[split:].rstrip("0")
+        sign = "-" if self.value < 0 else ""
+        return f"{sign}{whole}.{fraction}" if fraction else f"{sign}{whole}"
+
+    def __repr__(self):
+        return f"FixedDecimal('{self}')"
+
+    def __float__(self):
+        return self.value / 10**self.scale
+
+    def __int__(self):
+        return _div_round(self.value, 10**self.scale, ROUND_DOWN)
+
+    def __bool__(self):
+        return self.value != 0
+
+    def __hash__(self):
+        value, scale = self.value, self.scale
+        while scale > 0 and value % 10 == 0:
+            value //= 10
+            scale -= 1
+        return hash(value) if scale <= 0 else hash((value, scale))
+
+    def __neg__(self):
+        return FixedDecimal(-self.value, self.scale)
+
+    def __pos__(self):
+        return self
+
+    def __abs__(self):
+        return FixedDecimal(abs(self.value), self.scale)
+
+    def __add__(self, other):
+        other = _coerce(other)
+        if other is None:
+            return NotImplemented
+        a, b, scale = _align(self, other)
+        return FixedDecimal(a + b, scale)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        other = _coerce(other)
+        if other is None:
+            return NotImplemented
+        a, b, scale = _align(self, other)
+        return FixedDecimal(a - b, scale)
+
+    def __rsub__(self, other):
+        return -self + other
+
+    def __mul__(self, other):
+        other = _coerce(other)
+        if other is None:
+            return NotImplemented
+        scale = max(self.scale, other.scale)
+        value = _rescale(
+            self.value * other.value, self.scale + other.scale, scale, ROUND_HALF_UP
+        )
+        return FixedDecimal(value, scale)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        other = _coerce(other)
+        if other is None:
+            return NotImplemented
+        if other.value == 0:
+            raise ZeroDivisionError("division by zero")
+        scale = max(self.scale, other.scale)
+        numerator = self.value * 10 ** (scale + other.scale - self.scale)
+        return FixedDecimal(_div_round(numerator, other.value, ROUND_HALF_UP), scale)
+
+    def __rtruediv__(self, other):
+        other = _coerce(other)
+        if other is None:
+            return NotImplemented
+        return other / self
+
+    def __eq__(self, other):
+        other = _coerce(other)
+        if other is None:
+            return NotImplemented
+        a, b, _ = _align(self, other)
+        return a == b
+
+    def __lt__(self, other):
+        other = _coerce(other)
+        if other is None:
+            return NotImplemented
+        a, b, _ = _align(self, other)
+        return a < b
+
+    def __le__(self, other):
+        other = _coerce(other)
+        if other is None:
+            return NotImplemented
+        a, b, _ = _align(self, other)
+        return a <= b
+
+    def __gt__(self, other):
+        other = _coerce(other)
+        if other is None:
+            return NotImplemented
+        a, b, _ = _align(self, other)
+        return a > b
+
+    def __ge__(self, other):
+        other = _coerce(other)
+        if other is None:
+            return NotImplemented
+        a, b, _ = _align(self, other)
+        return a >= b
+
+
+def requirements_scale(requirements: PrecisionRequirements) -> int:
+    """
+    Scale that holds values rounded to `requirements` exactly, as long as
+    they're at least 10 ** -max(min_decimal_figures, max_significant_figures).
+    """
+    return (
+        max(
+            requirements["min_decimal_figures"],
+            requirements["max_significant_figures"],
+        )
+        + requirements["max_decimal_only_figures"]
+    )
+
+
+def _coerce(other) -> Optional[FixedDecimal]:
+    if isinstance(other, FixedDecimal):
+        return other
+    if isinstance(other, int):
+        return FixedDecimal(other, 0)
+    if isinstance(other, Decimal):
+        return FixedDecimal.from_decimal(other)
+    return None
+
+
+def _align(a: FixedDecimal, b: FixedDecimal):
+    if a.scale == b.scale:
+        return a.value, b.value, a.scale
+    if a.scale > b.scale:
+        return a.value, b.value * 10 ** (a.scale - b.scale), a.scale
+    return a.value * 10 ** (b.scale - a.scale), b.value, b.scale
+
+
+def _rescale(value: int, scale: int, to_scale: int, rounding) -> int:
+    if to_scale >= scale:
+        return value * 10 ** (to_scale - scale)
+    return _div_round(value, 10 ** (scale - to_scale), rounding)
+
+
+def _div_round(n: int, d: int, rounding) -> int:
+    """
+    Divides `n` by `d`, rounding like the `decimal` module `rounding` mode.
+    """
+    negative = (n < 0) != (d < 0)
+    q, r = divmod(abs(n), abs(d))
+    if r:
+        if rounding == ROUND_HALF_UP:
+            q += 2 * r >= abs(d)
+        elif rounding == ROUND_HALF_EVEN:
+            q += 2 * r > abs(d) or (2 * r == abs(d) and q % 2 == 1)
+        elif rounding == ROUND_HALF_DOWN:
+            q += 2 * r > abs(d)
+        elif rounding == ROUND_UP:
+            q += 1
+        elif rounding == ROUND_CEILING:
+            q += not negative
+        elif rounding == ROUND_FLOOR:
+            q += negative
+        elif rounding != ROUND_DOWN:
+            raise ValueError(f"unsupported rounding mode {rounding}")
+    return -q if negative else q
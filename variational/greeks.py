@@ -0,0 +1,302 @@
+import time
+from dataclasses import dataclass, fields, replace
+from decimal import Decimal
+from typing import Dict, Iterable, Mapping, Optional, Tuple
+
+from .client import Client
+from .models import (
+    AggregatedPosition,
+    Instrument,
+    InstrumentPrice,
+    PortfolioSummary,
+    Trade,
+    TradeSide,
+    TradeStatus,
+    UUIDv4,
+)
+from .paginate import paginate
+from .pricing import instrument_key
+from .timestamps import parse_rfc3339
+
+ZERO = Decimal(0)
+# dollar gamma is the change of dollar delta for a 1% move of the underlying
+DOLLAR_GAMMA_MOVE = Decimal("0.01")
+
+
+@dataclass
+class Greeks:
+    delta: Decimal = ZERO
+    gamma: Decimal = ZERO
+    vega: Decimal = ZERO
+    theta: Decimal = ZERO
+    rho: Decimal = ZERO
+    notional: Decimal = ZERO
+    upnl: Decimal = ZERO
+    dollar_delta: Decimal = ZERO
+    dollar_gamma: Decimal = ZERO
+
+    def __add__(self, other: "Greeks") -> "Greeks":
+        return Greeks(
+            *(getattr(self, f.name) + getattr(other, f.name) for f in fields(self))
+        )
+
+    def __sub__(self, other: "Greeks") -> "Greeks":
+        return Greeks(
+            *(getattr(self, f.name) - getattr(other, f.name) for f in fields(self))
+        )
+
+    def differences(self, summary: PortfolioSummary) -> Dict[str, Decimal]:
+        """
+        Returns `summary - self` for every `sum_*` field of `summary` that
+        is tracked locally.
+        """
+        return {
+            f"sum_{f.name}": Decimal(summary[f"sum_{f.name}"]) - getattr(self, f.name)
+            for f in fields(self)
+        }
+
+
+@dataclass
+class _Holding:
+    instrument: Instrument
+    pool: UUIDv4
+    qty: Decimal
+    upnl: Decimal
+    price: Decimal
+    underlying_price: Decimal
+    # per unit of qty
+    delta: Decimal
+    gamma: Decimal
+    vega: Decimal
+    theta: Decimal
+    rho: Decimal
+    notional: Decimal
+    greeks: Optional[Greeks] = None
+
+    def evaluate(self) -> Greeks:
+        delta = self.qty * self.delta
+        gamma = self.qty * self.gamma
+        s = self.underlying_price
+        self.greeks = Greeks(
+            delta=delta,
+            gamma=gamma,
+            vega=self.qty * self.vega,
+            theta=self.qty * self.theta,
+            rho=self.qty * self.rho,
+            notional=self.qty * self.notional,
+            upnl=self.upnl,
+            dollar_delta=delta * s,
+            dollar_gamma=gamma * s * s * DOLLAR_GAMMA_MOVE,
+        )
+        return self.greeks
+
+
+class GreeksAggregator(object):
+    """
+    Keeps the sums of `PortfolioSummary` in memory, together with breakdowns
+    per underlying and per pool, so that they can be read without a round
+    trip:
+
+        greeks = GreeksAggregator(paginate(client.get_portfolio_aggregated_positions))
+        greeks.apply_trade(trade)
+        hedge = -greeks.by_underlying()["BTC"].delta
+
+    Positions come from `AggregatedPosition` records; fills move a position's
+    quantity and scale its greeks by the per-unit values of its latest
+    record, so each update touches one position and three sums. Fills of
+    instruments that aren't held yet need an `InstrumentPrice` mark.
+
+    Unrealized P&L grows by `qty * (mark - fill price)` when a position is
+    extended and shrinks proportionally when it's reduced. Dollar delta is
+    `delta * S` and dollar gamma `gamma * S^2 * 1%`. Local sums drift as marks
+    move, so `reconcile` should be called periodically: it rebuilds from the
+    server and returns how far off the local sums were.
+    """
+
+    def __init__(self, positions: Iterable[AggregatedPosition] = ()):
+        self.__holdings: Dict[Tuple[UUIDv4, str], _Holding] = {}
+        self.__total = Greeks()
+        self.__underlyings: Dict[str, Greeks] = {}
+        self.__pools: Dict[UUIDv4, Greeks] = {}
+        # fills applied since the last reconciliation: trade id -> (created at,
+        # trade, holding before the fill)
+        self.__trades: Dict[UUIDv4, Tuple[Optional[float], Trade, _Holding]] = {}
+        # time.time() of the last reconciliation, None if never reconciled
+        self.reconciled_at: Optional[float] = None
+        for position in positions:
+            self.set_position(position)
+
+    @property
+    def total(self) -> Greeks:
+        return self.__total
+
+    def by_underlying(self) -> Dict[str, Greeks]:
+        return dict(self.__underlyings)
+
+    def by_pool(self) -> Dict[UUIDv4, Greeks]:
+        return dict(self.__pools)
+
+    def set_position(self, position: AggregatedPosition):
+        """
+        Adds or replaces a position with a fresh record from the server.
+        """
+        info = position["position_info"]
+        key = (info["pool_location"], instrument_key(info["instrument"]))
+        qty = Decimal(info["qty"])
+        if qty == 0:
+            self.__replace(key, None)
+            return
+
+        def per_unit(name):
+            return Decimal(position[name]) / qty
+
+        holding = _Holding(
+            instrument=info["instrument"],
+            pool=info["pool_location"],
+            qty=qty,
+            upnl=Decimal(position["upnl"]),
+            price=Decimal(position["price"]),
+            underlying_price=Decimal(position["underlying_price"]),
+            delta=per_unit("sum_delta"),
+            gamma=per_unit("sum_gamma"),
+            vega=per_unit("sum_vega"),
+            theta=per_unit("sum_theta"),
+            rho=per_unit("sum_rho"),
+            notional=per_unit("notional"),
+        )
+        self.__replace(key, holding)
+
+    def apply_trade(self, trade: Trade, mark: Optional[InstrumentPrice] = None):
+        """
+        Applies a fill to the position it belongs to. Failed trades and
+        trades that were already applied are ignored.
+        """
+        if trade["status"] == TradeStatus.failed or trade["id"] in self.__trades:
+            return
+        key = _trade_key(trade)
+        holding = self.__holdings.get(key)
+        if holding is None:
+            if mark is None:
+                raise KeyError(f"no mark for instrument {key[1]}")
+            holding = _holding_from_mark(
+                trade["instrument"], trade["pool_location"], mark
+            )
+        self.__apply(key, trade, holding)
+
+    def apply_trades(
+        self,
+        trades: Iterable[Trade],
+        marks: Optional[Mapping[str, InstrumentPrice]] = None,
+    ):
+        """
+        Applies fills in order, `marks` are keyed by `instrument_key`.
+        """
+        for trade in trades:
+            mark = marks.get(instrument_key(trade["instrument"])) if marks else None
+            self.apply_trade(trade, mark)
+
+    def reconcile(self, client: Client) -> Dict[str, Decimal]:
+        """
+        Compares the local sums with `get_portfolio_summary`, then rebuilds
+        them from the aggregated positions. Returns the differences found,
+        `server - local` per summary field.
+
+        The summary and the positions are read one after the other, not as
+        one snapshot, so a fill landing in between makes the differences
+        off by that fill. Fills created at or after the positions were
+        requested are taken to be missing from them: they are applied again
+        on top of the rebuilt positions and stay known, so that they aren't
+        applied twice when they're received again. Older fills are assumed
+        to be part of the positions and are forgotten.
+        """
+        summary = client.get_portfolio_summary().result
+        differences = self.__total.differences(summary)
+        snapshot_at = client.clock.now()
+        positions = list(paginate(client.get_portfolio_aggregated_positions))
+        recent = [
+            (trade, holding)
+            for created_at, trade, holding in self.__trades.values()
+            if created_at is not None and created_at >= snapshot_at
+        ]
+        self.__holdings.clear()
+        self.__underlyings.clear()
+        self.__pools.clear()
+        self.__total = Greeks()
+        self.__trades.clear()
+        for position in positions:
+            self.set_position(position)
+        for trade, holding in recent:
+            key = _trade_key(trade)
+            current = self.__holdings.get(key)
+            if current is None:
+                current = replace(holding, qty=ZERO, upnl=ZERO)
+            self.__apply(key, trade, current)
+        self.reconciled_at = time.time()
+        return differences
+
+    def __apply(self, key: Tuple[UUIDv4, str], trade: Trade, holding: _Holding):
+        created_at = trade.get("created_at")
+        self.__trades[trade["id"]] = (
+            parse_rfc3339(created_at) if created_at else None,
+            trade,
+            holding,
+        )
+        fill = Decimal(trade["qty"])
+        if trade["side"] == TradeSide.SELL:
+            fill = -fill
+        fill_price = Decimal(trade["price"])
+
+        holding = replace(holding)
+        qty = holding.qty + fill
+        if holding.qty != 0 and (qty == 0 or (qty > 0) != (holding.qty > 0)):
+            # closed, or flipped to the other side at the fill price
+            holding.upnl = ZERO
+            opened = qty
+        elif abs(qty) < abs(holding.qty):
+            holding.upnl = holding.upnl * qty / holding.qty
+            opened = ZERO
+        else:
+            opened = fill
+        holding.upnl += opened * (holding.price - fill_price)
+        holding.qty = qty
+        self.__replace(key, holding if qty != 0 else None)
+
+    def __replace(self, key: Tuple[UUIDv4, str], holding: Optional[_Holding]):
+        previous = self.__holdings.pop(key, None)
+        if previous is not None:
+            self.__add(previous, previous.greeks, -1)
+        if holding is not None:
+            self.__holdings[key] = holding
+            self.__add(holding, holding.evaluate(), 1)
+
+    def __add(self, holding: _Holding, greeks: Greeks, sign: int):
+        change = greeks if sign > 0 else Greeks() - greeks
+        underlying = holding.instrument["underlying"]
+        self.__total += change
+        self.__underlyings[underlying] = (
+            self.__underlyings.get(underlying, Greeks()) + change
+        )
+        self.__pools[holding.pool] = self.__pools.get(holding.pool, Greeks()) + change
+
+
+def _trade_key(trade: Trade) -> Tuple[UUIDv4, str]:
+    return (trade["pool_location"], instrument_key(trade["instrument"]))
+
+
+def _holding_from_mark(
+    instrument: Instrument, pool: UUIDv4, mark: InstrumentPrice
+) -> _Holding:
+    return _Holding(
+        instrument=instrument,
+        pool=pool,
+        qty=ZERO,
+        upnl=ZERO,
+        price=Decimal(mark["price"]),
+        underlying_price=Decimal(mark["underlying_price"]),
+        delta=Decimal(mark["delta"]),
+        gamma=Decimal(mark["gamma"]),
+        vega=Decimal(mark["vega"]),
+        theta=Decimal(mark["theta"]),
+        rho=Decimal(mark["rho"]),
+        notional=Decimal(mark["price"]),
+    )
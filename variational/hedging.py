@@ -0,0 +1,166 @@
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Collection, Optional
+from urllib.parse import urlsplit
+
+import requests
+
+from .metrics import LatencyHistogram
+from .transport import SessionTransport, Timeout, Transport
+
+
+class HedgeBudget(object):
+    """
+    Token bucket limiting hedged requests to a fraction of all requests:
+    every request earns `ratio` tokens, up to `burst`, and every hedge costs
+    one, so hedging can't multiply load when the whole API is slow.
+    """
+
+    def __init__(self, ratio: float = 0.05, burst: float = 10):
+        self.ratio = ratio
+        self.burst = burst
+        self.__tokens = burst
+        self.__lock = threading.Lock()
+        self.requests = 0
+        self.hedges = 0
+
+    def on_request(self):
+        with self.__lock:
+            self.requests += 1
+            self.__tokens = min(self.burst, self.__tokens + self.ratio)
+
+    def try_acquire(self) -> bool:
+        with self.__lock:
+            if self.__tokens < 1:
+                return False
+            self.__tokens -= 1
+            self.hedges += 1
+            return True
+
+
+class HedgingTransport(Transport):
+    """
+    Wraps another transport, sending a duplicate of an idempotent request
+    when no response arrived within the `percentile`-th latency observed for
+    its endpoint so far. The first response wins; the other one is cancelled
+    if it hasn't been sent yet. A request already in flight can't be aborted,
+    so a losing response is only closed once it has arrived.
+
+    Each primary request is sent on a thread of its own, so it never waits
+    behind other requests, and the hedge delay counts from when it was
+    actually sent. Only hedges share the pool of `max_workers` threads.
+
+        client = Client(key, secret, transport=HedgingTransport())
+
+    Until `min_samples` latencies are known for an endpoint, `min_delay` is
+    used. A `HedgeBudget` can be shared between transports of several clients
+    to bound hedging globally.
+    """
+
+    def __init__(
+        self,
+        transport: Optional[Transport] = None,
+        percentile: float = 95,
+        min_delay: float = 0.05,
+        min_samples: int = 20,
+        budget: Optional[HedgeBudget] = None,
+        methods: Collection[str] = ("GET",),
+        max_workers: int = 16,
+    ):
+        self.transport = transport or SessionTransport()
+        self.session = getattr(self.transport, "session", None)
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self.budget = budget or HedgeBudget()
+        self.methods = set(methods)
+        self.latencies = LatencyHistogram()
+        self.logger = logging.getLogger(__name__)
+        self.__executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="variational-hedging"
+        )
+
+    def hedge_delay(self, key: str) -> float:
+        if self.latencies.count(key) < self.min_samples:
+            return self.min_delay
+        return max(self.min_delay, self.latencies.percentile(key, self.percentile))
+
+    def send(
+        self,
+        request: requests.PreparedRequest,
+        timeout: Timeout = None,
+        stream: bool = False,
+    ) -> requests.Response:
+        if request.method not in self.methods:
+            return self.transport.send(request, timeout=timeout, stream=stream)
+
+        key = f"{request.method} {urlsplit(request.url).path}"
+        self.budget.on_request()
+        primary = Future()
+        started = threading.Event()
+        threading.Thread(
+            target=self.__run,
+            args=(primary, started, key, request, timeout, stream),
+            name="variational-hedging-primary",
+            daemon=True,
+        ).start()
+        started.wait()
+        try:
+            return primary.result(timeout=self.hedge_delay(key))
+        except TimeoutError:
+            pass
+        if not self.budget.try_acquire():
+            return primary.result()
+
+        self.logger.debug("hedging slow request %s", key)
+        hedge = self.__executor.submit(
+            self.__send, key, request.copy(), timeout, stream
+        )
+        pending = {primary, hedge}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    error = error or future.exception()
+                    continue
+                for loser in pending:
+                    if not loser.cancel():
+                        loser.add_done_callback(_close_response)
+                return future.result()
+        raise error
+
+    def close(self):
+        self.__executor.shutdown(wait=False, cancel_futures=True)
+        self.transport.close()
+
+    def __run(self, future: Future, started: threading.Event, *args):
+        future.set_running_or_notify_cancel()
+        started.set()
+        try:
+            future.set_result(self.__send(*args))
+        except BaseException as e:
+            future.set_exception(e)
+
+    def __send(
+        self,
+        key: str,
+        request: requests.PreparedRequest,
+        timeout: Timeout,
+        stream: bool,
+    ):
+        started = time.perf_counter()
+        resp = self.transport.send(request, timeout=timeout, stream=stream)
+        self.latencies.record(key, time.perf_counter() - started)
+        return resp
+
+
+def _close_response(future: Future):
+    if future.cancelled() or future.exception() is not None:
+        return
+    resp = future.result()
+    # responses built in memory, e.g. by MockServer, have no connection
+    if resp.raw is not None:
+        resp.close()
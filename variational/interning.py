@@ -0,0 +1,75 @@
+import sys
+import typing
+from enum import StrEnum
+from functools import cache
+from typing import Dict, Set
+
+from . import models
+
+# fields holding identifiers and tokens that repeat across many records
+INTERNED_FIELDS = frozenset(
+    {
+        "company",
+        "company_creator",
+        "company_id",
+        "company_other",
+        "counterparty",
+        "maker_company",
+        "taker_company",
+        "pool_id",
+        "pool_location",
+        "target_pool_location",
+        "rfq_id",
+        "target_rfq_id",
+        "parent_quote_id",
+        "rfq_leg_id",
+        "target_rfq_leg_id",
+        "underlying",
+        "settlement_asset",
+        "asset",
+    }
+)
+
+
+def intern_values(obj: dict) -> dict:
+    """
+    JSON object hook replacing identifier strings with interned copies and
+    enum values with members of the matching enum from `models`, so that
+    records share them instead of each holding its own string. Fields whose
+    name is typed with different enums across records, like `status`, are
+    left as strings.
+    """
+    enums = _enum_values()
+    for key, value in obj.items():
+        if type(value) is not str:
+            continue
+        members = enums.get(key)
+        if members is not None:
+            obj[key] = members.get(value, value)
+        elif key in INTERNED_FIELDS:
+            obj[key] = sys.intern(value)
+    return obj
+
+
+@cache
+def _enum_values() -> Dict[str, Dict[str, StrEnum]]:
+    # field name -> enum value -> member, for fields typed with an enum in models
+    found: Dict[str, Set[type]] = {}
+    for obj in vars(models).values():
+        if not (isinstance(obj, type) and typing.is_typeddict(obj)):
+            continue
+        for field, hint in typing.get_type_hints(obj).items():
+            types = found.setdefault(field, set())
+            for t in typing.get_args(hint) or (hint,):
+                if t is not type(None):
+                    types.add(t)
+
+    # a field name shared by records of different types, e.g. the `status` of
+    # trades and transfers, can't tell which enum applies, so keep strings
+    return {
+        field: {member.value: member for member in t}
+        for field, types in found.items()
+        if len(types) == 1
+        for t in types
+        if isinstance(t, type) and issubclass(t, StrEnum)
+    }
@@ -0,0 +1,445 @@
+import time
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+from .models import (
+    AggregatedPosition,
+    PortfolioMarginAssetParam,
+    PortfolioMarginParams,
+    Instrument,
+    InstrumentPrice,
+    InstrumentType,
+    MarginUsage,
+    PayoffType,
+    SimpleMarginAssetParam,
+    SimpleMarginParams,
+    Structure,
+    TradeSide,
+    UUIDv4,
+)
+from .pricing import instrument_key
+from .timestamps import parse_rfc3339
+
+ZERO = Decimal(0)
+# price moves as fractions of `price_range`, vol moves are down, none and up
+PRICE_STEPS = (-1, -2 / 3, -1 / 3, 0, 1 / 3, 2 / 3, 1)
+# vega is reported per vol point
+VOL_POINT = 0.01
+# option vol shocks are scaled by (VEGA_TENOR_DAYS / days to expiry) ** power
+VEGA_TENOR_DAYS = 30
+
+# (instrument, signed quantity) to add to a pool, positive when buying
+LegQty = Tuple[Instrument, Decimal]
+
+
+@dataclass
+class Margin:
+    initial_margin: Decimal = ZERO
+    maintenance_margin: Decimal = ZERO
+
+    def __add__(self, other: "Margin") -> "Margin":
+        return Margin(
+            self.initial_margin + other.initial_margin,
+            self.maintenance_margin + other.maintenance_margin,
+        )
+
+    def __sub__(self, other: "Margin") -> "Margin":
+        return Margin(
+            self.initial_margin - other.initial_margin,
+            self.maintenance_margin - other.maintenance_margin,
+        )
+
+    def as_usage(self) -> MarginUsage:
+        return {
+            "initial_margin": str(self.initial_margin),
+            "maintenance_margin": str(self.maintenance_margin),
+        }
+
+
+@dataclass
+class _Holding:
+    instrument: Instrument
+    qty: Decimal
+    price: Decimal
+    underlying_price: Decimal
+    margin: Margin = field(default_factory=Margin)
+
+
+def structure_legs(structure: Structure, qty: Decimal, side: TradeSide) -> List[LegQty]:
+    """
+    Converts trading `qty` of `structure` on `side` into per-instrument
+    quantities, e.g. to evaluate a quote before sending it.
+    """
+    legs = []
+    for leg in structure["legs"]:
+        leg_qty = qty * leg["ratio"]
+        if (leg["side"] == TradeSide.BUY) != (side == TradeSide.BUY):
+            leg_qty = -leg_qty
+        legs.append((leg["instrument"], leg_qty))
+    return legs
+
+
+class SimpleMarginCalculator(object):
+    """
+    Estimates margin of a pool under `SimpleMarginParams` locally, so that
+    the impact of candidate trades can be screened without a round trip:
+
+        positions = paginate(client.get_portfolio_aggregated_positions)
+        calculator = SimpleMarginCalculator(params, positions, pool=pool_id)
+        legs = structure_legs(rfq["structure"], qty, TradeSide.SELL)
+        after = calculator.what_if(legs, marks)
+
+    Margin is the sum over positions: futures (and spot) are margined on
+    notional at `max(futures_initial_margin, 1 / futures_leverage)` initial and
+    `futures_maintenance_margin` maintenance, short options at their mark
+    plus `max(option_initial_margin * S - OTM, option_initial_margin_min * S)`
+    initial and `option_maintenance_margin * S` maintenance, and long options
+    are fully paid. This mirrors the model but not every detail of the
+    server's computation; reconcile against `PoolMarginUsageStats`.
+
+    Marks of instruments the pool doesn't hold yet are passed as
+    `InstrumentPrice` values keyed by `instrument_key`.
+
+    A calculator covers a single pool: positions of pools other than `pool`
+    are skipped. Without `pool`, all positions must be of the same pool.
+    """
+
+    def __init__(
+        self,
+        params: SimpleMarginParams,
+        positions: Iterable[AggregatedPosition] = (),
+        pool: Optional[UUIDv4] = None,
+    ):
+        self.params = params
+        self.pool = pool
+        self.__asset_params: Dict[str, Dict[str, Decimal]] = {}
+        self.__holdings: Dict[str, _Holding] = {}
+        self.__total = Margin()
+        for position in _pool_positions(positions, pool):
+            self.set_position(
+                position["position_info"]["instrument"],
+                Decimal(position["position_info"]["qty"]),
+                Decimal(position["price"]),
+                Decimal(position["underlying_price"]),
+            )
+
+    @property
+    def total(self) -> Margin:
+        return self.__total
+
+    def set_position(
+        self,
+        instrument: Instrument,
+        qty: Decimal,
+        price: Decimal,
+        underlying_price: Decimal,
+    ):
+        """
+        Sets the quantity and marks of a held instrument, e.g. after a fill.
+        """
+        key = instrument_key(instrument)
+        previous = self.__holdings.pop(key, None)
+        if previous is not None:
+            self.__total -= previous.margin
+        if qty == 0:
+            return
+        holding = _Holding(instrument, qty, price, underlying_price)
+        holding.margin = self.position_margin(instrument, qty, price, underlying_price)
+        self.__holdings[key] = holding
+        self.__total += holding.margin
+
+    def what_if(
+        self,
+        legs: Iterable[LegQty],
+        marks: Optional[Mapping[str, InstrumentPrice]] = None,
+    ) -> Margin:
+        """
+        Returns the pool margin after adding `legs`, leaving the pool as is.
+        Only the instruments of `legs` are re-evaluated.
+        """
+        change = Margin()
+        merged = self.__merge(legs, marks)
+        for instrument, qty, price, underlying_price, before in merged.values():
+            change += (
+                self.position_margin(instrument, qty, price, underlying_price) - before
+            )
+        return self.__total + change
+
+    def what_if_many(
+        self,
+        candidates: Iterable[Iterable[LegQty]],
+        marks: Optional[Mapping[str, InstrumentPrice]] = None,
+    ) -> List[Margin]:
+        return [self.what_if(legs, marks) for legs in candidates]
+
+    def position_margin(
+        self,
+        instrument: Instrument,
+        qty: Decimal,
+        price: Decimal,
+        underlying_price: Decimal,
+    ) -> Margin:
+        p = self.__params_for(instrument["underlying"])
+        size = abs(qty)
+        if instrument["instrument_type"] != InstrumentType.VANILLA_OPTION:
+            notional = size * price
+            return Margin(
+                notional * p["futures_initial_margin"],
+                notional * p["futures_maintenance_margin"],
+            )
+
+        if qty > 0:
+            return Margin()
+        strike = Decimal(instrument["strike"])
+        if instrument["payoff"] == PayoffType.CALL:
+            otm = max(ZERO, strike - underlying_price)
+        else:
+            otm = max(ZERO, underlying_price - strike)
+        initial = max(
+            p["option_initial_margin"] * underlying_price - otm,
+            p["option_initial_margin_min"] * underlying_price,
+        )
+        maintenance = p["option_maintenance_margin"] * underlying_price
+        return Margin(size * (price + initial), size * (price + maintenance))
+
+    def __merge(self, legs, marks):
+        # instrument key -> (instrument, qty after, price, underlying, margin before)
+        merged = {}
+        for instrument, qty in legs:
+            key = instrument_key(instrument)
+            if key in merged:
+                instrument, held, price, underlying_price, before = merged[key]
+            elif key in self.__holdings:
+                holding = self.__holdings[key]
+                held, price, underlying_price = (
+                    holding.qty,
+                    holding.price,
+                    holding.underlying_price,
+                )
+                before = holding.margin
+            else:
+                if marks is None or key not in marks:
+                    raise KeyError(f"no mark for instrument {key}")
+                held = ZERO
+                price = Decimal(marks[key]["price"])
+                underlying_price = Decimal(marks[key]["underlying_price"])
+                before = Margin()
+            merged[key] = (instrument, held + qty, price, underlying_price, before)
+        return merged
+
+    def __params_for(self, underlying: str) -> Dict[str, Decimal]:
+        params = self.__asset_params.get(underlying)
+        if params is None:
+            raw: SimpleMarginAssetParam = self.params["asset_params"].get(
+                underlying, self.params["default_asset_param"]
+            )
+            params = {k: Decimal(v) for k, v in raw.items()}
+            params["futures_initial_margin"] = max(
+                params["futures_initial_margin"], 1 / params["futures_leverage"]
+            )
+            self.__asset_params[underlying] = params
+        return params
+
+
+@dataclass
+class _ScenarioPosition:
+    underlying: str
+    # P&L in every scenario of the grid
+    pnl: List[float]
+    # amounts the contingency charges of the underlying are based on
+    futures_notional: float = 0.0
+    short_option_notional: float = 0.0
+    net_option_notional: float = 0.0
+
+
+class PortfolioMarginCalculator(object):
+    """
+    Approximates margin of a pool under `PortfolioMarginParams` from the
+    greeks of its `AggregatedPosition` records, by revaluing every position
+    over a grid of underlying price moves (`price_range`, plus the
+    `atm_range` moves) and vol moves (`vol_range_down`, `vol_range_up`):
+
+        P&L = delta * dS + gamma * dS^2 / 2 + vega * dVol / VOL_POINT
+
+    Option vol moves are relative to the position's `iv` and scaled by
+    `(30 days / time to expiry) ** power`, with `short_vega_power` for
+    negative and `long_vega_power` for positive vega.
+
+    The worst scenario loss per underlying is charged in full, the worst loss
+    of all underlyings moving together only partially, weighted by
+    `decorrelation_risk`. Contingency charges are added on futures notional
+    (`futures_contingency`), short option notional (`opt_contingency`) and
+    net option notional (`opt_sum_contingency`); the total is maintenance
+    margin, times `initial_margin_factor` initial margin. This is a model of
+    the server computation, not a replica; reconcile against
+    `PoolMarginUsageStats`.
+
+    Scenario P&L is kept per position and summed per underlying, so updating
+    one position only costs one pass over the grid.
+
+    A calculator covers a single pool: positions of pools other than `pool`
+    are skipped. Without `pool`, all positions must be of the same pool.
+    """
+
+    def __init__(
+        self,
+        params: PortfolioMarginParams,
+        positions: Iterable[AggregatedPosition] = (),
+        now: Optional[float] = None,
+        pool: Optional[UUIDv4] = None,
+    ):
+        self.params = params
+        self.pool = pool
+        # time options' expiries are measured from, seconds since the epoch
+        self.now = now
+        self.__decorrelation = float(params["decorrelation_risk"])
+        self.__initial_factor = float(params["initial_margin_factor"])
+        self.__asset_params: Dict[str, Dict[str, float]] = {}
+        self.__positions: Dict[str, _ScenarioPosition] = {}
+        # per underlying and for the whole pool, sums of position P&L vectors
+        self.__underlyings: Dict[str, _ScenarioPosition] = {}
+        self.__pool_pnl = [0.0] * self.scenario_count
+        for position in _pool_positions(positions, pool):
+            self.set_position(position)
+
+    @property
+    def scenario_count(self) -> int:
+        return (len(PRICE_STEPS) + 2) * 3
+
+    def set_position(self, position: AggregatedPosition):
+        """
+        Adds or replaces a position, e.g. after a fill or a fresh mark.
+        Positions are identified by their instrument, and must be of the
+        calculator's pool.
+        """
+        info = position["position_info"]
+        if self.pool is None:
+            self.pool = info["pool_location"]
+        elif info["pool_location"] != self.pool:
+            raise ValueError(
+                f"position of pool {info['pool_location']}, not {self.pool}"
+            )
+        key = instrument_key(info["instrument"])
+        self.remove_position(info["instrument"])
+        if Decimal(info["qty"]) == 0:
+            return
+        evaluated = self.__evaluate(position)
+        self.__positions[key] = evaluated
+        self.__apply(evaluated, 1)
+
+    def remove_position(self, instrument: Instrument):
+        evaluated = self.__positions.pop(instrument_key(instrument), None)
+        if evaluated is not None:
+            self.__apply(evaluated, -1)
+
+    def scenario_losses(self) -> Dict[str, float]:
+        """
+        Worst scenario loss of each underlying, before contingencies.
+        """
+        return {
+            underlying: max(0.0, -min(u.pnl))
+            for underlying, u in self.__underlyings.items()
+        }
+
+    def margin(self) -> Margin:
+        losses = self.scenario_losses()
+        undiversified = sum(losses.values())
+        correlated = max(0.0, -min(self.__pool_pnl))
+        maintenance = correlated + self.__decorrelation * (undiversified - correlated)
+
+        for underlying, u in self.__underlyings.items():
+            p = self.__params_for(underlying)
+            maintenance += (
+                p["futures_contingency"] * u.futures_notional
+                + p["opt_contingency"] * u.short_option_notional
+                + p["opt_sum_contingency"] * abs(u.net_option_notional)
+            )
+        return Margin(
+            _to_decimal(maintenance * self.__initial_factor),
+            _to_decimal(maintenance),
+        )
+
+    def __apply(self, evaluated: _ScenarioPosition, sign: int):
+        u = self.__underlyings.get(evaluated.underlying)
+        if u is None:
+            u = _ScenarioPosition(evaluated.underlying, [0.0] * self.scenario_count)
+            self.__underlyings[evaluated.underlying] = u
+        for i, pnl in enumerate(evaluated.pnl):
+            u.pnl[i] += sign * pnl
+            self.__pool_pnl[i] += sign * pnl
+        u.futures_notional += sign * evaluated.futures_notional
+        u.short_option_notional += sign * evaluated.short_option_notional
+        u.net_option_notional += sign * evaluated.net_option_notional
+
+    def __evaluate(self, position: AggregatedPosition) -> _ScenarioPosition:
+        info = position["position_info"]
+        instrument = info["instrument"]
+        p = self.__params_for(instrument["underlying"])
+        qty = float(info["qty"])
+        s = float(position["underlying_price"])
+        delta = float(position["sum_delta"])
+        gamma = float(position["sum_gamma"])
+        vega = float(position["sum_vega"])
+
+        evaluated = _ScenarioPosition(instrument["underlying"], [])
+        is_option = instrument["instrument_type"] == InstrumentType.VANILLA_OPTION
+        vol_moves = (0.0, 0.0, 0.0)
+        if is_option:
+            notional = abs(qty) * s
+            if qty < 0:
+                evaluated.short_option_notional = notional
+            evaluated.net_option_notional = qty * s
+
+            days = (parse_rfc3339(instrument["expiry"]) - self.__now()) / 86400
+            power = p["short_vega_power"] if vega < 0 else p["long_vega_power"]
+            scale = (VEGA_TENOR_DAYS / max(days, 1.0)) ** power
+            iv = float(position["iv"])
+            vol_moves = (
+                -p["vol_range_down"] * iv * scale,
+                0.0,
+                p["vol_range_up"] * iv * scale,
+            )
+        else:
+            evaluated.futures_notional = abs(qty) * s
+
+        price_moves = [step * p["price_range"] for step in PRICE_STEPS]
+        price_moves += [-p["atm_range"], p["atm_range"]]
+        for move in price_moves:
+            ds = move * s
+            price_pnl = delta * ds + gamma * ds * ds / 2
+            for dvol in vol_moves:
+                evaluated.pnl.append(price_pnl + vega * dvol / VOL_POINT)
+        return evaluated
+
+    def __params_for(self, underlying: str) -> Dict[str, float]:
+        params = self.__asset_params.get(underlying)
+        if params is None:
+            raw: PortfolioMarginAssetParam = self.params["asset_params"].get(
+                underlying, self.params["default_asset_param"]
+            )
+            params = {k: float(v) for k, v in raw.items()}
+            self.__asset_params[underlying] = params
+        return params
+
+    def __now(self) -> float:
+        return time.time() if self.now is None else self.now
+
+
+def _pool_positions(
+    positions: Iterable[AggregatedPosition], pool: Optional[UUIDv4]
+) -> Iterable[AggregatedPosition]:
+    # positions of `pool`, or of the only pool of `positions` if None
+    explicit = pool is not None
+    for position in positions:
+        location = position["position_info"]["pool_location"]
+        if pool is None:
+            pool = location
+        if location == pool:
+            yield position
+        elif not explicit:
+            raise ValueError("positions of several pools, pass `pool` to pick one")
+
+
+def _to_decimal(value: float) -> Decimal:
+    return Decimal(repr(round(value, 6)))
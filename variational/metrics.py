@@ -0,0 +1,169 @@
+import math
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Tuple
+
+
+@dataclass
+class RequestRecord:
+    """
+    Describes a single HTTP attempt made by `Client`. A call that is retried
+    after HTTP 429 produces one record per attempt.
+    All durations are in seconds.
+    """
+
+    endpoint: str
+    method: str
+    # None if no response was received
+    status_code: Optional[int]
+    # 1 for the first attempt of a call
+    attempt: int
+    request_bytes: int
+    response_bytes: int
+    # time spent waiting before this attempt, e.g. rate limit back-off
+    wait_time: float
+    # time spent preparing and signing the request
+    sign_time: float
+    network_time: float
+    # zero when decoding is left to the caller, see `Client.send_raw`
+    decode_time: float
+    # wall clock timestamp when the request was handed to the transport
+    sent_at: float
+    # wall clock timestamp when the API server received the request
+    server_received_at: Optional[float] = None
+    # delay before the next attempt, if the call is going to be retried
+    retry_delay: Optional[float] = None
+    error: Optional[BaseException] = None
+    # bytes not transferred thanks to content encoding; `request_bytes` is the
+    # size as sent, `response_bytes` the size after decompression. Records of
+    # streamed responses are emitted once the body has been read, except for
+    # `Client.send_raw`, whose streamed records carry the wire size only
+    request_bytes_saved: int = 0
+    response_bytes_saved: int = 0
+
+    @property
+    def upload_time(self) -> Optional[float]:
+        """
+        Time between sending the request and the server receiving it.
+        Includes any difference between the local and server clocks.
+        """
+        if self.server_received_at is None:
+            return None
+        return self.server_received_at - self.sent_at
+
+
+RequestHook = Callable[[RequestRecord], None]
+
+
+class LatencyHistogram(object):
+    """
+    Request hook aggregating network latency per endpoint into logarithmic
+    buckets, each `precision` wide relative to its lower bound. Recording is
+    O(1) and memory doesn't grow with the number of requests.
+
+        histogram = LatencyHistogram()
+        client = Client(key, secret, hooks=[histogram])
+        ...
+        histogram.summary()  # {"GET /quotes": {"count": 10, "p50": ..., "p99": ...}}
+    """
+
+    def __init__(self, precision: float = 0.02, min_value: float = 1e-5):
+        self.log_base = math.log1p(precision)
+        self.min_value = min_value
+        self.__lock = threading.Lock()
+        self.__buckets: Dict[str, Dict[int, int]] = {}
+        self.__counts: Dict[str, int] = {}
+
+    def __call__(self, record: RequestRecord):
+        if record.status_code is None:
+            return
+        self.record(f"{record.method} {record.endpoint}", record.network_time)
+
+    def record(self, key: str, value: float):
+        bucket = self.__bucket(value)
+        with self.__lock:
+            buckets = self.__buckets.setdefault(key, {})
+            buckets[bucket] = buckets.get(bucket, 0) + 1
+            self.__counts[key] = self.__counts.get(key, 0) + 1
+
+    def count(self, key: str) -> int:
+        return self.__counts.get(key, 0)
+
+    def percentile(self, key: str, q: float) -> Optional[float]:
+        """
+        Returns the upper bound of the bucket containing the `q`-th percentile
+        (q ∈ [0, 100]) of latencies recorded for `key`.
+        """
+        with self.__lock:
+            buckets = sorted(self.__buckets.get(key, {}).items())
+            total = self.__counts.get(key, 0)
+        if not total:
+            return None
+
+        rank = max(1, math.ceil(total * q / 100))
+        seen = 0
+        for bucket, n in buckets:
+            seen += n
+            if seen >= rank:
+                return self.min_value * math.exp((bucket + 1) * self.log_base)
+
+    def summary(self, percentiles: Tuple[float, ...] = (50, 99)) -> Dict[str, dict]:
+        result = {}
+        for key in list(self.__counts):
+            stats = {"count": self.count(key)}
+            for q in percentiles:
+                stats[f"p{q:g}"] = self.percentile(key, q)
+            result[key] = stats
+        return result
+
+    def reset(self):
+        with self.__lock:
+            self.__buckets.clear()
+            self.__counts.clear()
+
+    def __bucket(self, value: float) -> int:
+        if value <= self.min_value:
+            return 0
+        return int(math.log(value / self.min_value) / self.log_base)
+
+
+class CompressionStats(object):
+    """
+    Request hook totalling bytes transferred and bytes saved by content
+    encoding per endpoint, in both directions.
+
+        stats = CompressionStats()
+        client = Client(key, secret, hooks=[stats])
+        ...
+        stats.summary()  # {"GET /rfqs/received": {"sent": ..., "received": ..., ...}}
+    """
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__totals: Dict[str, Dict[str, int]] = {}
+
+    def __call__(self, record: RequestRecord):
+        key = f"{record.method} {record.endpoint}"
+        with self.__lock:
+            totals = self.__totals.setdefault(
+                key, dict(sent=0, sent_saved=0, received=0, received_saved=0)
+            )
+            totals["sent"] += record.request_bytes
+            totals["sent_saved"] += record.request_bytes_saved
+            # bytes as read from the connection
+            totals["received"] += record.response_bytes - record.response_bytes_saved
+            totals["received_saved"] += record.response_bytes_saved
+
+    def bytes_saved(self) -> int:
+        with self.__lock:
+            return sum(
+                t["sent_saved"] + t["received_saved"] for t in self.__totals.values()
+            )
+
+    def summary(self) -> Dict[str, dict]:
+        with self.__lock:
+            return {key: dict(totals) for key, totals in self.__totals.items()}
+
+    def reset(self):
+        with self.__lock:
+            self.__totals.clear()
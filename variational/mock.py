@@ -0,0 +1,841 @@
+import hashlib
+import hmac
+import io
+import json
+import random
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from urllib3 import HTTPResponse
+
+from .client import MAINNET, RATE_LIMIT_RESET_MS_HEADER
+from .compression import COMPRESSORS, DECOMPRESSORS, SUPPORTED_ENCODINGS
+from .models import (
+    RFQ,
+    ApiRole,
+    ClearingStatus,
+    InstrumentType,
+    PayoffType,
+    Position,
+    Quote,
+    RFQStatus,
+    SettlementPool,
+    SettlementPoolStatus,
+    Trade,
+    TradeRole,
+    TradeSide,
+    TradeStatus,
+    TradeType,
+    Transfer,
+    TransferStatus,
+    TransferType,
+)
+from .timestamps import format_rfc3339
+from .transport import Timeout, Transport
+from .wrappers import REQUEST_RECEIVED_MS_HEADER
+
+DEFAULT_PAGE_LIMIT = 100
+UNDERLYINGS = {"BTC": 65000.0, "ETH": 3500.0}
+
+Handler = Callable[[dict, object], Tuple[int, object]]
+
+
+class MockServer(Transport):
+    """
+    In-process stand-in for the Variational API, usable as a `Client`
+    transport for benchmarks, load tests and offline development:
+
+        server = MockServer()
+        server.seed(rfqs=1000, positions=200)
+        client = Client("key", server.secret, transport=server)
+
+    Requests are authenticated against `key`/`secret`, list endpoints are
+    paginated with `limit`/`offset`, and every `rate_limit_every`-th request
+    is answered with HTTP 429 carrying `x-rate-limit-resets-in-ms`.
+    """
+
+    def __init__(
+        self,
+        key: str = "key",
+        secret: Optional[str] = None,
+        base_url: str = MAINNET,
+        latency: float = 0,
+        rate_limit_every: Optional[int] = None,
+        rate_limit_reset_ms: int = 100,
+        seed: int = 0,
+    ):
+        self.key = key
+        self.secret = secret or "00" * 32
+        self.prefix = urlsplit(base_url).path.rstrip("/")
+        self.latency = latency
+        self.rate_limit_every = rate_limit_every
+        self.rate_limit_reset_ms = rate_limit_reset_ms
+        self.random = random.Random(seed)
+        self.company = self.uuid()
+        self.counterparty = self.uuid()
+        self.request_count = 0
+        self.lock = threading.Lock()
+
+        self.companies: List[dict] = [
+            _company(self.company, "Our Company", "us", is_lp=True),
+            _company(self.counterparty, "Their Company", "them", is_lp=False),
+        ]
+        self.rfqs_sent: List[RFQ] = []
+        self.rfqs_received: List[RFQ] = []
+        self.quotes: List[Quote] = []
+        self.positions: List[Position] = []
+        self.trades: List[Trade] = []
+        self.transfers: List[Transfer] = []
+        self.pools: List[SettlementPool] = []
+
+        self.routes: Dict[Tuple[str, str], Handler] = {
+            ("GET", "/addresses"): self._get_addresses,
+            ("GET", "/companies"): self._list("companies", "id"),
+            ("GET", "/me"): self._get_me,
+            ("GET", "/metadata/limits"): self._get_limits,
+            ("GET", "/metadata/supported_assets"): self._get_supported_assets,
+            ("GET", "/portfolio/assets"): self._get_assets,
+            ("GET", "/portfolio/positions"): self._list("positions", None),
+            ("GET", "/portfolio/positions/aggregated"): self._get_aggregated,
+            ("GET", "/portfolio/summary"): self._get_summary,
+            ("GET", "/portfolio/trades"): self._list("trades", "id"),
+            ("GET", "/quotes"): self._list("quotes", "parent_quote_id"),
+            ("GET", "/quotes/received"): self._list("quotes", "parent_quote_id"),
+            ("GET", "/quotes/sent"): self._list("quotes", "parent_quote_id"),
+            ("GET", "/rfqs/received"): self._get_rfqs("rfqs_received"),
+            ("GET", "/rfqs/sent"): self._get_rfqs("rfqs_sent"),
+            ("GET", "/settlement_pools"): self._list("pools", "pool_id"),
+            ("GET", "/status"): self._get_status,
+            ("GET", "/transfers"): self._list(
+                "transfers", "id", "target_pool_location"
+            ),
+            ("POST", "/price/instrument"): self._price_instrument,
+            ("POST", "/price/structure"): self._price_structure,
+            ("POST", "/quotes/accept"): self._accept_quote,
+            ("POST", "/quotes/cancel"): self._cancel_quote,
+            ("POST", "/quotes/cancel_all"): self._cancel_all_quotes,
+            ("POST", "/quotes/maker_last_look"): self._maker_last_look,
+            ("POST", "/quotes/new"): self._create_quote,
+            ("POST", "/quotes/replace"): self._replace_quote,
+            ("POST", "/rfqs/cancel"): self._cancel_rfq,
+            ("POST", "/rfqs/new"): self._create_rfq,
+            ("POST", "/settlement_pools/new"): self._create_pool,
+            ("POST", "/transfers/new"): self._create_transfer,
+            ("POST", "/transfers/permit"): lambda query, body: (200, True),
+            ("POST", "/transfers/permit/template"): self._permit_template,
+        }
+
+    def uuid(self) -> str:
+        return str(uuid.UUID(int=self.random.getrandbits(128), version=4))
+
+    def seed(
+        self,
+        rfqs: int = 0,
+        quotes_per_rfq: int = 2,
+        positions: int = 0,
+        trades: int = 0,
+        transfers: int = 0,
+    ):
+        """
+        Fills the server with generated records of realistic shape and size.
+        """
+        pool = self._new_pool()
+        for _ in range(rfqs):
+            self.rfqs_received.append(self.make_rfq(quotes_per_rfq))
+        for _ in range(positions):
+            self.positions.append(self.make_position(pool["pool_id"]))
+        for _ in range(trades):
+            self.trades.append(self.make_trade(pool["pool_id"]))
+        for _ in range(transfers):
+            self.transfers.append(self.make_transfer(pool["pool_id"]))
+
+    def make_instrument(self) -> dict:
+        underlying = self.random.choice(list(UNDERLYINGS))
+        if self.random.random() < 0.3:
+            return {
+                "instrument_type": InstrumentType.PERPETUAL_FUTURE,
+                "underlying": underlying,
+                "settlement_asset": "USDC",
+                "funding_interval_s": 3600,
+                "dex_token_details": None,
+            }
+        spot = UNDERLYINGS[underlying]
+        return {
+            "instrument_type": InstrumentType.VANILLA_OPTION,
+            "underlying": underlying,
+            "settlement_asset": "USDC",
+            "expiry": "2030-12-27T08:00:00Z",
+            "strike": str(round(spot * self.random.uniform(0.7, 1.3), -2)),
+            "payoff": self.random.choice(list(PayoffType)),
+            "exercise": "european",
+        }
+
+    def make_instrument_price(self, instrument: dict) -> dict:
+        spot = UNDERLYINGS[instrument["underlying"]]
+        if instrument["instrument_type"] == InstrumentType.VANILLA_OPTION:
+            price = spot * self.random.uniform(0.01, 0.1)
+            greeks = [self.random.uniform(-1, 1), 1e-5, -50.0, 100.0, 10.0]
+        else:
+            price = spot
+            greeks = [1.0, 0.0, 0.0, 0.0, 0.0]
+        delta, gamma, theta, vega, rho = greeks
+        return {
+            "price": f"{price:.2f}",
+            "native_price": f"{price / spot:.8f}",
+            "delta": f"{delta:.8f}",
+            "gamma": f"{gamma:.8f}",
+            "theta": f"{theta:.8f}",
+            "vega": f"{vega:.8f}",
+            "rho": f"{rho:.8f}",
+            "iv": "0.55",
+            "underlying_price": f"{spot:.2f}",
+            "interest_rate": "0.05",
+            "timestamp": _now_rfc3339(),
+        }
+
+    def make_structure_price(self, structure: dict) -> dict:
+        legs = [
+            self.make_instrument_price(leg["instrument"]) for leg in structure["legs"]
+        ]
+        fields = ("price", "native_price", "delta", "gamma", "theta", "vega", "rho")
+        totals = {}
+        for field in fields:
+            total = 0.0
+            for leg, price in zip(structure["legs"], legs):
+                sign = 1 if leg["side"] == TradeSide.BUY else -1
+                total += sign * leg["ratio"] * float(price[field])
+            totals[field] = f"{total:.8f}"
+        totals["timestamp"] = _now_rfc3339()
+        return {"legs": legs, "structure": totals}
+
+    def make_rfq(self, quotes: int = 2, structure: Optional[dict] = None) -> RFQ:
+        rfq_id = self.uuid()
+        if structure is None:
+            structure = {
+                "legs": [
+                    {
+                        "side": self.random.choice(list(TradeSide)),
+                        "ratio": 1,
+                        "instrument": self.make_instrument(),
+                    }
+                    for _ in range(self.random.randint(1, 4))
+                ]
+            }
+        rfq_legs = [
+            {
+                "rfq_leg_id": self.uuid(),
+                "rfq_id": rfq_id,
+                "instrument": leg["instrument"],
+                "side": leg["side"],
+                "qty": str(leg["ratio"]),
+            }
+            for leg in structure["legs"]
+        ]
+        rfq = {
+            "rfq_id": rfq_id,
+            "created_at": _now_rfc3339(),
+            "clearing_status": None,
+            "structure": structure,
+            "structure_price": self.make_structure_price(structure)["structure"],
+            "rfq_expires_at": _now_rfc3339(300),
+            "taker_company": self.counterparty,
+            "rfq_status": RFQStatus.OPEN,
+            "qty": "1",
+            "rfq_legs": rfq_legs,
+            "quotes_common_metadata": {},
+            "bids": [],
+            "asks": [],
+        }
+        for _ in range(quotes):
+            price = self.random.uniform(100, 5000)
+            quote = self.make_quote(rfq, bid=f"{price:.2f}", ask=f"{price * 1.01:.2f}")
+            self._add_quote_to_rfq(rfq, quote)
+        return rfq
+
+    def make_quote(
+        self, rfq: RFQ, bid: Optional[str], ask: Optional[str], maker=None
+    ) -> Quote:
+        return {
+            "parent_quote_id": self.uuid(),
+            "target_rfq_id": rfq["rfq_id"],
+            "maker_company": maker or self.company,
+            "expires_at": _now_rfc3339(60),
+            "aggregated_bid": bid,
+            "aggregated_ask": ask,
+            "clearing_status": None,
+            "clearing_events": [],
+            "new_pool_name": None,
+            "creator_params": None,
+            "other_params": None,
+            "pool_location": None,
+            "per_leg_quotes": [
+                {"target_rfq_leg_id": leg["rfq_leg_id"], "bid": bid, "ask": ask}
+                for leg in rfq["rfq_legs"]
+            ],
+        }
+
+    def make_position(self, pool_id: str) -> Position:
+        instrument = self.make_instrument()
+        return {
+            "company": self.company,
+            "pool_location": pool_id,
+            "counterparty": self.counterparty,
+            "instrument": instrument,
+            "updated_at": _now_rfc3339(),
+            "qty": f"{self.random.uniform(-10, 10):.4f}",
+            "avg_entry_price": self.make_instrument_price(instrument)["price"],
+            "taker_qty": "0",
+        }
+
+    def make_trade(self, pool_id: str) -> Trade:
+        instrument = self.make_instrument()
+        return {
+            "id": self.uuid(),
+            "source_rfq": self.uuid(),
+            "source_rfq_leg_id": self.uuid(),
+            "source_quote": self.uuid(),
+            "company": self.company,
+            "counterparty": self.counterparty,
+            "created_at": _now_rfc3339(),
+            "side": self.random.choice(list(TradeSide)),
+            "instrument": instrument,
+            "price": self.make_instrument_price(instrument)["price"],
+            "qty": f"{self.random.uniform(0.1, 10):.4f}",
+            "pool_location": pool_id,
+            "role": self.random.choice(list(TradeRole)),
+            "trade_type": TradeType.TRADE,
+            "status": TradeStatus.confirmed,
+        }
+
+    def make_transfer(self, pool_id: str) -> Transfer:
+        return {
+            "id": self.uuid(),
+            "rfq_id": self.uuid(),
+            "parent_quote_id": self.uuid(),
+            "oracle_request_id": None,
+            "created_at": _now_rfc3339(),
+            "company": self.company,
+            "counterparty": self.counterparty,
+            "qty": f"{self.random.uniform(1, 10000):.6f}",
+            "asset": "USDC",
+            "target_pool_location": pool_id,
+            "transfer_type": self.random.choice(list(TransferType)),
+            "status": TransferStatus.CONFIRMED,
+            "confirmed_by_transaction_id": "0x" + "ab" * 32,
+        }
+
+    def add_quote(self, rfq: RFQ, quote: Quote):
+        """
+        Lists `quote` on `rfq`, where it can be accepted, replaced or
+        cancelled like a quote created through the API.
+        """
+        self.quotes.append(quote)
+        self._add_quote_to_rfq(rfq, quote)
+
+    def make_permit_template(
+        self,
+        pool_address: str,
+        value: int | str,
+        seconds_until_expiry: Optional[int] = None,
+    ) -> dict:
+        """
+        Returns the EIP-712 permit message `/transfers/permit/template` answers
+        with, `value` may be an int or a hex string.
+        """
+        return {
+            "types": {
+                "EIP712Domain": [
+                    {"name": "name", "type": "string"},
+                    {"name": "version", "type": "string"},
+                    {"name": "chainId", "type": "uint256"},
+                    {"name": "verifyingContract", "type": "address"},
+                ],
+                "Permit": [
+                    {"name": "owner", "type": "address"},
+                    {"name": "spender", "type": "address"},
+                    {"name": "value", "type": "uint256"},
+                    {"name": "nonce", "type": "uint256"},
+                    {"name": "deadline", "type": "uint256"},
+                ],
+            },
+            "primaryType": "Permit",
+            "domain": {
+                "name": "USD Coin",
+                "version": "2",
+                "chainId": "0xaa36a7",
+                "verifyingContract": "0x" + "11" * 20,
+            },
+            "message": {
+                "owner": "0x" + "22" * 20,
+                "spender": pool_address,
+                "value": int(str(value), 0),
+                "nonce": 0,
+                "deadline": int(time.time()) + (seconds_until_expiry or 3600),
+            },
+        }
+
+    def send(
+        self,
+        request: requests.PreparedRequest,
+        timeout: Timeout = None,
+        stream: bool = False,
+    ) -> requests.Response:
+        received_at = time.time()
+        if self.latency:
+            time.sleep(self.latency)
+
+        with self.lock:
+            self.request_count += 1
+            status, body, headers = self._handle(request)
+
+        headers[REQUEST_RECEIVED_MS_HEADER] = str(int(received_at * 1000))
+        content = json.dumps(body).encode()
+        encoding = _negotiate_encoding(request.headers.get("Accept-Encoding", ""))
+        if encoding is not None:
+            content = COMPRESSORS[encoding](content)
+            headers["content-encoding"] = encoding
+        headers["content-length"] = str(len(content))
+        resp = requests.Response()
+        resp.status_code = status
+        resp.headers = CaseInsensitiveDict(headers)
+        # read and decoded like a body coming from the network, so streaming
+        # and decompression are exercised
+        resp.raw = HTTPResponse(
+            body=io.BytesIO(content),
+            headers=headers,
+            status=status,
+            preload_content=False,
+            decode_content=True,
+        )
+        resp.encoding = "utf-8"
+        resp.url = request.url
+        resp.request = request
+        resp.reason = "OK" if status == 200 else "Error"
+        return resp
+
+    def _handle(self, request: requests.PreparedRequest) -> Tuple[int, object, dict]:
+        headers = {"content-type": "application/json"}
+        if self.rate_limit_every and self.request_count % self.rate_limit_every == 0:
+            headers[RATE_LIMIT_RESET_MS_HEADER] = str(self.rate_limit_reset_ms)
+            return 429, _error(429, "rate limit exceeded"), headers
+
+        if not self._is_authenticated(request):
+            return 401, _error(401, "invalid signature"), headers
+
+        url = urlsplit(request.url)
+        path = url.path.removeprefix(self.prefix)
+        handler = self.routes.get((request.method, path))
+        if handler is None:
+            return 404, _error(404, f"unknown endpoint {path}"), headers
+
+        query = dict(parse_qsl(url.query))
+        body = request.body
+        if body and (encoding := request.headers.get("Content-Encoding")):
+            body = DECOMPRESSORS[encoding](body)
+        body = json.loads(body) if body else None
+        try:
+            status, result = handler(query, body)
+        except KeyError as e:
+            return 400, _error(400, f"missing field {e}"), headers
+        if status != 200:
+            return status, _error(status, result), headers
+        if isinstance(result, tuple):
+            result, next_page = result
+            return (
+                200,
+                {"result": result, "pagination": {"next_page": next_page}},
+                headers,
+            )
+        return 200, {"result": result}, headers
+
+    def _is_authenticated(self, request: requests.PreparedRequest) -> bool:
+        if request.headers.get("X-Variational-Key") != self.key:
+            return False
+        timestamp_ms = request.headers.get("X-Request-Timestamp-Ms")
+        message = f"{self.key}|{timestamp_ms}|{request.method}|{request.path_url}"
+        signer = hmac.new(bytes.fromhex(self.secret), message.encode(), hashlib.sha256)
+        if isinstance(request.body, bytes):
+            signer.update(b"|")
+            signer.update(request.body)
+        return hmac.compare_digest(
+            signer.hexdigest(), request.headers.get("X-Variational-Signature", "")
+        )
+
+    def _list(
+        self,
+        collection: str,
+        id_field: Optional[str],
+        pool_field: str = "pool_location",
+    ) -> Handler:
+        def _inner(query, body):
+            items = getattr(self, collection)
+            if id_field and "id" in query:
+                items = [i for i in items if i[id_field] == query["id"]]
+            if "pool" in query:
+                items = [i for i in items if i[pool_field] == query["pool"]]
+            return 200, _paginate(items, query)
+
+        return _inner
+
+    def _get_rfqs(self, collection: str) -> Handler:
+        list_rfqs = self._list(collection, "rfq_id")
+
+        def _inner(query, body):
+            status, (items, next_page) = list_rfqs(query, body)
+            if query.get("price") == "false":
+                items = [dict(rfq, structure_price=None) for rfq in items]
+            return status, (items, next_page)
+
+        return _inner
+
+    def _get_addresses(self, query, body):
+        return 200, [
+            {
+                "created_at": _now_rfc3339(),
+                "company": c["id"],
+                "address": "0x" + c["id"].replace("-", "")[:40].ljust(40, "0"),
+                "enabled": True,
+            }
+            for c in self.companies
+            if "company" not in query or c["id"] == query["company"]
+        ]
+
+    def _get_me(self, query, body):
+        return 200, {
+            "key_id": self.uuid(),
+            "company_id": self.company,
+            "role": ApiRole.WRITER,
+        }
+
+    def _get_status(self, query, body):
+        return 200, {
+            "auth": self._get_me(query, body)[1],
+            "server_timestamp_ms": int(time.time() * 1000),
+        }
+
+    def _get_limits(self, query, body):
+        return 200, {
+            "min_order_notional": "0.1",
+            "max_order_notional": "1000000",
+            "default_precision_requirements": {
+                "min_decimal_figures": 2,
+                "max_decimal_only_figures": 4,
+                "max_significant_figures": 6,
+            },
+        }
+
+    def _get_supported_assets(self, query, body):
+        return 200, {
+            asset: [
+                {
+                    "asset": asset,
+                    "is_dex": False,
+                    "token_uri": None,
+                    "name": asset,
+                    "address": None,
+                    "dex_token_details": None,
+                    "verified": True,
+                    "variational_funding_rate_params": {
+                        "normal_threshold": "0.1",
+                        "high_threshold": "0.5",
+                        "extreme_threshold": "0.9",
+                        "normal_slope": "0.0001",
+                        "high_slope": "0.001",
+                        "extreme_slope": "0.01",
+                        "min_imbalance_dollars": "10000",
+                        "funding_exponent_factor": "1",
+                    },
+                    "precision_requirements": None,
+                    "min_qty_tick": None,
+                    "fdv": None,
+                    "volume_24h": None,
+                }
+            ]
+            for asset in UNDERLYINGS
+        }
+
+    def _get_assets(self, query, body):
+        assets = [
+            {
+                "company": self.company,
+                "pool_location": pool["pool_id"],
+                "counterparty": self.counterparty,
+                "asset": "USDC",
+                "qty": "100000",
+            }
+            for pool in self.pools
+            if "pool" not in query or pool["pool_id"] == query["pool"]
+        ]
+        return 200, _paginate(assets, query)
+
+    def _get_aggregated(self, query, body):
+        return 200, _paginate(self._aggregated_positions(), query)
+
+    def _get_summary(self, query, body):
+        sums = dict.fromkeys(
+            ("delta", "gamma", "rho", "theta", "vega", "notional"), 0.0
+        )
+        for agg in self._aggregated_positions():
+            for k in ("delta", "gamma", "rho", "theta", "vega"):
+                sums[k] += float(agg[f"sum_{k}"])
+            sums["notional"] += float(agg["notional"])
+        return 200, {
+            "sum_balance": "100000",
+            "sum_delta": f"{sums['delta']:.8f}",
+            "sum_gamma": f"{sums['gamma']:.8f}",
+            "sum_upnl": "0",
+            "sum_notional": f"{sums['notional']:.2f}",
+            "sum_rho": f"{sums['rho']:.8f}",
+            "sum_theta": f"{sums['theta']:.8f}",
+            "sum_vega": f"{sums['vega']:.8f}",
+            "sum_dollar_delta": "0",
+            "sum_dollar_gamma": "0",
+        }
+
+    def _aggregated_positions(self) -> List[dict]:
+        aggregated = []
+        for position in self.positions:
+            price = self.make_instrument_price(position["instrument"])
+            qty = float(position["qty"])
+            aggregated.append(
+                {
+                    "price": price["price"],
+                    "underlying_price": price["underlying_price"],
+                    "iv": price["iv"],
+                    "sum_delta": f"{float(price['delta']) * qty:.8f}",
+                    "sum_gamma": f"{float(price['gamma']) * qty:.8f}",
+                    "upnl": "0",
+                    "notional": f"{float(price['price']) * qty:.2f}",
+                    "sum_rho": f"{float(price['rho']) * qty:.8f}",
+                    "sum_theta": f"{float(price['theta']) * qty:.8f}",
+                    "sum_vega": f"{float(price['vega']) * qty:.8f}",
+                    "position_info": position,
+                }
+            )
+        return aggregated
+
+    def _price_instrument(self, query, body):
+        return 200, self.make_instrument_price(body)
+
+    def _price_structure(self, query, body):
+        return 200, self.make_structure_price(body)
+
+    def _create_rfq(self, query, body):
+        rfq = self.make_rfq(quotes=0, structure=body["structure"])
+        rfq.update(qty=body["qty"], rfq_expires_at=body["expires_at"])
+        rfq["taker_company"] = self.company
+        self.rfqs_sent.append(rfq)
+        return 200, rfq
+
+    def _cancel_rfq(self, query, body):
+        rfq = self._find_rfq(body["id"])
+        if rfq is None:
+            return 404, "rfq not found"
+        rfq["rfq_status"] = RFQStatus.CANCELED
+        return 200, True
+
+    def _create_quote(self, query, body):
+        rfq = self._find_rfq(body["rfq_id"])
+        if rfq is None:
+            return 404, "rfq not found"
+        leg_quotes = body["leg_quotes"]
+        quote = self.make_quote(rfq, bid=leg_quotes[0]["bid"], ask=leg_quotes[0]["ask"])
+        quote.update(expires_at=body["expires_at"], per_leg_quotes=leg_quotes)
+        self.add_quote(rfq, quote)
+        return 200, quote
+
+    def _replace_quote(self, query, body):
+        quote = self._find_quote(body["parent_quote_id"])
+        if quote is None:
+            return 404, "quote not found"
+        leg_quotes = body["leg_quotes"]
+        quote.update(
+            expires_at=body["expires_at"],
+            per_leg_quotes=leg_quotes,
+            aggregated_bid=leg_quotes[0]["bid"],
+            aggregated_ask=leg_quotes[0]["ask"],
+        )
+        return 200, quote
+
+    def _cancel_quote(self, query, body):
+        quote = self._find_quote(body["id"])
+        if quote is None:
+            return 404, "quote not found"
+        self.quotes.remove(quote)
+        return 200, True
+
+    def _cancel_all_quotes(self, query, body):
+        self.quotes.clear()
+        return 200, True
+
+    def _accept_quote(self, query, body):
+        quote = self._find_quote(body["parent_quote_id"])
+        if quote is None:
+            return 404, "quote not found"
+        self._set_clearing_status(quote, ClearingStatus.PENDING_MAKER_LAST_LOOK)
+        return 200, {
+            "pending_deposits_sum_qty": "0",
+            "pending_settlement_pool": None,
+            "new_clearing_status": quote["clearing_status"],
+        }
+
+    def _maker_last_look(self, query, body):
+        quote = self._find_quote(body["parent_quote_id"])
+        if quote is None:
+            return 404, "quote not found"
+        if body["action"] == "accept":
+            pool = self._new_pool()
+            quote["pool_location"] = pool["pool_id"]
+            status = ClearingStatus.SUCCESS_TRADES_BOOKED_INTO_POOL
+        else:
+            status = ClearingStatus.REJECTED_MAKER_LAST_LOOK_REJECTED
+        self._set_clearing_status(quote, status)
+        return 200, {
+            "new_clearing_status": status,
+            "pending_deposits_sum_qty": "0",
+            "settlement_pool_address": "0x" + "00" * 20,
+        }
+
+    def _create_pool(self, query, body):
+        return 200, self._new_pool(body["pool_name"])
+
+    def _create_transfer(self, query, body):
+        transfer = self.make_transfer(body["target_pool_location"])
+        transfer.update(
+            asset=body["asset"],
+            qty=body["qty"],
+            counterparty=body["counterparty"],
+            transfer_type=body["transfer_type"],
+        )
+        self.transfers.append(transfer)
+        return 200, transfer
+
+    def _permit_template(self, query, body):
+        return 200, self.make_permit_template(
+            body["pool_address"],
+            body["allowance"]["value"],
+            body["seconds_until_expiry"],
+        )
+
+    def _new_pool(self, name: str = "pool") -> SettlementPool:
+        pool = {
+            "pool_id": self.uuid(),
+            "company_id": self.company,
+            "data": {
+                "created_at": _now_rfc3339(),
+                "company_creator": self.company,
+                "status": SettlementPoolStatus.OPEN,
+                "address": "0x" + "33" * 20,
+                "name": name,
+                "confirmed_by_transaction_id": "0x" + "cd" * 32,
+                "parties": [],
+                "positions": [],
+            },
+            "error": None,
+        }
+        self.pools.append(pool)
+        return pool
+
+    def _find_rfq(self, rfq_id: str) -> Optional[RFQ]:
+        for rfq in self.rfqs_received + self.rfqs_sent:
+            if rfq["rfq_id"] == rfq_id:
+                return rfq
+
+    def _find_quote(self, parent_quote_id: str) -> Optional[Quote]:
+        for quote in self.quotes:
+            if quote["parent_quote_id"] == parent_quote_id:
+                return quote
+
+    def _add_quote_to_rfq(self, rfq: RFQ, quote: Quote):
+        parent_quote_id = quote["parent_quote_id"]
+        rfq["quotes_common_metadata"][parent_quote_id] = {
+            "parent_quote_id": parent_quote_id,
+            "maker_company": quote["maker_company"],
+            "clearing_status": None,
+            "expires_at": quote["expires_at"],
+            "pool_location": None,
+            "new_pool_name": None,
+            "creator_params": None,
+            "other_params": None,
+            "pool_creator_company": None,
+            "pool_other_company": None,
+            "pool_creator_params": None,
+            "pool_other_params": None,
+            "clearing_events": [],
+        }
+        for side, price in (
+            ("bids", quote["aggregated_bid"]),
+            ("asks", quote["aggregated_ask"]),
+        ):
+            if price is None:
+                continue
+            rfq[side].append(
+                {
+                    "parent_quote_id": parent_quote_id,
+                    "quote_price": price,
+                    "counter_factual_margin_requirements": None,
+                    "existing_margin_requirements": None,
+                    "additional_margin_requirements": {
+                        "initial_margin": "100",
+                        "maintenance_margin": "50",
+                    },
+                    "margin_requirements_counter_factual_request_id": self.uuid(),
+                    "existing_margin_requirements_request_id": self.uuid(),
+                }
+            )
+
+    def _set_clearing_status(self, quote: Quote, status: ClearingStatus):
+        quote["clearing_status"] = status
+        quote["clearing_events"].append(
+            {
+                "rfq_id": quote["target_rfq_id"],
+                "parent_quote_id": quote["parent_quote_id"],
+                "status": status,
+                "created_at": _now_rfc3339(),
+                "taker_side": None,
+            }
+        )
+        rfq = self._find_rfq(quote["target_rfq_id"])
+        if rfq is not None:
+            rfq["clearing_status"] = status
+
+
+def _negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    for encoding in accept_encoding.split(","):
+        encoding = encoding.split(";")[0].strip()
+        if encoding in COMPRESSORS and encoding in SUPPORTED_ENCODINGS:
+            return encoding
+    return None
+
+
+def _paginate(items: list, query: dict) -> Tuple[list, Optional[dict]]:
+    limit = int(query.get("limit", DEFAULT_PAGE_LIMIT))
+    offset = int(query.get("offset", 0))
+    end = offset + limit
+    next_page = None
+    if end < len(items):
+        next_page = {"limit": str(limit), "offset": str(end)}
+    return items[offset:end], next_page
+
+
+def _company(id: str, legal_name: str, short_name: str, is_lp: bool) -> dict:
+    return {
+        "id": id,
+        "created_at": _now_rfc3339(),
+        "legal_name": legal_name,
+        "short_name": short_name,
+        "is_lp": is_lp,
+    }
+
+
+def _error(code: int, message: str) -> dict:
+    return {"error": {"code": code, "message": message}}
+
+
+def _now_rfc3339(offset: float = 0) -> str:
+    return format_rfc3339(time.time() + offset)
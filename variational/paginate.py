@@ -1,19 +1,22 @@
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
 from typing import Callable, Generator
 
+from .tracing import get_tracer, start_span
 from .wrappers import Pagination, ApiPage, T, ApiList
 
 
 def paginate(
     method: Callable[..., ApiPage[T]], *args, page=None, **kwargs
 ) -> Generator[T, None, None]:
+    tracer = get_tracer(method)
+    page_number = 0
     next_pagination = Pagination(next_page=page)
     while True:
-        wrapper = method(*args, page=next_pagination.next_page, **kwargs)
-
-        if isinstance(wrapper, ApiPage):
-            next_pagination = wrapper.pagination
-        else:
-            next_pagination = None
+        page_number += 1
+        wrapper = _fetch_page(
+            tracer, page_number, method, *args, page=next_pagination.next_page, **kwargs
+        )
 
         if isinstance(wrapper, ApiPage) or isinstance(wrapper, ApiList):
             for item in wrapper.result:
@@ -21,5 +24,70 @@ def paginate(
         else:
             raise ValueError("method does not support pagination")
 
+        # streamed pages only know the next page once their items are read
+        if isinstance(wrapper, ApiPage):
+            next_pagination = wrapper.pagination
+        else:
+            next_pagination = None
+
         if not next_pagination or not next_pagination.next_page:
             break
+
+
+def paginate_pipelined(
+    method: Callable[..., ApiPage[T]], *args, page=None, **kwargs
+) -> Generator[T, None, None]:
+    """
+    Same as `paginate`, but requests the next page in a background thread
+    while items of the current page are being consumed.
+    """
+    tracer = get_tracer(method)
+    page_number = 1
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        wrapper = _fetch_page(tracer, page_number, method, *args, page=page, **kwargs)
+        while True:
+            if isinstance(wrapper, ApiList):
+                yield from wrapper.result
+                break
+            if not isinstance(wrapper, ApiPage):
+                raise ValueError("method does not support pagination")
+
+            # streamed pages only know the next page once their items are read
+            streamed = not isinstance(wrapper.result, list)
+            if streamed:
+                yield from wrapper.result
+            next_page = wrapper.pagination.next_page
+            future = None
+            if next_page:
+                page_number += 1
+                # run in a copy of the current context, so that the page span
+                # is parented to the caller's span
+                future = executor.submit(
+                    contextvars.copy_context().run,
+                    _fetch_page,
+                    tracer,
+                    page_number,
+                    method,
+                    *args,
+                    page=next_page,
+                    **kwargs,
+                )
+
+            if not streamed:
+                yield from wrapper.result
+
+            if future is None:
+                break
+            wrapper = future.result()
+
+
+def _fetch_page(tracer, page_number: int, method: Callable, *args, **kwargs):
+    with start_span(
+        tracer, "variational.paginate.page", {"variational.page": page_number}
+    ) as span:
+        wrapper = method(*args, **kwargs)
+        # streamed pages aren't read yet, so their item count isn't known
+        if span is not None and isinstance(wrapper, (ApiPage, ApiList)):
+            if isinstance(wrapper.result, list):
+                span.set_attribute("variational.items", len(wrapper.result))
+        return wrapper
@@ -1,16 +1,136 @@
-from typing import Optional
+from concurrent.futures import (
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed,
+)
+import multiprocessing
+from dataclasses import dataclass
+from typing import Dict, List, Mapping, Optional, Tuple
 
+from eth_abi import encode
 from eth_account import Account
-from eth_account.messages import encode_typed_data
+from eth_account.messages import (
+    SignableMessage,
+    encode_typed_data,
+    get_primary_type,
+    hash_domain,
+)
+from eth_utils import is_0x_prefixed, is_hexstr, keccak, to_bytes, to_int
 
 from .models import H160, Allowance, AllowanceType, StrDecimal
 from .client import Client
 
+UNLIMITED_ALLOWANCE: Allowance = {
+    "type": AllowanceType.BASE,
+    "value": hex(2**256 - 1),
+}
+
+
+@dataclass
+class PermitResult:
+    pool_address: H160
+    # set if any step of fetching, signing or submitting the permit failed
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class PermitSigner(object):
+    """
+    Signs EIP-712 typed data like `encode_typed_data` + `Account.sign_message`,
+    but caches the parts that rarely change between permits: the parsed
+    private key, the domain separator per domain (chainId, verifyingContract,
+    ...) and the type hash and field layout per message type. Only the
+    per-permit fields are encoded and hashed for each message.
+
+    The fast path covers message types whose fields are all atomic (address,
+    bool, (u)intN, bytesN, bytes, string), which is what permits use. Other
+    types, and any type whose first message doesn't encode exactly like
+    `encode_typed_data`, are always encoded by eth_account.
+    """
+
+    def __init__(self, private_key: str):
+        self.__account = Account.from_key(private_key)
+        self.__domains: Dict[tuple, bytes] = {}
+        self.__types: Dict[tuple, Optional[Tuple[bytes, list]]] = {}
+
+    def encode(self, msg: dict) -> SignableMessage:
+        domain = msg["domain"]
+        domain_key = tuple(sorted(domain.items()))
+        domain_hash = self.__domains.get(domain_key)
+        if domain_hash is None:
+            domain_hash = self.__domains[domain_key] = bytes(hash_domain(domain))
+
+        types = msg["types"]
+        types_key = (
+            msg.get("primaryType"),
+            tuple(
+                (name, tuple((f["name"], f["type"]) for f in fields))
+                for name, fields in types.items()
+            ),
+        )
+        if types_key not in self.__types:
+            # the first message of each type is encoded by eth_account too,
+            # unexpected layouts keep using the slow path
+            self.__types[types_key] = self.__prepare_type(msg)
+            expected = encode_typed_data(full_message=msg)
+            if (
+                self.__types[types_key] is None
+                or self.__encode(self.__types[types_key], domain_hash, msg) != expected
+            ):
+                self.__types[types_key] = None
+                return expected
+
+        prepared = self.__types[types_key]
+        if prepared is None:
+            return encode_typed_data(full_message=msg)
+        return self.__encode(prepared, domain_hash, msg)
+
+    def sign(self, msg: dict) -> str:
+        signable = self.encode(msg)
+        # EIP-191: 0x19 <version> <header> <body>
+        msg_hash = keccak(b"\x19" + signable.version + signable.header + signable.body)
+        sign_hash = getattr(self.__account, "unsafe_sign_hash", None)
+        if sign_hash is None:
+            # eth-account < 0.12
+            sign_hash = self.__account.signHash
+        return sign_hash(msg_hash).signature.hex()
+
+    def __prepare_type(self, msg: dict) -> Optional[Tuple[bytes, list]]:
+        types = {k: v for k, v in msg["types"].items() if k != "EIP712Domain"}
+        primary_type = msg.get("primaryType") or get_primary_type(types)
+        if primary_type not in types:
+            return None
+        fields = types[primary_type]
+        if not all(_is_atomic(f["type"]) and f["type"] not in types for f in fields):
+            return None
+        encoded_type = "{}({})".format(
+            primary_type, ",".join(f"{f['type']} {f['name']}" for f in fields)
+        )
+        return keccak(text=encoded_type), fields
+
+    def __encode(self, prepared, domain_hash: bytes, msg: dict) -> SignableMessage:
+        type_hash, fields = prepared
+        data = msg["message"]
+        encoded_types = ["bytes32"]
+        encoded_values = [type_hash]
+        for field in fields:
+            type_, value = _encode_atomic(field["type"], data.get(field["name"]))
+            encoded_types.append(type_)
+            encoded_values.append(value)
+        message_hash = keccak(encode(encoded_types, encoded_values))
+        return SignableMessage(b"\x01", domain_hash, message_hash)
+
 
 class TransferPermitHelper(object):
     def __init__(self, client: Client, private_key: str):
         self.client = client
         self.__private_key = private_key
+        self.__signer: Optional[PermitSigner] = None
 
     def sign_and_submit_decimal(
         self,
@@ -47,13 +167,103 @@ class TransferPermitHelper(object):
     ):
         return self._sign_and_submit(
             pool_address=pool_address,
-            allowance={
-                "type": AllowanceType.BASE,
-                "value": hex(2**256 - 1),
-            },
+            allowance=UNLIMITED_ALLOWANCE,
             seconds_until_expiry=seconds_until_expiry,
         )
 
+    def sign_and_submit_unlimited_many(
+        self,
+        pool_addresses: List[H160],
+        seconds_until_expiry: Optional[int] = None,
+        max_workers: int = 8,
+        processes: Optional[int] = None,
+    ) -> List[PermitResult]:
+        return self.sign_and_submit_many(
+            {pool_address: UNLIMITED_ALLOWANCE for pool_address in pool_addresses},
+            seconds_until_expiry=seconds_until_expiry,
+            max_workers=max_workers,
+            processes=processes,
+        )
+
+    def sign_and_submit_many(
+        self,
+        allowances: Mapping[H160, Allowance],
+        seconds_until_expiry: Optional[int] = None,
+        max_workers: int = 8,
+        processes: Optional[int] = None,
+    ) -> List[PermitResult]:
+        """
+        Signs and submits permits for many pools. Templates are requested and
+        permits submitted concurrently by up to `max_workers` threads, while
+        signing runs in a pool of `processes` worker processes (default: one
+        per CPU). Workers are spawned rather than forked, since the calling
+        process is running threads by then. Pass `processes=0` to sign in the
+        calling process.
+        Returns one result per pool, in the order of `allowances`; failures
+        are reported in the results instead of being raised.
+        """
+        results: Dict[H160, PermitResult] = {
+            pool_address: PermitResult(pool_address) for pool_address in allowances
+        }
+        with (
+            ThreadPoolExecutor(max_workers=max_workers) as threads,
+            (
+                ProcessPoolExecutor(
+                    max_workers=processes,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self.__private_key,),
+                )
+                if processes != 0
+                else _InlineExecutor()
+            ) as signers,
+        ):
+            templates = {
+                threads.submit(
+                    self.client.generate_transfer_permit,
+                    pool_address=pool_address,
+                    allowance=allowance,
+                    seconds_until_expiry=seconds_until_expiry,
+                ): pool_address
+                for pool_address, allowance in allowances.items()
+            }
+            signatures = {}
+            for future in as_completed(templates):
+                pool_address = templates[future]
+                try:
+                    msg = _prepare_message(future.result().result)
+                except Exception as e:
+                    results[pool_address].error = e
+                    continue
+                if processes == 0:
+                    signing = signers.submit(self.__sign, msg)
+                else:
+                    signing = signers.submit(_sign_in_worker, msg)
+                signatures[signing] = (pool_address, msg)
+
+            submissions = {}
+            for future in as_completed(signatures):
+                pool_address, msg = signatures[future]
+                try:
+                    signature = future.result()
+                except Exception as e:
+                    results[pool_address].error = e
+                    continue
+                submission = threads.submit(
+                    self.client.submit_transfer_permit,
+                    message=msg,
+                    signature=signature,
+                )
+                submissions[submission] = pool_address
+
+            for future in as_completed(submissions):
+                try:
+                    future.result()
+                except Exception as e:
+                    results[submissions[future]].error = e
+
+        return list(results.values())
+
     def _sign_and_submit(
         self,
         pool_address: H160,
@@ -65,10 +275,88 @@ class TransferPermitHelper(object):
             allowance=allowance,
             seconds_until_expiry=seconds_until_expiry,
         ).result
-        msg["domain"]["chainId"] = int(msg["domain"]["chainId"], 16)
-        signed = Account.sign_message(
-            encode_typed_data(full_message=msg), self.__private_key
-        )
+        msg = _prepare_message(msg)
         self.client.submit_transfer_permit(
-            message=msg, signature=signed.signature.hex()
+            message=msg, signature=self.__get_signer().sign(msg)
         )
+
+    def __sign(self, msg: dict) -> str:
+        return self.__get_signer().sign(msg)
+
+    def __get_signer(self) -> PermitSigner:
+        if self.__signer is None:
+            self.__signer = PermitSigner(self.__private_key)
+        return self.__signer
+
+
+def _prepare_message(msg: dict) -> dict:
+    msg["domain"]["chainId"] = int(msg["domain"]["chainId"], 16)
+    return msg
+
+
+# signer of a worker process, set up once per worker by `_init_worker`
+_worker_signer: Optional[PermitSigner] = None
+_worker_error: Optional[BaseException] = None
+
+
+def _init_worker(private_key: str):
+    global _worker_signer, _worker_error
+    try:
+        _worker_signer = PermitSigner(private_key)
+    except Exception as e:
+        # reported with each permit instead of breaking the pool
+        _worker_error = e
+
+
+def _sign_in_worker(msg: dict) -> str:
+    # module level, so that it can be pickled into worker processes
+    if _worker_signer is None:
+        raise _worker_error
+    return _worker_signer.sign(msg)
+
+
+def _is_atomic(type_: str) -> bool:
+    return type_ in ("address", "bool", "string", "bytes") or type_.startswith(
+        ("int", "uint", "bytes")
+    )
+
+
+def _is_0x_hexstr(value) -> bool:
+    return isinstance(value, str) and is_0x_prefixed(value) and is_hexstr(value)
+
+
+def _encode_atomic(type_: str, value) -> Tuple[str, object]:
+    # same conversions as eth_account applies to values of atomic EIP-712 types
+    if type_ in ("string", "bytes") and value is None:
+        return "bytes32", b""
+    if value is None:
+        raise ValueError(f"missing value of type `{type_}`")
+    if type_ == "bool":
+        return type_, bool(value)
+    if type_.startswith("bytes"):
+        if not isinstance(value, bytes):
+            if _is_0x_hexstr(value):
+                value = to_bytes(hexstr=value)
+            elif isinstance(value, str):
+                value = to_bytes(text=value)
+            else:
+                value = to_bytes(max(value, 0) if isinstance(value, int) else value)
+        return ("bytes32", keccak(value)) if type_ == "bytes" else (type_, value)
+    if type_ == "string":
+        value = to_bytes(value) if isinstance(value, int) else to_bytes(text=value)
+        return "bytes32", keccak(value)
+    if isinstance(value, str) and type_.startswith(("int", "uint")):
+        if _is_0x_hexstr(value):
+            return type_, to_int(hexstr=value)
+        return type_, to_int(text=value)
+    return type_, value
+
+
+class _InlineExecutor(Executor):
+    def submit(self, fn, /, *args, **kwargs):
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
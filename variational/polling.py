@@ -2,6 +2,7 @@ from time import sleep
 from typing import Callable, List
 
 from .client import Client
+from .tracing import start_span
 from .models import (
     SettlementPoolStatus,
     TransferStatus,
@@ -12,6 +13,16 @@ from .models import (
     UUIDv4,
 )
 
+# order in which a quote progresses through clearing, rejections aren't ordered
+CLEARING_ORDER = {
+    ClearingStatus.PENDING_POOL_CREATION: 1,
+    ClearingStatus.PENDING_TAKER_DEPOSIT_APPROVAL: 2,
+    ClearingStatus.PENDING_MAKER_LAST_LOOK: 3,
+    ClearingStatus.PENDING_MAKER_DEPOSIT_APPROVAL: 4,
+    ClearingStatus.PENDING_ATOMIC_DEPOSIT: 5,
+    ClearingStatus.SUCCESS_TRADES_BOOKED_INTO_POOL: 6,
+}
+
 
 class PollingHelper(object):
     def __init__(self, client: Client, interval=1, attempts=10):
@@ -19,14 +30,7 @@ class PollingHelper(object):
         self.client = client
         self.interval = interval
         self.attempts = attempts
-        self.clearing_order = {
-            ClearingStatus.PENDING_POOL_CREATION: 1,
-            ClearingStatus.PENDING_TAKER_DEPOSIT_APPROVAL: 2,
-            ClearingStatus.PENDING_MAKER_LAST_LOOK: 3,
-            ClearingStatus.PENDING_MAKER_DEPOSIT_APPROVAL: 4,
-            ClearingStatus.PENDING_ATOMIC_DEPOSIT: 5,
-            ClearingStatus.SUCCESS_TRADES_BOOKED_INTO_POOL: 6,
-        }
+        self.clearing_order = dict(CLEARING_ORDER)
 
     def wait_for_settlement_pool(
         self,
@@ -124,31 +128,50 @@ class PollingHelper(object):
         is_desired: Callable[[str], bool],
         is_final: Callable[[str], bool],
     ):
-        for i in range(self.attempts):
-            if i > 0:
-                sleep(self.interval)
-
-            objs = fetch_objs()
-            if len(objs) < 1:
-                continue
-            obj = objs[0]
-
-            current_status = get_status(obj)
-
-            if is_desired(current_status):
-                return obj
-
-            if is_final(current_status):
-                raise UnexpectedStatus(
-                    msg=f"unexpected final status '{current_status}' "
-                    f"for {object_type} '{object_id}'",
-                    status=current_status,
-                )
-
-        raise PollTimeout(
-            msg=f"timeout waiting for {object_type} '{object_id}'"
-            f" to become '{status}'"
-        )
+        tracer = self.client.tracer
+        with start_span(
+            tracer,
+            f"variational.wait_for_{object_type.replace(' ', '_')}",
+            {
+                "variational.object_id": object_id,
+                "variational.desired_status": status,
+            },
+        ):
+            for i in range(self.attempts):
+                if i > 0:
+                    sleep(self.interval)
+
+                with start_span(
+                    tracer,
+                    "variational.poll_attempt",
+                    {
+                        "variational.attempt": i + 1,
+                        "variational.sleep_s": self.interval if i > 0 else 0,
+                    },
+                ) as span:
+                    objs = fetch_objs()
+                    if len(objs) < 1:
+                        continue
+                    obj = objs[0]
+
+                    current_status = get_status(obj)
+                    if span is not None:
+                        span.set_attribute("variational.status", str(current_status))
+
+                if is_desired(current_status):
+                    return obj
+
+                if is_final(current_status):
+                    raise UnexpectedStatus(
+                        msg=f"unexpected final status '{current_status}' "
+                        f"for {object_type} '{object_id}'",
+                        status=current_status,
+                    )
+
+            raise PollTimeout(
+                msg=f"timeout waiting for {object_type} '{object_id}'"
+                f" to become '{status}'"
+            )
 
 
 class UnexpectedStatus(Exception):
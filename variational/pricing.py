@@ -0,0 +1,142 @@
+import json
+import time
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+from .client import Client
+from .models import (
+    Instrument,
+    InstrumentPrice,
+    Leg,
+    Structure,
+    StructurePrice,
+    StructurePriceResponse,
+    TradeSide,
+)
+
+GREEKS = ("price", "native_price", "delta", "gamma", "theta", "vega", "rho")
+
+
+def instrument_key(instrument: Instrument) -> str:
+    """
+    Returns a stable hashable key identifying `instrument`.
+    """
+    return json.dumps(instrument, sort_keys=True, separators=(",", ":"))
+
+
+def combine_leg_prices(
+    legs: List[Leg], leg_prices: List[InstrumentPrice]
+) -> StructurePriceResponse:
+    """
+    Combines per-leg instrument prices into a structure price the same way
+    `Client.price_structure` does: every value is weighted by leg ratio and
+    signed by leg side. The structure timestamp is the oldest leg timestamp.
+    """
+    if len(legs) != len(leg_prices):
+        raise ValueError("number of leg prices doesn't match number of legs")
+
+    sums = [Decimal(0)] * len(GREEKS)
+    for leg, leg_price in zip(legs, leg_prices):
+        weight = leg["ratio"] if leg["side"] == TradeSide.BUY else -leg["ratio"]
+        for i, field in enumerate(GREEKS):
+            sums[i] += weight * Decimal(leg_price[field])
+
+    structure: StructurePrice = {
+        field: str(value) for field, value in zip(GREEKS, sums)
+    }
+    structure["timestamp"] = min(p["timestamp"] for p in leg_prices)
+    return {"legs": list(leg_prices), "structure": structure}
+
+
+class StructurePricer(object):
+    """
+    Prices structures locally from cached per-leg `InstrumentPrice` values.
+    Only legs whose cached price is older than `max_age` seconds are requested
+    from the API, each distinct instrument at most once per batch. When
+    several legs are stale, they are priced with a single `price_structure`
+    call.
+    """
+
+    def __init__(self, client: Client, max_age: float = 1.0):
+        self.client = client
+        self.max_age = max_age
+        self.__cache: Dict[str, Tuple[float, InstrumentPrice]] = {}
+
+    def update(
+        self,
+        instrument: Instrument,
+        price: InstrumentPrice,
+        fetched_at: Optional[float] = None,
+    ):
+        """
+        Stores a fresh price for `instrument`, e.g. one received from another
+        component, so that it doesn't have to be requested again.
+        """
+        if fetched_at is None:
+            fetched_at = time.monotonic()
+        self.__cache[instrument_key(instrument)] = (fetched_at, price)
+
+    def invalidate(self, instrument: Optional[Instrument] = None):
+        if instrument is None:
+            self.__cache.clear()
+        else:
+            self.__cache.pop(instrument_key(instrument), None)
+
+    def get(self, instrument: Instrument) -> InstrumentPrice:
+        """
+        Returns the price of a single instrument, refreshing it if stale.
+        """
+        return self.__refresh([instrument])[instrument_key(instrument)]
+
+    def price_structure(self, structure: Structure) -> StructurePriceResponse:
+        return self.price_structures([structure])[0]
+
+    def price_structures(
+        self, structures: List[Structure]
+    ) -> List[StructurePriceResponse]:
+        """
+        Prices many structures at once. Stale legs shared between structures
+        are only refreshed once.
+        """
+        instruments = [leg["instrument"] for s in structures for leg in s["legs"]]
+        prices = self.__refresh(instruments)
+        return [
+            combine_leg_prices(
+                s["legs"],
+                [prices[instrument_key(leg["instrument"])] for leg in s["legs"]],
+            )
+            for s in structures
+        ]
+
+    def __refresh(self, instruments: List[Instrument]) -> Dict[str, InstrumentPrice]:
+        now = time.monotonic()
+        prices = {}
+        stale: Dict[str, Instrument] = {}
+        for instrument in instruments:
+            key = instrument_key(instrument)
+            if key in prices or key in stale:
+                continue
+
+            cached = self.__cache.get(key)
+            if cached is None or now - cached[0] > self.max_age:
+                stale[key] = instrument
+            else:
+                prices[key] = cached[1]
+
+        if len(stale) == 1:
+            fetched = [self.client.price_instrument(*stale.values()).result]
+        elif stale:
+            # a structure of one unit of every stale instrument prices them
+            # all in a single round trip, its legs are the instrument prices
+            legs = [
+                {"side": TradeSide.BUY, "ratio": 1, "instrument": instrument}
+                for instrument in stale.values()
+            ]
+            fetched = self.client.price_structure({"legs": legs}).result["legs"]
+        else:
+            fetched = []
+        fetched_at = time.monotonic()
+        for key, price in zip(stale, fetched):
+            self.__cache[key] = (fetched_at, price)
+            prices[key] = price
+        return prices
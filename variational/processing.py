@@ -0,0 +1,212 @@
+import json
+import math
+import multiprocessing
+from array import array
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Generator, List, Optional
+
+from .client import Client
+from .models import PrecisionRequirements, RFQStatus, StrDecimal, UUIDv4
+from .pricing import GREEKS, instrument_key
+from .fixed import FixedDecimal
+from .timestamps import parse_rfc3339
+
+
+@dataclass
+class PositionColumns:
+    """
+    One page of positions in columnar form. Decimal fields are rounded to the
+    requested precision and stored as floats, suitable for aggregation but not
+    for exact accounting.
+    """
+
+    pool_location: List[UUIDv4] = field(default_factory=list)
+    # see `instrument_key`
+    instrument: List[str] = field(default_factory=list)
+    qty: array = field(default_factory=lambda: array("d"))
+    avg_entry_price: array = field(default_factory=lambda: array("d"))
+    taker_qty: array = field(default_factory=lambda: array("d"))
+    next_page: Optional[Dict] = None
+
+    def __len__(self):
+        return len(self.qty)
+
+
+@dataclass
+class RFQColumns:
+    """
+    One page of RFQs in columnar form. Structure price and greeks are NaN
+    when the RFQ wasn't priced.
+    """
+
+    rfq_id: List[UUIDv4] = field(default_factory=list)
+    rfq_status: List[RFQStatus] = field(default_factory=list)
+    # seconds since the epoch
+    rfq_expires_at: array = field(default_factory=lambda: array("d"))
+    qty: array = field(default_factory=lambda: array("d"))
+    price: array = field(default_factory=lambda: array("d"))
+    native_price: array = field(default_factory=lambda: array("d"))
+    delta: array = field(default_factory=lambda: array("d"))
+    gamma: array = field(default_factory=lambda: array("d"))
+    theta: array = field(default_factory=lambda: array("d"))
+    vega: array = field(default_factory=lambda: array("d"))
+    rho: array = field(default_factory=lambda: array("d"))
+    bids: array = field(default_factory=lambda: array("I"))
+    asks: array = field(default_factory=lambda: array("I"))
+    next_page: Optional[Dict] = None
+
+    def __len__(self):
+        return len(self.qty)
+
+
+def decode_positions(
+    content: bytes, precision: Optional[PrecisionRequirements] = None
+) -> PositionColumns:
+    """
+    Decodes a raw `/portfolio/positions` response body.
+    """
+    data = json.loads(content)
+    columns = PositionColumns(next_page=data["pagination"]["next_page"])
+    for position in data["result"]:
+        columns.pool_location.append(position["pool_location"])
+        columns.instrument.append(instrument_key(position["instrument"]))
+        columns.qty.append(_to_float(position["qty"], precision))
+        columns.avg_entry_price.append(
+            _to_float(position["avg_entry_price"], precision)
+        )
+        columns.taker_qty.append(_to_float(position["taker_qty"], precision))
+    return columns
+
+
+def decode_rfqs(
+    content: bytes, precision: Optional[PrecisionRequirements] = None
+) -> RFQColumns:
+    """
+    Decodes a raw `/rfqs/received` or `/rfqs/sent` response body.
+    """
+    data = json.loads(content)
+    columns = RFQColumns(next_page=data["pagination"]["next_page"])
+    for rfq in data["result"]:
+        columns.rfq_id.append(rfq["rfq_id"])
+        columns.rfq_status.append(RFQStatus(rfq["rfq_status"]))
+        columns.rfq_expires_at.append(parse_rfc3339(rfq["rfq_expires_at"]))
+        columns.qty.append(_to_float(rfq["qty"], precision))
+        structure_price = rfq.get("structure_price") or {}
+        for name in GREEKS:
+            getattr(columns, name).append(
+                _to_float(structure_price.get(name), precision)
+            )
+        columns.bids.append(len(rfq.get("bids", [])))
+        columns.asks.append(len(rfq.get("asks", [])))
+    return columns
+
+
+class ResponseProcessor(object):
+    """
+    Fetches large listings with `Client.send_raw` and decodes them in a
+    process pool, so that JSON parsing, decimal conversion and rounding don't
+    hold the GIL of the process doing network I/O. Workers return compact
+    columnar pages, which are much cheaper to send back than decoded dicts.
+
+        with ResponseProcessor(client) as processor:
+            for page in processor.positions(precision=requirements):
+                exposure += sum(page.qty)
+
+    The next page is requested while the current one is being decoded. Any
+    `concurrent.futures` executor can be passed instead of the default
+    process pool, e.g. one shared with other CPU-heavy work. The default pool
+    spawns its workers rather than forking, since the SDK may be running
+    threads by then.
+    """
+
+    def __init__(
+        self,
+        client: Client,
+        max_workers: Optional[int] = None,
+        executor: Optional[Executor] = None,
+    ):
+        self.client = client
+        self.__owns_executor = executor is None
+        self.__executor = executor or ProcessPoolExecutor(
+            max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")
+        )
+
+    def positions(
+        self,
+        pool: Optional[UUIDv4] = None,
+        precision: Optional[PrecisionRequirements] = None,
+        page: Optional[Dict] = None,
+    ) -> Generator[PositionColumns, None, None]:
+        filter = {}
+        if pool:
+            filter["pool"] = pool
+        yield from self.__pages(
+            "/portfolio/positions", filter, page, decode_positions, precision
+        )
+
+    def rfqs_received(
+        self,
+        price: bool = True,
+        precision: Optional[PrecisionRequirements] = None,
+        page: Optional[Dict] = None,
+    ) -> Generator[RFQColumns, None, None]:
+        filter = {"price": "true" if price else "false"}
+        yield from self.__pages("/rfqs/received", filter, page, decode_rfqs, precision)
+
+    def close(self):
+        if self.__owns_executor:
+            self.__executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def __pages(self, endpoint, filter, page, decode, precision):
+        resp = self.client.send_raw(endpoint=endpoint, filter=filter, page=page)
+        while resp is not None:
+            decoding = self.__executor.submit(decode, resp.content, precision)
+            page = _peek_next_page(resp.content)
+            if page is _UNKNOWN:
+                page = decoding.result().next_page
+            resp = None
+            if page:
+                resp = self.client.send_raw(endpoint=endpoint, filter=filter, page=page)
+            yield decoding.result()
+
+
+_UNKNOWN = object()
+_PAGINATION_KEY = b'"pagination"'
+
+
+def _peek_next_page(content: bytes):
+    # page bodies end with their pagination, which is read here without
+    # decoding the result; _UNKNOWN if the body is laid out differently
+    i = content.rfind(_PAGINATION_KEY)
+    if i < 0:
+        return _UNKNOWN
+    start = i + len(_PAGINATION_KEY)
+    tail = content[start:].decode().lstrip()
+    if not tail.startswith(":"):
+        return _UNKNOWN
+    tail = tail[1:].lstrip()
+    try:
+        pagination, end = json.JSONDecoder().raw_decode(tail)
+    except ValueError:
+        return _UNKNOWN
+    if tail[end:].strip() != "}" or not isinstance(pagination, dict):
+        return _UNKNOWN
+    return pagination.get("next_page", _UNKNOWN)
+
+
+def _to_float(
+    value: Optional[StrDecimal], precision: Optional[PrecisionRequirements]
+) -> float:
+    if value is None:
+        return math.nan
+    d = FixedDecimal.parse(value)
+    if precision is not None:
+        d = d.round_to_requirements(precision)
+    return float(d)
@@ -0,0 +1,167 @@
+import heapq
+import itertools
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .client import Client
+from .models import (
+    RFQ,
+    QuoteAcceptResponse,
+    QuoteWithMarginRequirements,
+    RFQStatus,
+    TradeSide,
+    UUIDv4,
+)
+from .paginate import paginate_pipelined
+from .timestamps import parse_rfc3339
+from .wrappers import ApiSingle
+
+# (heap key, push sequence, parent quote id), the key is negated for bids
+_Entry = Tuple[Decimal, int, UUIDv4]
+
+
+@dataclass
+class _Side:
+    heap: List[_Entry] = field(default_factory=list)
+    # parent quote id -> (push sequence of its current entry, quote, expires at)
+    live: Dict[UUIDv4, Tuple[int, QuoteWithMarginRequirements, float]] = field(
+        default_factory=dict
+    )
+
+
+class QuoteBook(object):
+    """
+    Indexes the quotes received on sent RFQs by price, so that the best bid
+    and ask of an RFQ are available without rescanning its quote lists:
+
+        book = QuoteBook(client, max_initial_margin=Decimal(10000))
+        book.poll()
+        quote = book.best_ask(rfq_id)
+        book.accept_best(rfq_id, TradeSide.BUY)
+
+    Each RFQ keeps a heap per side. Quotes that are replaced, withdrawn or
+    expire (per `quotes_common_metadata[...]["expires_at"]`) are dropped
+    lazily when they reach the top, so updates cost O(log n) and reading the
+    best quote O(1) once stale entries are gone. With `max_initial_margin`,
+    quotes whose `additional_margin_requirements` need more initial margin
+    are left out.
+    """
+
+    def __init__(
+        self,
+        client: Client,
+        max_initial_margin: Optional[Decimal] = None,
+    ):
+        self.client = client
+        self.max_initial_margin = max_initial_margin
+        self.__books: Dict[UUIDv4, Tuple[_Side, _Side]] = {}
+        self.__sequence = itertools.count()
+
+    def poll(self):
+        """
+        Fetches all sent RFQs once and updates their books. RFQs that are no
+        longer listed or open are forgotten.
+        """
+        seen = set()
+        for rfq in paginate_pipelined(self.client.get_rfqs_sent, price=False):
+            seen.add(rfq["rfq_id"])
+            self.update(rfq)
+        for rfq_id in list(self.__books):
+            if rfq_id not in seen:
+                self.remove(rfq_id)
+
+    def update(self, rfq: RFQ):
+        """
+        Brings the book of `rfq` in line with its current quotes. Only quotes
+        that are new, or whose price, expiry or other fields changed, are
+        pushed.
+        """
+        if rfq["rfq_status"] != RFQStatus.OPEN:
+            self.remove(rfq["rfq_id"])
+            return
+        book = self.__books.get(rfq["rfq_id"])
+        if book is None:
+            book = self.__books[rfq["rfq_id"]] = (_Side(), _Side())
+        metadata = rfq.get("quotes_common_metadata") or {}
+        bids, asks = book
+        self.__update_side(bids, rfq.get("bids", []), metadata, -1)
+        self.__update_side(asks, rfq.get("asks", []), metadata, 1)
+
+    def update_many(self, rfqs: Iterable[RFQ]):
+        for rfq in rfqs:
+            self.update(rfq)
+
+    def remove(self, rfq_id: UUIDv4):
+        self.__books.pop(rfq_id, None)
+
+    def rfq_ids(self) -> List[UUIDv4]:
+        return list(self.__books)
+
+    def best_bid(self, rfq_id: UUIDv4) -> Optional[QuoteWithMarginRequirements]:
+        """
+        Returns the highest unexpired bid, i.e. the best quote to sell to.
+        """
+        book = self.__books.get(rfq_id)
+        return self.__best(book[0]) if book else None
+
+    def best_ask(self, rfq_id: UUIDv4) -> Optional[QuoteWithMarginRequirements]:
+        """
+        Returns the lowest unexpired ask, i.e. the best quote to buy from.
+        """
+        book = self.__books.get(rfq_id)
+        return self.__best(book[1]) if book else None
+
+    def accept_best(
+        self, rfq_id: UUIDv4, side: TradeSide
+    ) -> Optional[ApiSingle[QuoteAcceptResponse]]:
+        """
+        Accepts the best ask when buying, or the best bid when selling.
+        Returns None if there is no quote to accept.
+        """
+        if side == TradeSide.BUY:
+            quote = self.best_ask(rfq_id)
+        else:
+            quote = self.best_bid(rfq_id)
+        if quote is None:
+            return None
+        return self.client.accept_quote(rfq_id, quote["parent_quote_id"], side)
+
+    def __update_side(self, side: _Side, quotes, metadata, sign: int):
+        current = set()
+        for quote in quotes:
+            parent_quote_id = quote["parent_quote_id"]
+            if not self.__acceptable(quote):
+                continue
+            current.add(parent_quote_id)
+            meta = metadata.get(parent_quote_id)
+            expires_at = parse_rfc3339(meta["expires_at"]) if meta else float("inf")
+            known = side.live.get(parent_quote_id)
+            if known is not None and known[1:] == (quote, expires_at):
+                continue
+            sequence = next(self.__sequence)
+            side.live[parent_quote_id] = (sequence, quote, expires_at)
+            key = sign * Decimal(quote["quote_price"])
+            heapq.heappush(side.heap, (key, sequence, parent_quote_id))
+
+        for parent_quote_id in list(side.live):
+            if parent_quote_id not in current:
+                del side.live[parent_quote_id]
+
+    def __acceptable(self, quote: QuoteWithMarginRequirements) -> bool:
+        additional = quote.get("additional_margin_requirements")
+        if self.max_initial_margin is None or additional is None:
+            return True
+        return Decimal(additional["initial_margin"]) <= self.max_initial_margin
+
+    def __best(self, side: _Side) -> Optional[QuoteWithMarginRequirements]:
+        now = self.client.clock.now()
+        while side.heap:
+            _, sequence, parent_quote_id = side.heap[0]
+            live = side.live.get(parent_quote_id)
+            if live is not None and live[0] == sequence:
+                if live[2] > now:
+                    return live[1]
+                del side.live[parent_quote_id]
+            heapq.heappop(side.heap)
+        return None
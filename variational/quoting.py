@@ -0,0 +1,280 @@
+import heapq
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from .client import Client
+from .models import LegQuote, PoolStrategy, PoolStrategyType, Quote, UUIDv4
+from .timestamps import parse_rfc3339
+from .wrappers import ApiError
+
+
+@dataclass
+class LiveQuote:
+    quote: Quote
+    pool_strategy: PoolStrategy
+    ttl: float
+    refresh_at: float
+    version: int
+
+
+class QuoteManager(object):
+    """
+    Keeps our live quotes alive by replacing them `refresh_before` seconds
+    before they expire, as measured by the client's server clock estimate.
+    Refresh deadlines are kept in a single heap, so scheduling is O(log N)
+    and one thread serves any number of quotes.
+
+    `reprice` is called with the current quote before each refresh and returns
+    new leg quotes, or None to let the quote expire. Without it, quotes are
+    refreshed with unchanged prices.
+
+    A refresh rejected by the API stops tracking the quote. Other failures,
+    e.g. connection errors or exceptions from `reprice`, are retried after
+    `retry_delay` seconds for as long as the quote hasn't expired.
+    """
+
+    def __init__(
+        self,
+        client: Client,
+        ttl: float = 30,
+        refresh_before: float = 5,
+        reprice: Optional[Callable[[Quote], Optional[List[LegQuote]]]] = None,
+        retry_delay: float = 1,
+    ):
+        assert ttl > refresh_before >= 0
+        self.client = client
+        self.ttl = ttl
+        self.refresh_before = refresh_before
+        self.reprice = reprice
+        self.retry_delay = retry_delay
+        self.logger = logging.getLogger(__name__)
+        self.__live: Dict[UUIDv4, LiveQuote] = {}
+        self.__by_rfq: Dict[UUIDv4, Set[UUIDv4]] = {}
+        self.__heap: List[Tuple[float, int, UUIDv4]] = []
+        self.__seq = 0
+        self.__cond = threading.Condition()
+        self.__thread: Optional[threading.Thread] = None
+        self.__stopped = False
+
+    def create(
+        self,
+        rfq_id: UUIDv4,
+        leg_quotes: List[LegQuote],
+        pool_strategy: PoolStrategy,
+        client_quote_id: Optional[str] = None,
+        ttl: Optional[float] = None,
+    ) -> Quote:
+        ttl = ttl or self.ttl
+        quote = self.client.create_quote(
+            rfq_id=rfq_id,
+            expires_at=self.client.clock.expires_in(ttl),
+            leg_quotes=leg_quotes,
+            pool_strategy=pool_strategy,
+            client_quote_id=client_quote_id,
+        ).result
+        self.track(quote, pool_strategy, ttl)
+        return quote
+
+    def track(
+        self, quote: Quote, pool_strategy: PoolStrategy, ttl: Optional[float] = None
+    ):
+        """
+        Starts managing a quote that was created elsewhere.
+        """
+        with self.__cond:
+            self.__schedule(quote, pool_strategy, ttl or self.ttl)
+            self.__cond.notify()
+
+    def untrack(self, parent_quote_id: UUIDv4) -> Optional[Quote]:
+        """
+        Stops refreshing a quote without canceling it.
+        """
+        with self.__cond:
+            live = self.__live.pop(parent_quote_id, None)
+            if live is None:
+                return None
+            rfq_id = live.quote["target_rfq_id"]
+            ids = self.__by_rfq.get(rfq_id)
+            if ids is not None:
+                ids.discard(parent_quote_id)
+                if not ids:
+                    del self.__by_rfq[rfq_id]
+            return live.quote
+
+    def get(self, parent_quote_id: UUIDv4) -> Optional[Quote]:
+        live = self.__live.get(parent_quote_id)
+        return live.quote if live else None
+
+    def quotes_for_rfq(self, rfq_id: UUIDv4) -> List[Quote]:
+        with self.__cond:
+            return [self.__live[i].quote for i in self.__by_rfq.get(rfq_id, ())]
+
+    def __len__(self):
+        return len(self.__live)
+
+    def cancel(self, parent_quote_id: UUIDv4):
+        self.untrack(parent_quote_id)
+        self.client.cancel_quote(parent_quote_id)
+
+    def cancel_rfq(self, rfq_id: UUIDv4):
+        for quote in self.quotes_for_rfq(rfq_id):
+            self.cancel(quote["parent_quote_id"])
+
+    def cancel_all(self):
+        """
+        Kill switch: stops all refreshes and cancels every quote of the company
+        with a single request.
+        """
+        with self.__cond:
+            self.__live.clear()
+            self.__by_rfq.clear()
+            self.__heap.clear()
+        self.client.cancel_all_quotes()
+
+    def next_refresh_at(self) -> Optional[float]:
+        with self.__cond:
+            self.__discard_stale_heap_head()
+            return self.__heap[0][0] if self.__heap else None
+
+    def run_pending(self, now: Optional[float] = None) -> int:
+        """
+        Refreshes every quote whose refresh time has come, returning how many
+        quotes were processed.
+        """
+        if now is None:
+            now = self.client.clock.now()
+
+        due = []
+        with self.__cond:
+            while self.__heap and self.__heap[0][0] <= now:
+                _, version, parent_quote_id = heapq.heappop(self.__heap)
+                live = self.__live.get(parent_quote_id)
+                if live is not None and live.version == version:
+                    due.append(live)
+
+        for live in due:
+            try:
+                self.__refresh(live)
+            except Exception:
+                self.logger.exception(
+                    "failed to refresh quote %s", live.quote["parent_quote_id"]
+                )
+                self.__retry(live)
+        return len(due)
+
+    def start(self):
+        """
+        Starts a background thread that refreshes quotes on time.
+        """
+        with self.__cond:
+            if self.__thread is not None:
+                return
+            self.__stopped = False
+            self.__thread = threading.Thread(
+                target=self.__run, name="variational-quote-manager", daemon=True
+            )
+            self.__thread.start()
+
+    def stop(self):
+        with self.__cond:
+            self.__stopped = True
+            thread, self.__thread = self.__thread, None
+            self.__cond.notify()
+        if thread is not None:
+            thread.join()
+
+    def __run(self):
+        while True:
+            with self.__cond:
+                if self.__stopped:
+                    return
+                self.__discard_stale_heap_head()
+                if not self.__heap:
+                    self.__cond.wait()
+                    continue
+                delay = self.__heap[0][0] - self.client.clock.now()
+                if delay > 0:
+                    self.__cond.wait(delay)
+                    continue
+            try:
+                self.run_pending()
+            except Exception:
+                self.logger.exception("failed to refresh quotes")
+
+    def __refresh(self, live: LiveQuote):
+        quote = live.quote
+        parent_quote_id = quote["parent_quote_id"]
+        leg_quotes = (
+            self.reprice(quote) if self.reprice is not None else quote["per_leg_quotes"]
+        )
+        if leg_quotes is None:
+            self.untrack(parent_quote_id)
+            return
+
+        try:
+            new_quote = self.client.replace_quote(
+                parent_quote_id=parent_quote_id,
+                rfq_id=quote["target_rfq_id"],
+                expires_at=self.client.clock.expires_in(live.ttl),
+                leg_quotes=leg_quotes,
+                pool_strategy=live.pool_strategy,
+            ).result
+        except ApiError as e:
+            self.logger.warning("failed to replace quote %s: %s", parent_quote_id, e)
+            self.untrack(parent_quote_id)
+            return
+
+        with self.__cond:
+            current = self.__live.get(parent_quote_id)
+            if current is None or current.version != live.version:
+                # canceled or re-tracked while the request was in flight
+                return
+            self.untrack(parent_quote_id)
+            self.__schedule(new_quote, live.pool_strategy, live.ttl)
+
+    def __retry(self, live: LiveQuote):
+        parent_quote_id = live.quote["parent_quote_id"]
+        retry_at = self.client.clock.now() + self.retry_delay
+        with self.__cond:
+            current = self.__live.get(parent_quote_id)
+            if current is None or current.version != live.version:
+                return
+            if retry_at >= parse_rfc3339(live.quote["expires_at"]):
+                self.logger.warning("quote %s expired before refresh", parent_quote_id)
+                self.untrack(parent_quote_id)
+                return
+            self.__seq += 1
+            live.refresh_at = retry_at
+            live.version = self.__seq
+            heapq.heappush(self.__heap, (retry_at, self.__seq, parent_quote_id))
+
+    def __schedule(self, quote: Quote, pool_strategy: PoolStrategy, ttl: float):
+        parent_quote_id = quote["parent_quote_id"]
+        if quote.get("pool_location"):
+            # once the pool exists, refreshes must not try to create it again
+            pool_strategy = {
+                "strategy": PoolStrategyType.USE_EXISTING,
+                "pool_id": quote["pool_location"],
+            }
+
+        refresh_at = parse_rfc3339(quote["expires_at"]) - self.refresh_before
+        self.__seq += 1
+        self.__live[parent_quote_id] = LiveQuote(
+            quote=quote,
+            pool_strategy=pool_strategy,
+            ttl=ttl,
+            refresh_at=refresh_at,
+            version=self.__seq,
+        )
+        self.__by_rfq.setdefault(quote["target_rfq_id"], set()).add(parent_quote_id)
+        heapq.heappush(self.__heap, (refresh_at, self.__seq, parent_quote_id))
+
+    def __discard_stale_heap_head(self):
+        while self.__heap:
+            _, version, parent_quote_id = self.__heap[0]
+            live = self.__live.get(parent_quote_id)
+            if live is not None and live.version == version:
+                return
+            heapq.heappop(self.__heap)
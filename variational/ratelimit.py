@@ -0,0 +1,178 @@
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, replace
+from typing import Deque, Dict, Mapping, Optional, Tuple
+
+RATE_LIMIT_HEADER_PREFIX = "x-rate-limit-"
+RATE_LIMIT_BUCKET_HEADER = "x-rate-limit-bucket"
+RATE_LIMIT_LIMIT_HEADER = "x-rate-limit-limit"
+RATE_LIMIT_REMAINING_HEADER = "x-rate-limit-remaining"
+RATE_LIMIT_RESET_MS_HEADER = "x-rate-limit-resets-in-ms"
+
+
+@dataclass
+class RateLimitBucket:
+    name: str
+    # latest values reported by the API, None until seen
+    limit: Optional[int] = None
+    remaining: Optional[int] = None
+    # local timestamp in seconds when the budget is expected to reset
+    resets_at: Optional[float] = None
+    requests: int = 0
+    rate_limited: int = 0
+    # seconds spent sleeping before retrying rate limited requests
+    wait_time: float = 0.0
+
+
+class RateLimitTracker(object):
+    """
+    Tracks rate limit budget per bucket, together with HTTP 429 counts and
+    time lost to retry delays. A bucket is named by the `x-rate-limit-bucket`
+    header if the API sends one, or by the endpoint.
+
+    The budget comes from `x-rate-limit-limit` / `-remaining` headers where
+    the API sends them. Otherwise it's counted on the client side against
+    `quotas`, which map bucket names or endpoints to `(limit, period)`, i.e.
+    at most `limit` requests per `period` seconds:
+
+        client.rate_limits.set_quota("/quotes/replace", 100, 1)
+
+    Callers can consult `should_throttle` to shed low-value work before the
+    limit is hit rather than after.
+    """
+
+    def __init__(
+        self,
+        window: float = 60,
+        quotas: Optional[Mapping[str, Tuple[int, float]]] = None,
+    ):
+        self.window = window
+        self.__lock = threading.Lock()
+        self.__buckets: Dict[str, RateLimitBucket] = {}
+        self.__endpoint_buckets: Dict[str, str] = {}
+        self.__quotas: Dict[str, Tuple[int, float]] = dict(quotas or {})
+        # local timestamps of requests of buckets with a quota
+        self.__sent: Dict[str, Deque[float]] = {}
+        self.__rate_limited_at = deque()
+        self.total_wait_time = 0.0
+
+    def observe(self, endpoint: str, status_code: int, headers: Mapping):
+        values = {}
+        for k, v in headers.items():
+            k = k.lower()
+            if k.startswith(RATE_LIMIT_HEADER_PREFIX):
+                values[k] = v
+
+        now = time.time()
+        with self.__lock:
+            name = values.get(RATE_LIMIT_BUCKET_HEADER, endpoint)
+            self.__endpoint_buckets[endpoint] = name
+            bucket = self.__buckets.get(name)
+            if bucket is None:
+                bucket = self.__buckets[name] = RateLimitBucket(name)
+
+            bucket.requests += 1
+            if RATE_LIMIT_LIMIT_HEADER in values:
+                bucket.limit = int(values[RATE_LIMIT_LIMIT_HEADER])
+            if RATE_LIMIT_REMAINING_HEADER in values:
+                bucket.remaining = int(values[RATE_LIMIT_REMAINING_HEADER])
+            elif status_code != 429 and bucket.remaining == 0:
+                # budget was only inferred from an earlier 429, which has passed
+                bucket.remaining = None
+            if RATE_LIMIT_RESET_MS_HEADER in values:
+                bucket.resets_at = now + int(values[RATE_LIMIT_RESET_MS_HEADER]) / 1000
+
+            quota = self.__quota(name, endpoint)
+            if quota is not None:
+                sent = self.__sent.setdefault(name, deque())
+                sent.append(now)
+                _expire_sent(sent, now, quota[1])
+
+            if status_code == 429:
+                bucket.rate_limited += 1
+                if RATE_LIMIT_REMAINING_HEADER not in values:
+                    bucket.remaining = 0
+                self.__rate_limited_at.append(now)
+            self.__expire(now)
+
+    def set_quota(self, name: str, limit: int, period: float):
+        """
+        Allows `limit` requests per `period` seconds in the bucket or endpoint
+        `name`, for buckets the API doesn't report a budget for.
+        """
+        with self.__lock:
+            self.__quotas[name] = (limit, period)
+
+    def record_wait(self, endpoint: str, seconds: float):
+        with self.__lock:
+            self.total_wait_time += seconds
+            bucket = self.__buckets.get(self.__endpoint_buckets.get(endpoint, endpoint))
+            if bucket is not None:
+                bucket.wait_time += seconds
+
+    def bucket(self, endpoint: str) -> Optional[RateLimitBucket]:
+        """
+        Returns a copy of the bucket state that applies to `endpoint`. Without
+        a budget from headers, `limit`, `remaining` and `resets_at` are
+        derived from the bucket's quota, if it has one.
+        """
+        with self.__lock:
+            bucket = self.__buckets.get(self.__endpoint_buckets.get(endpoint, endpoint))
+            if bucket is None:
+                return None
+            bucket = replace(bucket)
+            quota = self.__quota(bucket.name, endpoint)
+            if quota is not None and bucket.remaining is None:
+                limit, period = quota
+                sent = self.__sent.get(bucket.name, deque())
+                now = time.time()
+                _expire_sent(sent, now, period)
+                bucket.limit = limit
+                bucket.remaining = max(0, limit - len(sent))
+                bucket.resets_at = sent[0] + period if sent else now
+            return bucket
+
+    def recent_rate_limited(self) -> int:
+        """
+        Number of HTTP 429 responses within the last `window` seconds.
+        """
+        with self.__lock:
+            self.__expire(time.time())
+            return len(self.__rate_limited_at)
+
+    def should_throttle(self, endpoint: str, reserve: float = 0.1) -> bool:
+        """
+        Returns True when the bucket of `endpoint` is exhausted, or has no more
+        than `reserve` (a fraction of the limit) left, and hasn't reset yet.
+
+        This is only predictive for buckets with a budget, i.e. rate limit
+        headers or a quota. For any other bucket it turns True after a 429
+        until the reported reset time, which is reactive.
+        """
+        bucket = self.bucket(endpoint)
+        if bucket is None or bucket.remaining is None:
+            return False
+        if bucket.resets_at is not None and bucket.resets_at <= time.time():
+            return False
+        if bucket.remaining <= 0:
+            return True
+        return bucket.limit is not None and bucket.remaining <= bucket.limit * reserve
+
+    def snapshot(self) -> Dict[str, RateLimitBucket]:
+        with self.__lock:
+            names = list(self.__buckets)
+        return {name: self.bucket(name) for name in names}
+
+    def __quota(self, name: str, endpoint: str) -> Optional[Tuple[int, float]]:
+        quota = self.__quotas.get(name)
+        return quota if quota is not None else self.__quotas.get(endpoint)
+
+    def __expire(self, now: float):
+        while self.__rate_limited_at and self.__rate_limited_at[0] < now - self.window:
+            self.__rate_limited_at.popleft()
+
+
+def _expire_sent(sent: Deque[float], now: float, period: float):
+    while sent and sent[0] <= now - period:
+        sent.popleft()
@@ -1,9 +1,12 @@
 from decimal import Decimal, ROUND_HALF_UP
 from math import ceil, floor
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, TypeVar
 
+from .fixed import FixedDecimal
 from .models import Instrument, AssetToken, SupportedAssetDetails, PrecisionRequirements
 
+DecimalT = TypeVar("DecimalT", Decimal, FixedDecimal)
+
 
 def find_asset_details_for_instrument(
     instrument: Instrument,
@@ -24,8 +27,11 @@ def find_asset_details_for_instrument(
 
 
 def round_to_requirements(
-    d: Decimal, requirements: PrecisionRequirements, rounding=ROUND_HALF_UP
-) -> Decimal:
+    d: DecimalT, requirements: PrecisionRequirements, rounding=ROUND_HALF_UP
+) -> DecimalT:
+    if isinstance(d, FixedDecimal):
+        return d.round_to_requirements(requirements, rounding)
+
     abs_d = abs(d)
     m = abs_d
 
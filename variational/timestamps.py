@@ -0,0 +1,18 @@
+from datetime import datetime, timezone
+
+from .models import DateTimeRFC3339
+
+
+def parse_rfc3339(value: DateTimeRFC3339) -> float:
+    """
+    Converts an API timestamp into seconds since the epoch.
+    """
+    return datetime.fromisoformat(value).timestamp()
+
+
+def format_rfc3339(timestamp: float) -> DateTimeRFC3339:
+    """
+    Converts seconds since the epoch into an API timestamp.
+    """
+    dt = datetime.fromtimestamp(timestamp, tz=timezone.utc)
+    return dt.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
@@ -0,0 +1,27 @@
+from contextlib import nullcontext
+from typing import ContextManager, Optional
+
+# shared no-op context returned when tracing is disabled, yields None
+_NO_SPAN = nullcontext()
+
+
+def start_span(tracer, name: str, attributes: Optional[dict] = None) -> ContextManager:
+    """
+    Starts a span with any OpenTelemetry-compatible `tracer`, i.e. one that
+    provides `start_as_current_span`. Without a tracer nothing is allocated
+    and the context manager yields None.
+
+        with start_span(client.tracer, "my operation") as span:
+            if span is not None:
+                span.set_attribute("key", "value")
+    """
+    if tracer is None:
+        return _NO_SPAN
+    return tracer.start_as_current_span(name, attributes=attributes)
+
+
+def get_tracer(method) -> Optional[object]:
+    """
+    Returns the tracer of the client that `method` is bound to, if any.
+    """
+    return getattr(getattr(method, "__self__", None), "tracer", None)
@@ -0,0 +1,42 @@
+import abc
+from typing import Optional, Tuple, Union
+
+import requests
+
+Timeout = Optional[Union[float, Tuple[float, float]]]
+
+
+class Transport(abc.ABC):
+    """
+    Sends signed requests on behalf of `Client`. Implementations can replace
+    the network entirely, e.g. `variational.mock.MockServer`.
+    With `stream=True` the body may be read lazily through `iter_content`.
+    """
+
+    @abc.abstractmethod
+    def send(
+        self,
+        request: requests.PreparedRequest,
+        timeout: Timeout = None,
+        stream: bool = False,
+    ) -> requests.Response:
+        pass
+
+    def close(self):
+        pass
+
+
+class SessionTransport(Transport):
+    def __init__(self, session: Optional[requests.Session] = None):
+        self.session = session or requests.session()
+
+    def send(
+        self,
+        request: requests.PreparedRequest,
+        timeout: Timeout = None,
+        stream: bool = False,
+    ) -> requests.Response:
+        return self.session.send(request, timeout=timeout, stream=stream)
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,225 @@
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from .client import Client
+from .models import ClearingStatus, Quote, TradeSide, UUIDv4
+from .paginate import paginate
+from .polling import CLEARING_ORDER, UnexpectedStatus
+
+ClearingHandler = Callable[[Quote], None]
+
+
+@dataclass
+class Lifecycle:
+    parent_quote_id: UUIDv4
+    future: Future
+    status: Optional[ClearingStatus] = None
+    quote: Optional[Quote] = None
+    # True while a handler for the current status is running
+    busy: bool = False
+    handled: Set[ClearingStatus] = field(default_factory=set)
+
+
+class SettlementWorkflow(object):
+    """
+    Drives many quotes through clearing concurrently. A single poller thread
+    fetches the clearing status of every tracked quote; whenever a quote moves
+    to a status that has a handler (e.g. maker last look, deposit approval),
+    the handler runs on a worker thread right away and the quote is polled
+    again as soon as the handler returns.
+
+        workflow = SettlementWorkflow(client, handlers={
+            ClearingStatus.PENDING_MAKER_LAST_LOOK: lambda quote: client.maker_last_look(
+                quote["target_rfq_id"], quote["parent_quote_id"], RequestAction.ACCEPT
+            ),
+        })
+        workflow.start()
+        booked_quote = workflow.track(parent_quote_id).result()
+
+    Futures resolve with the quote once its trades are booked into the pool,
+    or fail with `UnexpectedStatus` once it's rejected.
+
+    Up to `batch_threshold` quotes are polled by id, more than that by
+    listing quotes page by page until all tracked ones are found.
+    """
+
+    def __init__(
+        self,
+        client: Client,
+        handlers: Optional[Dict[ClearingStatus, ClearingHandler]] = None,
+        interval: float = 1,
+        max_workers: int = 8,
+        batch_threshold: int = 10,
+    ):
+        self.client = client
+        self.handlers = dict(handlers or {})
+        self.interval = interval
+        self.batch_threshold = batch_threshold
+        self.logger = logging.getLogger(__name__)
+        self.__lifecycles: Dict[UUIDv4, Lifecycle] = {}
+        self.__lock = threading.Lock()
+        self.__wake = threading.Event()
+        self.__stopped = threading.Event()
+        self.__max_workers = max_workers
+        self.__executor = self.__new_executor()
+        self.__thread: Optional[threading.Thread] = None
+
+    def track(self, parent_quote_id: UUIDv4) -> Future:
+        """
+        Starts following a quote, returning a future for its booked state.
+        """
+        with self.__lock:
+            lifecycle = self.__lifecycles.get(parent_quote_id)
+            if lifecycle is None:
+                lifecycle = Lifecycle(parent_quote_id, Future())
+                self.__lifecycles[parent_quote_id] = lifecycle
+        self.__wake.set()
+        return lifecycle.future
+
+    def accept(
+        self, rfq_id: UUIDv4, parent_quote_id: UUIDv4, side: TradeSide
+    ) -> Future:
+        """
+        Accepts a quote as the taker and follows it until it's booked.
+        """
+        future = self.track(parent_quote_id)
+
+        def _accept():
+            try:
+                self.client.accept_quote(rfq_id, parent_quote_id, side)
+            except Exception as e:
+                self.__finish(parent_quote_id, error=e)
+            self.__wake.set()
+
+        self.__executor.submit(_accept)
+        return future
+
+    def pending(self) -> List[UUIDv4]:
+        with self.__lock:
+            return list(self.__lifecycles)
+
+    def poll_once(self):
+        """
+        Fetches the status of all tracked quotes once and dispatches handlers.
+        """
+        with self.__lock:
+            ids = [i for i, lc in self.__lifecycles.items() if not lc.busy]
+        if not ids:
+            return
+        for quote in self.__fetch(ids):
+            self.__observe(quote)
+
+    def start(self):
+        if self.__thread is not None:
+            return
+        self.__stopped.clear()
+        self.__thread = threading.Thread(
+            target=self.__run, name="variational-workflow-poller", daemon=True
+        )
+        self.__thread.start()
+
+    def stop(self):
+        self.__stopped.set()
+        self.__wake.set()
+        if self.__thread is not None:
+            self.__thread.join()
+            self.__thread = None
+        self.__executor.shutdown(wait=True)
+        # threads are only spawned on submit, so this costs nothing until the
+        # workflow is started again
+        self.__executor = self.__new_executor()
+
+    def __new_executor(self) -> ThreadPoolExecutor:
+        return ThreadPoolExecutor(
+            max_workers=self.__max_workers, thread_name_prefix="variational-workflow"
+        )
+
+    def __run(self):
+        while not self.__stopped.is_set():
+            self.__wake.clear()
+            try:
+                self.poll_once()
+            except Exception:
+                self.logger.exception("failed to poll clearing statuses")
+            self.__wake.wait(self.interval)
+
+    def __fetch(self, ids: List[UUIDv4]) -> Iterable[Quote]:
+        if len(ids) <= self.batch_threshold:
+            for parent_quote_id in ids:
+                yield from self.client.get_quotes(id=parent_quote_id).result
+            return
+
+        remaining = set(ids)
+        for quote in paginate(self.client.get_quotes):
+            if quote["parent_quote_id"] in remaining:
+                remaining.discard(quote["parent_quote_id"])
+                yield quote
+                if not remaining:
+                    return
+
+    def __observe(self, quote: Quote):
+        parent_quote_id = quote["parent_quote_id"]
+        status = quote["clearing_status"]
+        with self.__lock:
+            lifecycle = self.__lifecycles.get(parent_quote_id)
+            if lifecycle is None or lifecycle.busy or status == lifecycle.status:
+                return
+            ord_previous = CLEARING_ORDER.get(lifecycle.status, 0)
+            ord_current = CLEARING_ORDER.get(status)
+            if ord_current is not None and ord_current < ord_previous:
+                # stale read from before a transition we already observed
+                return
+            lifecycle.status = status
+            lifecycle.quote = quote
+
+            handler = self.handlers.get(status)
+            if handler is not None and status not in lifecycle.handled:
+                lifecycle.handled.add(status)
+                lifecycle.busy = True
+            else:
+                handler = None
+
+        if status == ClearingStatus.SUCCESS_TRADES_BOOKED_INTO_POOL:
+            self.__finish(parent_quote_id, result=quote)
+        elif status is not None and status.startswith("rejected_"):
+            self.__finish(
+                parent_quote_id,
+                error=UnexpectedStatus(
+                    msg=f"unexpected final status '{status}' "
+                    f"for quote '{parent_quote_id}'",
+                    status=status,
+                ),
+            )
+        elif handler is not None:
+            self.__executor.submit(self.__run_handler, lifecycle, handler, quote)
+
+    def __run_handler(
+        self, lifecycle: Lifecycle, handler: ClearingHandler, quote: Quote
+    ):
+        try:
+            handler(quote)
+        except Exception as e:
+            self.__finish(lifecycle.parent_quote_id, error=e)
+        finally:
+            with self.__lock:
+                lifecycle.busy = False
+            # poll right away instead of waiting for the next interval
+            self.__wake.set()
+
+    def __finish(
+        self,
+        parent_quote_id: UUIDv4,
+        result: Optional[Quote] = None,
+        error: Optional[BaseException] = None,
+    ):
+        with self.__lock:
+            lifecycle = self.__lifecycles.pop(parent_quote_id, None)
+        if lifecycle is None or lifecycle.future.done():
+            return
+        if error is not None:
+            lifecycle.future.set_exception(error)
+        else:
+            lifecycle.future.set_result(result)
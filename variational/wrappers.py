@@ -1,11 +1,17 @@
+import codecs
+import json
 import requests
 
 from dataclasses import dataclass
-from typing import Generic, List, TypeVar, Optional, Dict, Mapping
+from typing import Generic, List, TypeVar, Optional, Dict, Mapping, Iterable, Iterator
 
 T = TypeVar("T")
 
-RATE_LIMIT_RESET_MS_HEADER = "x-request-received-ms"
+REQUEST_RECEIVED_MS_HEADER = "x-request-received-ms"
+# former, misleading name of REQUEST_RECEIVED_MS_HEADER
+RATE_LIMIT_RESET_MS_HEADER = REQUEST_RECEIVED_MS_HEADER
+# bytes read from the network at a time when decoding streamed pages
+STREAM_CHUNK_SIZE = 16 * 1024
 
 
 @dataclass
@@ -25,6 +31,18 @@ class ApiError(Exception):
         return repr(self)
 
 
+@dataclass
+class DeadlineExceeded(Exception):
+    url: str
+    # seconds the call was given
+    deadline: float
+    # attempts made before giving up
+    attempts: int
+
+    def __str__(self):
+        return repr(self)
+
+
 @dataclass
 class ApiSingle(Generic[T]):
     result: T
@@ -33,7 +51,7 @@ class ApiSingle(Generic[T]):
     @staticmethod
     def from_response(response: requests.Response):
         return ApiSingle(
-            result=response.json()["result"],
+            result=_decode_json(response)["result"],
             meta=ResponseMetadata(_get_request_received_timestamp(response.headers)),
         )
 
@@ -46,7 +64,7 @@ class ApiList(Generic[T]):
     @staticmethod
     def from_response(response: requests.Response):
         return ApiList(
-            result=response.json()["result"],
+            result=_decode_json(response)["result"],
             meta=ResponseMetadata(_get_request_received_timestamp(response.headers)),
         )
 
@@ -64,7 +82,19 @@ class ApiPage(Generic[T]):
 
     @staticmethod
     def from_response(response: requests.Response):
-        data = response.json()
+        if getattr(response, "_variational_stream", False):
+            # `result` is decoded while it's iterated, the next page is known
+            # once it's exhausted
+            pagination = Pagination(next_page=None)
+            return ApiPage(
+                result=_stream_page(response, pagination),
+                pagination=pagination,
+                meta=ResponseMetadata(
+                    _get_request_received_timestamp(response.headers)
+                ),
+            )
+
+        data = _decode_json(response)
         return ApiPage(
             result=data["result"],
             pagination=Pagination(next_page=data["pagination"]["next_page"]),
@@ -72,8 +102,147 @@ class ApiPage(Generic[T]):
         )
 
 
+def _decode_json(response: requests.Response):
+    # the client may have decoded the body already, e.g. to time decoding
+    try:
+        return response._variational_json
+    except AttributeError:
+        pass
+    try:
+        response._variational_json = response.json(
+            object_hook=getattr(response, "_variational_object_hook", None)
+        )
+    finally:
+        _response_consumed(response)
+    return response._variational_json
+
+
+def _stream_page(response: requests.Response, pagination: Pagination) -> Iterator:
+    try:
+        yield from _iter_page_items(
+            _count_chunks(response),
+            pagination,
+            getattr(response, "_variational_object_hook", None),
+        )
+    finally:
+        response.close()
+        _response_consumed(response)
+
+
+def _count_chunks(response: requests.Response) -> Iterator[bytes]:
+    response._variational_decoded_bytes = 0
+    for chunk in response.iter_content(STREAM_CHUNK_SIZE):
+        response._variational_decoded_bytes += len(chunk)
+        yield chunk
+
+
+def _response_consumed(response: requests.Response):
+    # emits the request record the client deferred until the body was read
+    emit = getattr(response, "_variational_emit", None)
+    if emit is not None:
+        del response._variational_emit
+        emit()
+
+
+def _iter_page_items(
+    chunks: Iterable[bytes], pagination: Pagination, object_hook=None
+) -> Iterator:
+    """
+    Yields items of the `result` list of a page body as soon as each one has
+    been received, setting `pagination.next_page` when it's reached.
+    """
+    stream = _JSONStream(chunks, object_hook)
+    stream.expect("{")
+    if stream.peek() == "}":
+        return
+    while True:
+        key = stream.value()
+        stream.expect(":")
+        if key == "result":
+            stream.expect("[")
+            if stream.peek() != "]":
+                yield stream.value()
+                while stream.peek() == ",":
+                    stream.pos += 1
+                    yield stream.value()
+            stream.expect("]")
+        elif key == "pagination":
+            pagination.next_page = stream.value()["next_page"]
+        else:
+            stream.value()
+        if stream.peek() != ",":
+            break
+        stream.pos += 1
+    stream.expect("}")
+
+
+class _JSONStream(object):
+    """
+    Reads JSON values one at a time from a stream of byte chunks, keeping only
+    the unread part of the body in memory.
+    """
+
+    def __init__(self, chunks: Iterable[bytes], object_hook=None):
+        self.chunks = iter(chunks)
+        self.decoder = json.JSONDecoder(object_hook=object_hook)
+        self.text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        text = ""
+        for chunk in self.chunks:
+            text = self.text_decoder.decode(chunk)
+            if text:
+                break
+        else:
+            text = self.text_decoder.decode(b"", final=True)
+            self.eof = True
+        consumed, self.pos = self.pos, 0
+        self.buf = self.buf[consumed:] + text
+
+    def peek(self) -> str:
+        """
+        Skips whitespace and returns the next character, "" at the end.
+        """
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if self.eof:
+                return ""
+            self.fill()
+
+    def expect(self, char: str):
+        found = self.peek()
+        if found != char:
+            raise json.JSONDecodeError(f"expected {char!r}", self.buf, self.pos)
+        self.pos += 1
+
+    def value(self):
+        self.peek()
+        wanted = 0
+        while True:
+            if len(self.buf) - self.pos >= wanted or self.eof:
+                try:
+                    value, end = self.decoder.raw_decode(self.buf, self.pos)
+                except json.JSONDecodeError:
+                    if self.eof:
+                        raise
+                else:
+                    # a number at the end of the buffer may continue
+                    if end < len(self.buf) or self.eof:
+                        self.pos = end
+                        return value
+                # don't re-parse a large value after every small chunk
+                wanted = 2 * (len(self.buf) - self.pos)
+            self.fill()
+
+
 def _get_request_received_timestamp(headers: Mapping) -> Optional[float]:
     for k, v in headers.items():
-        if k.lower() == RATE_LIMIT_RESET_MS_HEADER:
+        if k.lower() == REQUEST_RECEIVED_MS_HEADER:
             return int(v) / 1000
-    raise ValueError(f"response didn't contain {RATE_LIMIT_RESET_MS_HEADER} header")
+    raise ValueError(f"response didn't contain {REQUEST_RECEIVED_MS_HEADER} header")